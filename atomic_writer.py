@@ -0,0 +1,72 @@
+"""
+原子写入模块
+先写入同目录下的临时文件并同步到磁盘，再整体替换目标文件，写入中途崩溃不会损坏原文件
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str = 'utf-8') -> Iterator[IO]:
+    """
+    原子地写入文件
+    
+    在目标文件所在目录创建临时文件供调用方流式写入；正常退出时fsync临时文件，
+    用os.replace替换目标文件，再fsync目录使重命名持久化。发生异常时删除临时文件，
+    目标文件保持不变。
+    
+    Args:
+        path: 目标文件路径
+        mode: 打开模式，'w'（文本）或'wb'（二进制）
+        encoding: 文本模式下的编码
+    
+    Yields:
+        临时文件对象
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        if 'b' in mode:
+            temp_file = os.fdopen(fd, mode)
+        else:
+            temp_file = os.fdopen(fd, mode, encoding=encoding)
+        with temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        
+        # 保留原文件的权限，mkstemp创建的文件默认只有属主可读写
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str):
+    """同步目录，使重命名操作持久化（不支持的平台上忽略）"""
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+条目扫描基准测试
+比较花括号深度扫描与旧的DOTALL正则在正常和病态输入上的耗时
+
+用法: python benchmarks/bench_entry_scanner.py [--sizes 1000,2000,4000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entry_scanner import scan_entries
+
+
+# 旧版 _extract_raw_entries 使用的正则
+LEGACY_ENTRY_PATTERN = re.compile(r'@(\w+)\{([^,]+),\s*(.*?)\n\}', re.DOTALL)
+
+
+def well_formed(count: int) -> str:
+    """正常格式的文献库"""
+    return ''.join(
+        f"@article{{key{i},\n\tauthor = {{Author, A.}},\n\ttitle = {{Title {{{i}}}}},\n\tyear = {{2020}}\n}}\n\n"
+        for i in range(count)
+    )
+
+
+def closing_brace_inline(count: int) -> str:
+    """右花括号与最后一个字段在同一行（旧正则只能跨条目匹配）"""
+    return ''.join(f"@article{{key{i}, title = {{Title {i}}}, year = {{2020}}}}\n" for i in range(count))
+
+
+def unterminated(count: int) -> str:
+    """所有条目都缺少右花括号，旧正则每个起点都扫描到文件末尾"""
+    return ''.join(f"@article{{key{i},\n\ttitle = {{Title {i}}},\n\n" for i in range(count))
+
+
+def missing_commas(count: int) -> str:
+    """条目头部缺少逗号，[^,]+ 从每个起点吞掉剩余内容后回溯"""
+    return ''.join(f"@misc{{note {i} without key\n" for i in range(count))
+
+
+WORKLOADS = [
+    ('well-formed', well_formed),
+    ('closing brace inline', closing_brace_inline),
+    ('unterminated entries', unterminated),
+    ('missing commas', missing_commas),
+]
+
+
+def time_call(func, *args) -> tuple:
+    """执行函数并返回(耗时, 结果)"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run_regex(content: str) -> int:
+    return sum(1 for _ in LEGACY_ENTRY_PATTERN.finditer(content))
+
+
+def run_scanner(data: bytes) -> int:
+    return sum(1 for span in scan_entries(data) if span.error is None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='条目扫描基准测试')
+    parser.add_argument('--sizes', default='1000,2000,4000', help='条目数量，逗号分隔')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    
+    print(f"{'workload':<24}{'entries':>8}{'regex (s)':>12}{'found':>8}{'scanner (s)':>13}{'found':>8}")
+    print('-' * 73)
+    
+    for name, generate in WORKLOADS:
+        for size in sizes:
+            content = generate(size)
+            regex_time, regex_found = time_call(run_regex, content)
+            scanner_time, scanner_found = time_call(run_scanner, content.encode('utf-8'))
+            print(f"{name:<24}{size:>8}{regex_time:>12.4f}{regex_found:>8}"
+                  f"{scanner_time:>13.4f}{scanner_found:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+并行解析基准测试
+生成合成文献库，测量不同进程数下单文件分块解析和多文件并行解析的耗时与加速比
+
+用法: python benchmarks/bench_parallel_parse.py [--entries 20000] [--files 8]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parser import BibTeXParser, parse_files
+
+
+def write_library(path: str, count: int, prefix: str = 'key'):
+    """写入包含字符串宏和注释的合成文献库"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('@string{tec = "IEEE Transactions on Evolutionary Computation"}\n\n')
+        for i in range(count):
+            if i % 100 == 0:
+                f.write(f"% section {i // 100}\n\n")
+            f.write(
+                f"@article{{{prefix}{i},\n"
+                f"\tauthor = {{Deb, Kalyanmoy and Pratap, Amrit and Agarwal, Sameer}},\n"
+                f"\tjournal = tec,\n"
+                f"\tnumber = {{{i % 12 + 1}}},\n"
+                f"\tpages = {{{i}--{i + 15}}},\n"
+                f"\ttitle = {{A fast and elitist {{NSGA-II}} variant number {i}}},\n"
+                f"\tvolume = {{{i % 30}}},\n"
+                f"\tyear = {{{1990 + i % 35}}}\n"
+                f"}}\n\n"
+            )
+
+
+def worker_counts() -> list:
+    """1, 2, 4, ... 直到CPU核数"""
+    cpu_count = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpu_count:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpu_count:
+        counts.append(cpu_count)
+    return counts
+
+
+def time_single_file(path: str, workers: int) -> float:
+    start = time.perf_counter()
+    BibTeXParser(path, workers=workers).parse()
+    return time.perf_counter() - start
+
+
+def time_many_files(paths: list, workers: int) -> float:
+    start = time.perf_counter()
+    if workers == 1:
+        for path in paths:
+            BibTeXParser(path).parse()
+    else:
+        parse_files(paths, workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并行解析基准测试')
+    parser.add_argument('--entries', type=int, default=20000, help='单文件测试的条目数')
+    parser.add_argument('--files', type=int, default=8, help='多文件测试的文件数')
+    parser.add_argument('--entries-per-file', type=int, default=2000, help='多文件测试中每个文件的条目数')
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix='bib_bench_')
+    try:
+        big_path = os.path.join(workdir, 'big.bib')
+        write_library(big_path, args.entries)
+        paths = []
+        for i in range(args.files):
+            path = os.path.join(workdir, f"part{i}.bib")
+            write_library(path, args.entries_per_file, prefix=f"p{i}_")
+            paths.append(path)
+        
+        size_mb = os.path.getsize(big_path) / 1024 / 1024
+        print(f"CPU核数: {os.cpu_count()}")
+        print(f"单文件: {args.entries} 条, {size_mb:.1f} MB; "
+              f"多文件: {args.files} x {args.entries_per_file} 条\n")
+        print(f"{'workers':>8}{'single (s)':>13}{'speedup':>10}{'multi (s)':>12}{'speedup':>10}")
+        print('-' * 53)
+        
+        baseline_single = baseline_multi = None
+        for workers in worker_counts():
+            single = time_single_file(big_path, workers)
+            multi = time_many_files(paths, workers)
+            baseline_single = baseline_single or single
+            baseline_multi = baseline_multi or multi
+            print(f"{workers:>8}{single:>13.2f}{baseline_single / single:>9.2f}x"
+                  f"{multi:>12.2f}{baseline_multi / multi:>9.2f}x")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
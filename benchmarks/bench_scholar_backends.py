@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Scholar检索后端吞吐量基准测试
+在本地模拟Scholar服务器上运行各检索后端，统计不同并行数下的每分钟检索数、
+各阶段（search、cite、bibtex）耗时的p50/p95，以及遇到验证码后恢复到下一次成功检索的时间；
+scholar-lean为精简模式的浏览器后端，与scholar对比可以看出屏蔽资源和eager加载对每个页面加载耗时的影响
+
+用法: python benchmarks/bench_scholar_backends.py [--lookups 60] [--latency 0.05] [--workers 1,2,4]
+      [--captcha-every 25] [--error-every 0] [--backends http,scholar,scholar-lean]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scholar_scraper
+from http_scraper import HttpScholarBackend
+from mock_scholar import MockScholarServer
+from scholar_scraper import ScholarScraper
+from scraper_pool import ScraperPool
+
+
+PHASES = ('search', 'cite', 'bibtex')
+
+TOPICS = ['evolutionary', 'multiobjective', 'neural', 'bayesian', 'sparse', 'graph', 'stochastic', 'convex']
+
+
+def make_papers(count: int) -> list:
+    """生成标题互不相同的合成论文"""
+    papers = []
+    for i in range(count):
+        topic = TOPICS[i % len(TOPICS)]
+        papers.append(
+            f"@article{{bench{i},\n"
+            f"  title={{Benchmark study {i} of {topic} optimization methods}},\n"
+            f"  author={{Deb, Kalyanmoy and Pratap, Amrit}},\n"
+            f"  journal={{IEEE Transactions on Evolutionary Computation}},\n"
+            f"  volume={{{i % 30}}},\n"
+            f"  pages={{{i}--{i + 15}}},\n"
+            f"  year={{{1990 + i % 35}}}\n"
+            f"}}"
+        )
+    return papers
+
+
+class TimingRecorder:
+    """收集各后端通过timing_hook报告的阶段耗时"""
+    
+    def __init__(self):
+        self.phases = {phase: [] for phase in PHASES}
+        self._lock = threading.Lock()
+    
+    def record(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases.setdefault(phase, []).append(seconds)
+
+
+def percentile(values: list, fraction: float) -> float:
+    """最近秩百分位数"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def recovery_times(captcha_times: list, success_times: list) -> list:
+    """每次验证码之后到下一次成功检索完成的时间"""
+    recoveries = []
+    for captcha_time in captcha_times:
+        later = [t for t in success_times if t > captcha_time]
+        if later:
+            recoveries.append(min(later) - captcha_time)
+    return recoveries
+
+
+def run_case(backend: str, workers: int, papers: list, args) -> dict:
+    """在新的模拟服务器上用指定后端和并行数检索全部论文"""
+    server = MockScholarServer(papers, latency=args.latency, captcha_every=args.captcha_every,
+                               error_every=args.error_every).start()
+    recorder = TimingRecorder()
+    if backend == 'http':
+        base_factory = partial(HttpScholarBackend, base_url=server.url)
+    else:
+        base_factory = partial(ScholarScraper, headless=True, base_url=server.url, lean=backend == 'scholar-lean')
+    
+    def factory(**kwargs):
+        instance = base_factory(**kwargs)
+        instance.timing_hook = recorder.record
+        return instance
+    
+    titles = [server.papers[i].title for i in range(len(papers))]
+    success_times = []
+    failed = 0
+    started = time.monotonic()
+    try:
+        if workers > 1:
+            searcher = ScraperPool(workers=workers, delay_range=args.delay, scraper_factory=factory)
+        else:
+            searcher = factory(delay_range=args.delay)
+        with searcher:
+            for _, result in searcher.iter_search(titles):
+                if result is None:
+                    failed += 1
+                else:
+                    success_times.append(time.monotonic())
+        elapsed = time.monotonic() - started
+    finally:
+        server.stop()
+    
+    return {
+        'lookups_per_minute': len(titles) / elapsed * 60,
+        'ok': len(success_times),
+        'failed': failed,
+        'phases': recorder.phases,
+        'captchas': len(server.captcha_times),
+        'recoveries': recovery_times(server.captcha_times, success_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scholar检索后端吞吐量基准测试')
+    parser.add_argument('--lookups', type=int, default=60, help='每组测试检索的标题数')
+    parser.add_argument('--latency', type=float, default=0.05, help='模拟服务器每个请求的延迟（秒）')
+    parser.add_argument('--workers', default='1,2,4', help='并行数列表，逗号分隔')
+    parser.add_argument('--backends', default='http', help='后端列表，逗号分隔：http、scholar、scholar-lean（后两者需要Chrome）')
+    parser.add_argument('--captcha-every', type=int, default=25, help='每隔多少次搜索返回一次验证码页面，0表示从不')
+    parser.add_argument('--error-every', type=int, default=0, help='每隔多少个请求返回一次503错误，0表示从不')
+    parser.add_argument('--delay', default='0-0', help='请求间隔的下限和上限（秒），格式: min-max')
+    args = parser.parse_args()
+    args.delay = tuple(float(part) for part in args.delay.split('-'))
+    
+    # 浏览器后端遇到验证码时会等待用户按回车，基准测试中视为立即处理完毕
+    scholar_scraper.input = lambda prompt='': ''
+    
+    papers = make_papers(args.lookups)
+    print(f"检索数: {args.lookups}, 模拟延迟: {args.latency * 1000:.0f} ms, "
+          f"验证码: 每 {args.captcha_every} 次搜索, 503错误: 每 {args.error_every} 个请求\n")
+    header = f"{'backend':>13}{'workers':>8}{'lookups/min':>13}{'ok':>5}{'fail':>6}"
+    for phase in PHASES:
+        header += f"{phase + ' p50/p95 (ms)':>24}"
+    header += f"{'captchas':>10}{'recovery (s)':>14}"
+    print(header)
+    print('-' * len(header))
+    
+    for backend in args.backends.split(','):
+        for workers in (int(count) for count in args.workers.split(',')):
+            try:
+                stats = run_case(backend, workers, papers, args)
+            except Exception as e:
+                print(f"{backend:>13}{workers:>8}  skipped: {e}")
+                continue
+            if not stats['ok'] and not any(stats['phases'].values()):
+                # 工作池中的浏览器启动失败时只记录日志，所有检索都失败
+                print(f"{backend:>13}{workers:>8}  skipped: no request reached the mock server")
+                continue
+            line = f"{backend:>13}{workers:>8}{stats['lookups_per_minute']:>13.1f}{stats['ok']:>5}{stats['failed']:>6}"
+            for phase in PHASES:
+                values = stats['phases'].get(phase, [])
+                line += f"{percentile(values, 0.5) * 1000:>15.1f} / {percentile(values, 0.95) * 1000:>6.1f}"
+            recoveries = stats['recoveries']
+            recovery = f"{sum(recoveries) / len(recoveries):.2f}" if recoveries else '-'
+            line += f"{stats['captchas']:>10}{recovery:>14}"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+检查守护进程模块
+常驻后台，让浏览器、HTTP连接和检索结果缓存一直处于就绪状态，通过本地Unix套接字接受检查任务
+（.bib文件路径或标题列表）；命令行只作为客户端发送任务，临时的小规模检查不必再等待浏览器启动
+
+命令行用法:
+  python checker_daemon.py serve --headless --browsers 2
+  python checker_daemon.py check reference.bib
+  python checker_daemon.py search "Deep residual learning for image recognition"
+  python checker_daemon.py status
+  python checker_daemon.py stop
+
+协议: 客户端每次连接发送一行JSON请求，守护进程逐行返回JSON响应，最后一行包含"done"或"error"
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from contextlib import closing
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from comparator import EntryComparison
+from parse_cache import DEFAULT_CACHE_DIR, ParseCache
+from parser import BibTeXParser
+from pipeline import ComparisonPipeline
+
+
+DEFAULT_SOCKET_PATH = os.path.join(DEFAULT_CACHE_DIR, 'daemon.sock')
+# 客户端每凑满这么多个标题就作为一个任务发送，不必等标题全部读完
+SEARCH_CHUNK_SIZE = 32
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonError(Exception):
+    """守护进程未运行或返回了错误"""
+
+
+def comparison_to_dict(comparison: EntryComparison) -> Dict:
+    """把比对结果转换为可JSON序列化的字典"""
+    return {
+        'citation_key': comparison.citation_key,
+        'title': comparison.title,
+        'scholar_title': comparison.scholar_title,
+        'title_mismatch': comparison.title_mismatch,
+        'differences': [
+            {'field': diff.field_name, 'type': diff.diff_type.value,
+             'original': diff.original_value, 'scholar': diff.scholar_value}
+            for diff in comparison.differences
+        ],
+    }
+
+
+class _LookupRecorder:
+    """传给后端的iter_search代替断点日志，记下本次任务中有确定结果（找到或未找到）的标题"""
+    
+    def __init__(self):
+        self.completed: Dict[str, Optional[Dict]] = {}
+    
+    def record(self, title: str, result: Optional[Dict]):
+        """记录一次完成的检索"""
+        self.completed[title] = result
+
+
+class CheckerDaemon:
+    """持有检索后端并通过Unix套接字提供检索服务"""
+    
+    def __init__(self, backend, socket_path: str = DEFAULT_SOCKET_PATH, result_cache=None):
+        """
+        初始化守护进程
+        
+        Args:
+            backend: 检索后端或ScraperPool（应设置keep_alive，使浏览器在任务之间保持运行）
+            socket_path: Unix套接字路径
+            result_cache: 检索结果缓存（ResultCache），守护进程退出时关闭
+        """
+        self.backend = backend
+        self.socket_path = socket_path
+        self.result_cache = result_cache
+        self.jobs = 0
+        self.started_at = time.time()
+        # 浏览器同一时间只服务一个任务，其他客户端排队等待
+        self._job_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+    
+    def _bind(self):
+        """创建套接字；遗留的套接字文件在确认没有守护进程监听后删除"""
+        if os.path.exists(self.socket_path):
+            if daemon_running(self.socket_path):
+                raise DaemonError(f"A daemon is already listening on {self.socket_path}")
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+        
+        daemon = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                def write(message: Dict):
+                    self.wfile.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+                    self.wfile.flush()
+                
+                try:
+                    request = json.loads(self.rfile.readline().decode('utf-8'))
+                    daemon.handle(request, write)
+                except (BrokenPipeError, ConnectionResetError):
+                    logger.info("Client disconnected before the job finished")
+                except Exception as e:
+                    logger.exception("Daemon job failed")
+                    try:
+                        write({'error': str(e)})
+                    except OSError:
+                        pass
+        
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        self._server.daemon_threads = True
+        # 只允许当前用户连接
+        os.chmod(self.socket_path, 0o600)
+    
+    def handle(self, request: Dict, write):
+        """
+        处理一个请求
+        
+        Args:
+            request: 请求字典，op为ping、search、check或shutdown
+            write: 发送一行响应的函数
+        """
+        op = request.get('op')
+        if op == 'ping':
+            write({'done': True, 'pid': os.getpid(), 'uptime': time.time() - self.started_at,
+                   'jobs': self.jobs, 'busy': self._job_lock.locked(), 'cache_hits': self.backend.cache_hits})
+        elif op == 'search':
+            with self._job_lock:
+                self.jobs += 1
+                cache_hits = self.backend.cache_hits
+                recorder = _LookupRecorder()
+                # 客户端中途断开时立即结束检索，释放浏览器后再让下一个任务开始
+                with closing(self.backend.iter_search(request.get('titles', []), recorder)) as results:
+                    for title, result in results:
+                        # completed为False表示检索出错（超时、验证码等），客户端不应记入断点日志
+                        write({'title': title, 'result': result, 'completed': title in recorder.completed})
+                write({'done': True, 'cache_hits': self.backend.cache_hits - cache_hits})
+        elif op == 'check':
+            parser = BibTeXParser(request['bibfile'], cache=ParseCache(DEFAULT_CACHE_DIR))
+            parser.parse()
+            entries = parser.get_entries()
+            with self._job_lock:
+                self.jobs += 1
+                pipeline = ComparisonPipeline(self.backend)
+                with closing(pipeline.run(entries)) as comparisons:
+                    for comparison in comparisons:
+                        if comparison.has_differences:
+                            write({'comparison': comparison_to_dict(comparison)})
+            write({'done': True, 'entries': len(entries), 'lookups': pipeline.lookups, 'found': pipeline.found,
+                   'compared': pipeline.compared, 'coalesced': pipeline.coalesced})
+        elif op == 'shutdown':
+            write({'done': True})
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        else:
+            write({'error': f"Unknown op: {op!r}"})
+    
+    def serve_forever(self):
+        """在当前线程运行，直到收到shutdown请求或Ctrl-C"""
+        if self._server is None:
+            self._bind()
+        logger.info(f"Daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._cleanup()
+    
+    def start(self) -> 'CheckerDaemon':
+        """在后台线程启动（测试使用）"""
+        self._bind()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """停止后台线程启动的守护进程"""
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _cleanup(self):
+        """关闭套接字、浏览器和缓存"""
+        self._server.server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.backend.close()
+        if self.result_cache is not None:
+            self.result_cache.close()
+
+
+class DaemonClient:
+    """守护进程客户端，提供与检索后端相同的iter_search接口"""
+    
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, chunk_size: int = SEARCH_CHUNK_SIZE):
+        """
+        初始化客户端
+        
+        Args:
+            socket_path: 守护进程的Unix套接字路径
+            chunk_size: iter_search每个任务发送的标题数
+        """
+        self.socket_path = socket_path
+        self.chunk_size = chunk_size
+        self.cache_hits = 0
+    
+    def _request(self, message: Dict) -> Iterator[Dict]:
+        """发送请求并逐行读取响应"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                raise DaemonError(f"Checker daemon is not running on {self.socket_path}: {e}")
+            sock.sendall((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+            with sock.makefile('r', encoding='utf-8') as reader:
+                for line in reader:
+                    response = json.loads(line)
+                    if 'error' in response:
+                        raise DaemonError(response['error'])
+                    yield response
+                    if response.get('done'):
+                        return
+            raise DaemonError("Checker daemon closed the connection unexpectedly")
+        finally:
+            sock.close()
+    
+    def ping(self) -> Dict:
+        """查询守护进程状态"""
+        return next(self._request({'op': 'ping'}))
+    
+    def iter_search(self, titles, journal=None) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        由守护进程检索论文，按完成顺序产出结果
+        
+        标题按需读取，每凑满chunk_size个就作为一个任务发送，产出这批结果后再继续读取，
+        因此边解析边产生标题的生成器不必先全部读完。
+        
+        Args:
+            titles: 论文标题的可迭代对象
+            journal: 断点日志（CheckpointJournal）；与本地后端一样记录每个有确定结果
+                （找到或未找到）的检索，出错的检索不记录
+        
+        Yields:
+            (标题, BibTeX字典或None)
+        """
+        pending = []
+        for title in titles:
+            if journal is not None and title in journal.completed:
+                yield title, journal.completed[title]
+                continue
+            pending.append(title)
+            if len(pending) >= self.chunk_size:
+                yield from self._search_chunk(pending, journal)
+                pending = []
+        if pending:
+            yield from self._search_chunk(pending, journal)
+    
+    def _search_chunk(self, titles: List[str], journal) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """把一批标题作为一个search任务发送并产出结果"""
+        for response in self._request({'op': 'search', 'titles': titles}):
+            if response.get('done'):
+                self.cache_hits += response.get('cache_hits', 0)
+                break
+            title, result = response['title'], response['result']
+            if journal is not None and response.get('completed'):
+                journal.record(title, result)
+            yield title, result
+    
+    def check(self, bibfile: str) -> Iterator[Dict]:
+        """
+        由守护进程检查整个.bib文件
+        
+        Yields:
+            每个有差异的条目一行{'comparison': ...}，最后一行为包含统计信息的{'done': True, ...}
+        """
+        yield from self._request({'op': 'check', 'bibfile': os.path.abspath(bibfile)})
+    
+    def shutdown(self):
+        """让守护进程退出"""
+        next(self._request({'op': 'shutdown'}))
+    
+    def close(self):
+        """客户端不持有连接，无需释放"""
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+
+
+def daemon_running(socket_path: str = DEFAULT_SOCKET_PATH) -> bool:
+    """是否有守护进程在该套接字上监听"""
+    try:
+        DaemonClient(socket_path).ping()
+        return True
+    except (DaemonError, OSError, ValueError):
+        return False
+
+
+def build_backend(args):
+    """按命令行参数创建保持运行的检索后端和结果缓存"""
+    from http_scraper import HttpScholarBackend
+    from main import parse_delay_range
+    from rate_limiter import TokenBucket
+    from result_cache import ResultCache
+    from scholar_scraper import ScholarScraper
+    from scraper_pool import ScraperPool
+    
+    # 与main.py使用同一解析规则，无效的值提示后使用默认范围
+    delay_range = parse_delay_range(args.delay)
+    result_cache = None
+    if not args.no_result_cache:
+        result_cache = ResultCache(args.result_cache, ttl_days=args.cache_ttl, negative_ttl_days=args.negative_ttl)
+    rate_limiter = TokenBucket.per_minute(args.rate, burst=args.burst)
+    if args.backend == 'http':
+        factory = partial(HttpScholarBackend, base_url=args.scholar_url)
+    else:
+        factory = partial(ScholarScraper, headless=args.headless, base_url=args.scholar_url,
+                          lean=args.lean, profile_dir=args.profile_dir)
+    if args.browsers > 1:
+        backend = ScraperPool(workers=args.browsers, delay_range=delay_range, rate_limiter=rate_limiter,
+                              result_cache=result_cache, scraper_factory=factory, keep_alive=True)
+    else:
+        backend = factory(delay_range=delay_range, result_cache=result_cache, rate_limiter=rate_limiter)
+    return backend, result_cache
+
+
+def print_comparison(comparison: Dict):
+    """打印一条有差异的条目"""
+    if comparison['title_mismatch']:
+        print(f"{comparison['citation_key']}: 标题不匹配 (Scholar: {comparison['scholar_title']})")
+        return
+    print(f"{comparison['citation_key']}:")
+    for diff in comparison['differences']:
+        print(f"  {diff['field']} [{diff['type']}]: {diff['original']!r} -> {diff['scholar']!r}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """守护进程命令行入口"""
+    from result_cache import DEFAULT_NEGATIVE_TTL_DAYS, DEFAULT_RESULT_CACHE_PATH, DEFAULT_TTL_DAYS
+    from scholar_scraper import DEFAULT_PROFILE_DIR, SCHOLAR_BASE_URL
+    
+    arg_parser = argparse.ArgumentParser(description='BibTeX检查守护进程')
+    arg_parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help=f'Unix套接字路径，默认: {DEFAULT_SOCKET_PATH}')
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+    
+    serve_parser = subparsers.add_parser('serve', help='启动守护进程（在前台运行，按Ctrl-C或stop命令退出）')
+    serve_parser.add_argument('--backend', choices=['scholar', 'http'], default='scholar', help='检索后端')
+    serve_parser.add_argument('--headless', action='store_true', help='使用无头浏览器模式')
+    serve_parser.add_argument('--lean', action='store_true', help='浏览器精简模式，屏蔽非必要资源')
+    serve_parser.add_argument('--profile-dir', nargs='?', const=DEFAULT_PROFILE_DIR, metavar='DIR',
+                              help=f'保留浏览器配置（Cookie等）的目录，默认: {DEFAULT_PROFILE_DIR}')
+    serve_parser.add_argument('--browsers', type=int, default=1, help='保持运行的浏览器数量')
+    serve_parser.add_argument('--delay', default='2-4', help='请求间隔的下限和上限（秒），格式: min-max')
+    serve_parser.add_argument('--rate', type=float, default=20, help='Scholar请求速率上限（次/分钟）')
+    serve_parser.add_argument('--burst', type=int, default=3, help='允许的突发请求数')
+    serve_parser.add_argument('--scholar-url', default=SCHOLAR_BASE_URL, help='Scholar地址')
+    serve_parser.add_argument('--result-cache', default=DEFAULT_RESULT_CACHE_PATH, help='检索结果缓存数据库')
+    serve_parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL_DAYS, help='检索结果缓存有效期（天）')
+    serve_parser.add_argument('--negative-ttl', type=float, default=DEFAULT_NEGATIVE_TTL_DAYS,
+                              help='未找到结果的缓存有效期（天）')
+    serve_parser.add_argument('--no-result-cache', action='store_true', help='不使用检索结果缓存')
+    serve_parser.add_argument('--verbose', '-v', action='store_true', help='显示详细日志')
+    
+    check_parser = subparsers.add_parser('check', help='检查.bib文件并列出有差异的条目')
+    check_parser.add_argument('bibfile', help='BibTeX文件路径')
+    
+    search_parser = subparsers.add_parser('search', help='检索标题并输出BibTeX字典')
+    search_parser.add_argument('titles', nargs='+', help='论文标题')
+    
+    subparsers.add_parser('status', help='显示守护进程状态')
+    subparsers.add_parser('stop', help='停止守护进程')
+    args = arg_parser.parse_args(argv)
+    
+    if not hasattr(socket, 'AF_UNIX'):
+        print("当前平台不支持Unix套接字，无法使用守护进程模式", file=sys.stderr)
+        return 1
+    
+    if args.command == 'serve':
+        logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        started = time.monotonic()
+        backend, result_cache = build_backend(args)
+        daemon = CheckerDaemon(backend, args.socket, result_cache)
+        try:
+            daemon._bind()
+            backend.warm_up()
+        except Exception:
+            backend.close()
+            if result_cache is not None:
+                result_cache.close()
+            raise
+        print(f"守护进程已就绪（{time.monotonic() - started:.1f}秒），监听 {args.socket}，按Ctrl-C停止")
+        daemon.serve_forever()
+        return 0
+    
+    client = DaemonClient(args.socket)
+    try:
+        if args.command == 'status':
+            status = client.ping()
+            print(f"运行中: pid {status['pid']}，已运行 {status['uptime']:.0f} 秒，"
+                  f"完成 {status['jobs']} 个任务，缓存命中 {status['cache_hits']} 次"
+                  f"{'，正在处理任务' if status['busy'] else ''}")
+        elif args.command == 'stop':
+            client.shutdown()
+            print("守护进程已停止")
+        elif args.command == 'search':
+            for title, result in client.iter_search(args.titles):
+                print(json.dumps({'title': title, 'result': result}, ensure_ascii=False))
+        elif args.command == 'check':
+            for response in client.check(args.bibfile):
+                if 'comparison' in response:
+                    print_comparison(response['comparison'])
+                else:
+                    print(f"检查 {response['entries']} 条，检索 {response['lookups']} 次（找到 {response['found']} 条，"
+                          f"合并 {response['coalesced']} 次），比对 {response['compared']} 条")
+    except DaemonError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+检索断点日志模块
+每完成一次检索就追加一行JSON并同步到磁盘，程序中断（验证码超时、Ctrl-C、浏览器崩溃）后可以从断点继续
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from parse_cache import DEFAULT_CACHE_DIR
+
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(DEFAULT_CACHE_DIR, 'checkpoints')
+
+# 日志格式版本，记录结构变化时需要递增
+JOURNAL_FORMAT_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointJournal:
+    """按输入文件区分的追加写检索日志"""
+    
+    def __init__(self, input_path: str, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR):
+        """
+        初始化断点日志
+        
+        Args:
+            input_path: 被检查的BibTeX文件路径，每个输入文件对应一个日志
+            checkpoint_dir: 日志目录
+        """
+        self.input_path = os.path.abspath(input_path)
+        path_hash = hashlib.sha1(self.input_path.encode('utf-8')).hexdigest()
+        self.path = os.path.join(checkpoint_dir, f"{path_hash}.jsonl")
+        self.completed: Dict[str, Optional[Dict]] = {}
+        self._file = None
+    
+    def open(self, resume: bool = False) -> int:
+        """
+        打开日志
+        
+        Args:
+            resume: 为True时加载已有记录并继续追加，否则清空重新开始
+        
+        Returns:
+            已加载的记录数
+        """
+        self.completed = self._load() if resume else {}
+        
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self.completed:
+            self._truncate_partial_line()
+            self._file = open(self.path, 'a', encoding='utf-8')
+        else:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._append({'version': JOURNAL_FORMAT_VERSION, 'input': self.input_path})
+        
+        if self.completed:
+            logger.info(f"Resuming from checkpoint {self.path}: {len(self.completed)} lookups done")
+        return len(self.completed)
+    
+    def _load(self) -> Dict[str, Optional[Dict]]:
+        """读取已有日志，忽略崩溃时写了一半的末尾行"""
+        completed = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return completed
+        
+        if not lines:
+            return completed
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            header = {}
+        if header.get('version') != JOURNAL_FORMAT_VERSION or header.get('input') != self.input_path:
+            logger.warning(f"Ignoring incompatible checkpoint {self.path}")
+            return completed
+        
+        for number, line in enumerate(lines[1:], 2):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping truncated checkpoint record at line {number}")
+                continue
+            completed[record['title']] = record['result']
+        return completed
+    
+    def _truncate_partial_line(self):
+        """去掉崩溃时写了一半的末尾行，避免新记录接在残行后面"""
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+    
+    def _append(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def record(self, title: str, result: Optional[Dict]):
+        """
+        记录一次完成的检索
+        
+        Args:
+            title: 论文标题
+            result: BibTeX字典，None表示Scholar上没有找到
+        """
+        self.completed[title] = result
+        self._append({'title': title, 'result': result})
+    
+    def close(self):
+        """关闭日志文件，保留已有记录供下次继续"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def discard(self):
+        """检索全部完成后删除日志"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
@@ -4,9 +4,16 @@
 """
 
 import re
+import sys
+from difflib import SequenceMatcher
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
+from normalizer import COMPARISON_NORMALIZER, TITLE_NORMALIZER
+
+
+NON_WORD_PATTERN = re.compile(r'[^\w]')
+
 
 class DifferenceType(Enum):
     """差异类型枚举"""
@@ -18,9 +25,12 @@ class DifferenceType(Enum):
 class FieldDifference:
     """字段差异类"""
     
+    __slots__ = ('field_name', 'original_value', 'scholar_value', 'diff_type')
+    
     def __init__(self, field_name: str, original_value: Optional[str], 
                  scholar_value: Optional[str], diff_type: DifferenceType):
-        self.field_name = field_name
+        # 字段名种类很少，驻留后所有差异记录共享同一个字符串对象
+        self.field_name = sys.intern(field_name)
         self.original_value = original_value
         self.scholar_value = scholar_value
         self.diff_type = diff_type
@@ -30,29 +40,43 @@ class FieldDifference:
 
 
 class EntryComparison:
-    """单个条目的比对结果"""
+    """
+    单个条目的比对结果
+    
+    只保存缺失和不匹配的字段差异，匹配的字段只计数（match_count）。
+    """
+    
+    __slots__ = ('citation_key', 'title', 'differences', 'match_count',
+                 'has_differences', 'title_mismatch', 'scholar_title')
     
     def __init__(self, citation_key: str, title: str):
         self.citation_key = citation_key
         self.title = title
-        self.differences: List[FieldDifference] = []
+        self.differences: List[FieldDifference] = []  # 只包含缺失和不匹配的字段
+        self.match_count = 0  # 匹配的字段数
         self.has_differences = False
         self.title_mismatch = False  # 标记title是否不匹配
         self.scholar_title = None  # Scholar返回的title
     
     def add_difference(self, field_diff: FieldDifference):
-        """添加字段差异"""
+        """添加字段差异，匹配的字段只计数不保存"""
+        if field_diff.diff_type == DifferenceType.MATCH:
+            self.match_count += 1
+            return
         self.differences.append(field_diff)
-        if field_diff.diff_type in [DifferenceType.MISSING, DifferenceType.MISMATCH]:
-            self.has_differences = True
+        self.has_differences = True
+    
+    def add_match(self):
+        """记录一个匹配的字段"""
+        self.match_count += 1
     
     def get_mismatches(self) -> List[FieldDifference]:
         """获取所有不匹配和缺失的字段"""
-        return [d for d in self.differences 
-                if d.diff_type in [DifferenceType.MISSING, DifferenceType.MISMATCH]]
+        return list(self.differences)
     
     def __repr__(self):
-        return f"EntryComparison({self.citation_key}, differences={len(self.differences)})"
+        return (f"EntryComparison({self.citation_key}, differences={len(self.differences)}, "
+                f"matches={self.match_count})")
 
 
 class FieldComparator:
@@ -79,21 +103,7 @@ class FieldComparator:
         Returns:
             规范化后的标题
         """
-        if not title:
-            return ""
-        
-        # 移除LaTeX特殊格式
-        title = re.sub(r'\\text\{([^}]+)\}', r'\1', title)
-        title = re.sub(r'\{\\text\{([^}]+)\}\}', r'\1', title)
-        title = re.sub(r'\{([^}]+)\}', r'\1', title)
-        
-        # 移除标点符号和特殊字符
-        title = re.sub(r'[^\w\s]', ' ', title)
-        
-        # 转换为小写并统一空格
-        title = ' '.join(title.lower().split())
-        
-        return title
+        return TITLE_NORMALIZER.normalize(title)
     
     @staticmethod
     def calculate_title_match_score(title1: str, title2: str) -> Tuple[bool, int]:
@@ -128,6 +138,24 @@ class FieldComparator:
         
         return (is_match, diff_count)
     
+    @staticmethod
+    def title_similarity(title1: str, title2: str) -> float:
+        """
+        计算两个标题的相似度，用于在搜索结果中挑选候选
+        
+        Args:
+            title1: 标题1
+            title2: 标题2
+            
+        Returns:
+            规范化标题的字符相似度，0到1之间
+        """
+        norm_title1 = FieldComparator.normalize_title(title1)
+        norm_title2 = FieldComparator.normalize_title(title2)
+        if norm_title1 == norm_title2:
+            return 1.0
+        return SequenceMatcher(None, norm_title1, norm_title2).ratio()
+    
     @staticmethod
     def normalize_value(value: str, field_name: str) -> str:
         """
@@ -140,47 +168,7 @@ class FieldComparator:
         Returns:
             规范化后的值
         """
-        if not value:
-            return ""
-        
-        value = str(value).strip()
-        
-        # 移除LaTeX命令和特殊格式
-        value = re.sub(r'\\text\{([^}]+)\}', r'\1', value)
-        value = re.sub(r'\{\\text\{([^}]+)\}\}', r'\1', value)
-        value = re.sub(r'\{([^}]+)\}', r'\1', value)  # 移除简单花括号
-        
-        # 处理特殊LaTeX字符
-        latex_chars = {
-            r"\\'e": 'é', r'\\`e': 'è', r'\\^e': 'ê', r'\\"e': 'ë',
-            r"\\'a": 'á', r'\\`a': 'à', r'\\^a': 'â', r'\\"a': 'ä',
-            r"\\'o": 'ó', r'\\`o': 'ò', r'\\^o': 'ô', r'\\"o': 'ö',
-            r'\\~n': 'ñ', r'\\c{c}': 'ç',
-        }
-        for latex, char in latex_chars.items():
-            value = value.replace(latex, char)
-        
-        # 字段特定处理
-        if field_name == 'pages':
-            # 统一页码格式：使用双短横线
-            value = re.sub(r'(\d+)\s*-\s*(\d+)', r'\1--\2', value)
-            value = re.sub(r'(\d+)\s*–\s*(\d+)', r'\1--\2', value)  # em dash
-        
-        elif field_name == 'author':
-            # 规范化作者名
-            value = re.sub(r'\s+', ' ', value)  # 统一空格
-            value = re.sub(r'\s*,\s*', ', ', value)  # 规范化逗号
-            value = re.sub(r'\s+and\s+', ' and ', value, flags=re.IGNORECASE)
-        
-        elif field_name in ['journal', 'booktitle']:
-            # 期刊和会议名：统一空格
-            value = re.sub(r'\s+', ' ', value)
-        
-        elif field_name == 'year':
-            # 只保留数字
-            value = re.sub(r'\D', '', value)
-        
-        return value.strip()
+        return COMPARISON_NORMALIZER.normalize(value, field_name)
     
     @staticmethod
     def values_are_equal(value1: str, value2: str, field_name: str) -> bool:
@@ -207,8 +195,8 @@ class FieldComparator:
         # 对于作者字段，进行更宽松的比较
         if field_name == 'author':
             # 移除所有空格和标点，转换为小写
-            comp1 = re.sub(r'[^\w]', '', norm1).lower()
-            comp2 = re.sub(r'[^\w]', '', norm2).lower()
+            comp1 = NON_WORD_PATTERN.sub('', norm1).lower()
+            comp2 = NON_WORD_PATTERN.sub('', norm2).lower()
             return comp1 == comp2
         
         # 对于年份，只比较数字
@@ -274,8 +262,9 @@ class FieldComparator:
                 # Scholar没有该字段，保持原值，不算差异
                 continue
             elif FieldComparator.values_are_equal(original_value, scholar_value, field):
-                # 值相等
-                diff_type = DifferenceType.MATCH
+                # 值相等，只计数，不创建差异记录
+                comparison.add_match()
+                continue
             else:
                 # 值不匹配
                 diff_type = DifferenceType.MISMATCH
@@ -299,12 +288,17 @@ class FieldComparator:
             EntryComparison对象列表
         """
         comparisons = []
+        # 大小写、花括号或标点不同的同一标题也能找到对应结果
+        normalized_results = {FieldComparator.normalize_title(title): result
+                              for title, result in scholar_results.items() if result is not None}
         
         for original_entry in original_entries:
             title = original_entry.get('title', '')
             
             # 查找对应的Scholar结果
             scholar_entry = scholar_results.get(title)
+            if scholar_entry is None:
+                scholar_entry = normalized_results.get(FieldComparator.normalize_title(title))
             
             if scholar_entry is None:
                 # 如果Scholar没有找到结果，跳过
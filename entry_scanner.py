@@ -0,0 +1,101 @@
+"""
+条目边界扫描模块
+按花括号深度线性扫描BibTeX内容，找出每个条目的字节区间，并报告格式错误的条目
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional
+
+
+# 条目起始位置，如 @article{ 或 @article(
+ENTRY_START_PATTERN = re.compile(rb'@[ \t\r\n]*(\w+)[ \t\r\n]*([{(])')
+
+# 扫描条目内部时关心的记号：花括号、圆括号，以及行首出现的新条目
+ENTRY_TOKEN_PATTERN = re.compile(rb'[{}()]|\n[ \t]*@[ \t]*\w+[ \t]*[{(]')
+
+
+class EntrySpan(NamedTuple):
+    """条目在文件中的字节区间"""
+    entry_type: str
+    start: int  # '@' 的偏移
+    end: int  # 结束定界符之后的偏移；格式错误时为下一个条目或文件末尾的偏移
+    line: int  # 条目起始行号（从1开始）
+    error: Optional[str] = None  # 格式错误说明，正常条目为None
+
+
+def scan_entries(data, position: int = 0) -> Iterator[EntrySpan]:
+    """
+    扫描BibTeX内容中的条目
+    
+    每个字节最多被检查常数次，因此对任何输入都是O(n)的。条目体内遇到
+    行首的 @type{ 时认为当前条目缺少结束定界符，报告错误后从新条目继续扫描。
+    
+    Args:
+        data: BibTeX字节内容（bytes或mmap）
+        position: 开始扫描的偏移
+    
+    Yields:
+        EntrySpan，格式错误的条目带有error说明
+    """
+    size = len(data)
+    line = 1
+    line_position = 0
+    
+    while position < size:
+        match = ENTRY_START_PATTERN.search(data, position)
+        if match is None:
+            return
+        
+        start = match.start()
+        # 增量统计行号，总共只统计一遍
+        line += data[line_position:start].count(b'\n')
+        line_position = start
+        
+        entry_type = match.group(1).decode('ascii')
+        parenthesized = match.group(2) == b'('
+        depth = 0 if parenthesized else 1
+        end = None
+        error = None
+        
+        for token in ENTRY_TOKEN_PATTERN.finditer(data, match.end()):
+            value = token.group()
+            if len(value) > 1:
+                # 行首出现新的条目，当前条目没有闭合
+                end = token.start() + 1
+                next_line = line + data[start:end].count(b'\n')
+                error = f"unterminated entry, next entry starts at line {next_line}"
+                break
+            if value == b'{':
+                depth += 1
+            elif value == b'}':
+                depth -= 1
+                if depth == 0 and not parenthesized:
+                    end = token.end()
+                    break
+                if depth < 0:
+                    end = token.end()
+                    error = "unbalanced closing brace"
+                    break
+            elif value == b')' and parenthesized and depth == 0:
+                end = token.end()
+                break
+        
+        if end is None:
+            end = size
+            error = "unterminated entry at end of file"
+        
+        yield EntrySpan(entry_type, start, end, line, error)
+        position = end
+
+
+def find_malformed_entries(data) -> List[EntrySpan]:
+    """
+    找出所有格式错误的条目
+    
+    Args:
+        data: BibTeX字节内容
+    
+    Returns:
+        格式错误的条目列表
+    """
+    return [span for span in scan_entries(data) if span.error is not None]
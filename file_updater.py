@@ -5,8 +5,9 @@
 
 import os
 import json
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from datetime import datetime
+from atomic_writer import atomic_write
 from parser import BibTeXParser
 from comparator import EntryComparison, FieldComparator
 from colorama import Fore, Style
@@ -112,7 +113,8 @@ class FileUpdater:
             是否成功保存
         """
         try:
-            self.parser.save(output_path)
+            # 只重写修改过的条目，其余内容保持原样
+            self.parser.save(output_path, incremental=True)
             
             save_path = output_path or self.parser.filepath
             print(f"\n{Fore.GREEN}✓ 修改已保存到: {save_path}{Style.RESET_ALL}")
@@ -136,7 +138,7 @@ class FileUpdater:
             log_path = f"{self.parser.filepath}.update_log.json"
         
         try:
-            with open(log_path, 'w', encoding='utf-8') as f:
+            with atomic_write(log_path) as f:
                 json.dump(self.update_log, f, indent=2, ensure_ascii=False)
             
             print(f"{Fore.CYAN}ℹ 更新日志已保存到: {log_path}{Style.RESET_ALL}")
@@ -144,19 +146,20 @@ class FileUpdater:
             print(f"{Fore.YELLOW}⚠ 无法保存更新日志: {str(e)}{Style.RESET_ALL}")
     
     def generate_html_report(self, comparisons: List[EntryComparison], 
-                           selected_keys: Set[str], output_path: str):
+                           selected_keys: Set[str], output_path: str, total: Optional[int] = None):
         """
         生成HTML格式的差异报告
         
         Args:
-            comparisons: 比对结果列表
+            comparisons: 比对结果列表，可以只包含有差异的条目
             selected_keys: 选中的引用键集合
             output_path: 输出文件路径
+            total: 比对的条目总数，为None时使用comparisons的长度
         """
-        html_content = self._generate_html_content(comparisons, selected_keys)
+        html_content = self._generate_html_content(comparisons, selected_keys, total)
         
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
+            with atomic_write(output_path) as f:
                 f.write(html_content)
             
             print(f"{Fore.CYAN}ℹ HTML报告已生成: {output_path}{Style.RESET_ALL}")
@@ -164,8 +167,10 @@ class FileUpdater:
             print(f"{Fore.YELLOW}⚠ 无法生成HTML报告: {str(e)}{Style.RESET_ALL}")
     
     def _generate_html_content(self, comparisons: List[EntryComparison], 
-                               selected_keys: Set[str]) -> str:
+                               selected_keys: Set[str], total: Optional[int] = None) -> str:
         """生成HTML内容"""
+        if total is None:
+            total = len(comparisons)
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         # 分离title不匹配和正常差异
@@ -275,7 +280,7 @@ class FileUpdater:
         
         <div class="summary">
             <h2>摘要</h2>
-            <p>总共检查: {len(comparisons)} 条参考文献</p>
+            <p>总共检查: {total} 条参考文献</p>
             <p>标题不匹配: {len(title_mismatch_entries)} 条</p>
             <p>字段差异: {len(normal_diff_entries)} 条</p>
             <p>选择修正: {len(selected_keys)} 条</p>
@@ -0,0 +1,225 @@
+"""
+Google Scholar HTTP检索模块
+不启动浏览器，通过复用连接的HTTP会话直接获取搜索结果页、引用对话框和scholar.bib，并解析HTML
+"""
+
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from parser import parse_bibtex_string
+from rate_limiter import AdaptiveDelay
+from scholar_scraper import SCHOLAR_BASE_URL, USER_AGENT, best_candidate, cite_dialog_params, clean_result_title
+from search_backend import SearchBackend
+
+
+# 连接池大小；每个后端实例顺序发送请求，保持少量长连接即可
+HTTP_POOL_SIZE = 4
+
+
+class ScholarResultsParser(HTMLParser):
+    """解析搜索结果页，提取每个结果的引用ID（data-cid）和标题"""
+    
+    def __init__(self):
+        super().__init__()
+        self.results: List[Dict[str, str]] = []
+        self.captcha = False
+        self._in_title = False
+        self._title_parts: List[str] = []
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if attrs.get('id') == 'gs_captcha_f':
+            self.captcha = True
+        classes = (attrs.get('class') or '').split()
+        if tag == 'div' and 'gs_or' in classes and attrs.get('data-cid'):
+            self.results.append({'cid': attrs['data-cid'], 'title': ''})
+        elif tag == 'h3' and 'gs_rt' in classes and self.results:
+            self._in_title = True
+            self._title_parts = []
+    
+    def handle_endtag(self, tag):
+        if tag == 'h3' and self._in_title:
+            self._in_title = False
+            self.results[-1]['title'] = clean_result_title(''.join(self._title_parts))
+    
+    def handle_data(self, data):
+        if self._in_title:
+            self._title_parts.append(data)
+
+
+class CiteDialogParser(HTMLParser):
+    """解析引用对话框，提取BibTeX链接"""
+    
+    def __init__(self):
+        super().__init__()
+        self.bibtex_url: Optional[str] = None
+        self._href = None
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._href = dict(attrs).get('href')
+    
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            self._href = None
+    
+    def handle_data(self, data):
+        if self._href and self.bibtex_url is None and data.strip() == 'BibTeX':
+            self.bibtex_url = self._href
+
+
+class CaptchaError(Exception):
+    """Scholar返回了验证码页面或拒绝请求"""
+
+
+class HttpScholarBackend(SearchBackend):
+    """基于HTTP请求的Scholar检索后端，接口与ScholarScraper相同"""
+    
+    def __init__(self, delay_range: tuple = (2, 4), result_cache=None, rate_limiter=None,
+                 rate_controller: Optional[AdaptiveDelay] = None, base_url: str = SCHOLAR_BASE_URL,
+                 timeout: float = 15.0):
+        """
+        初始化HTTP后端
+        
+        Args:
+            delay_range: 请求间隔的下限和上限（秒），格式为(min, max)
+            result_cache: 检索结果缓存（ResultCache），为None时不使用缓存
+            rate_limiter: 请求限速器（TokenBucket），每次请求前取一个令牌
+            rate_controller: 自适应间隔控制器，多个后端可以共享；默认按delay_range新建
+            base_url: Scholar根地址，测试时指向模拟服务器
+            timeout: 单个请求的超时时间（秒）
+        """
+        super().__init__(result_cache)
+        self.delay_range = delay_range
+        self.rate_controller = rate_controller or AdaptiveDelay(delay_range[0], delay_range[1])
+        self.rate_limiter = rate_limiter
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
+        self.timeout = timeout
+        # 本次检索中没有受阻时才缩短间隔
+        self._healthy = True
+        
+        # 同一会话内的请求复用TCP/TLS连接，省去每次握手
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+    
+    def _get(self, url: str, params: Optional[Dict] = None, phase: str = 'search') -> requests.Response:
+        """
+        发送GET请求，记录响应耗时
+        
+        Args:
+            url: 请求地址
+            params: 查询参数
+            phase: 检索阶段名称（search、cite或bibtex），用于耗时统计
+        
+        Raises:
+            CaptchaError: 遇到验证码或被限流
+            requests.RequestException: 网络错误或其他HTTP错误
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        started = time.monotonic()
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        elapsed = time.monotonic() - started
+        self._record_timing(phase, elapsed)
+        if self.rate_controller.observe_response(elapsed):
+            self._healthy = False
+        
+        if response.status_code == 429 or '/sorry/' in response.url:
+            raise CaptchaError(f"HTTP {response.status_code} from {response.url}")
+        response.raise_for_status()
+        return response
+    
+    def _delay(self):
+        """按自适应控制器给出的间隔延迟"""
+        time.sleep(self.rate_controller.next_delay())
+    
+    def search_paper(self, title: str) -> Optional[Dict]:
+        """
+        搜索论文并获取BibTeX信息
+        
+        Args:
+            title: 论文标题
+        
+        Returns:
+            BibTeX字典，如果失败返回None
+        """
+        self.last_lookup_status = 'error'
+        self.last_bibtex_text = None
+        self._healthy = True
+        
+        try:
+            self.logger.info(f"Searching: {title}")
+            page = self._get(urljoin(self.base_url, 'scholar'), {'hl': 'en', 'q': title})
+            results_parser = ScholarResultsParser()
+            results_parser.feed(page.text)
+            if results_parser.captcha:
+                raise CaptchaError("CAPTCHA page")
+            
+            if not results_parser.results:
+                self.logger.warning(f"No search results found for: {title}")
+                self.last_lookup_status = 'not_found'
+                self.rate_controller.record_pushback('empty results')
+                return None
+            
+            # 与浏览器后端一致，只为与查询标题足够相似的结果请求引用对话框
+            cid = results_parser.results[0]['cid']
+            candidates = [result for result in results_parser.results if result['title']]
+            if candidates:
+                index, score = best_candidate(title, [result['title'] for result in candidates])
+                if index is None:
+                    self.logger.warning(f"No search result similar enough (best {score:.2f}) for: {title}")
+                    self.last_lookup_status = 'not_found'
+                    return None
+                cid = candidates[index]['cid']
+            self._delay()
+            cite_page = self._get(urljoin(self.base_url, 'scholar'), cite_dialog_params(cid), phase='cite')
+            cite_parser = CiteDialogParser()
+            cite_parser.feed(cite_page.text)
+            if cite_parser.bibtex_url is None:
+                self.logger.warning(f"No BibTeX link found for: {title}")
+                return None
+            self._delay()
+            
+            # scholar.bib不一定声明字符集，按UTF-8解码
+            bibtex_response = self._get(urljoin(self.base_url, cite_parser.bibtex_url), phase='bibtex')
+            bibtex_text = bibtex_response.content.decode('utf-8', errors='replace').strip()
+            if not bibtex_text.startswith('@'):
+                self.logger.warning(f"Failed to extract BibTeX for: {title}")
+                return None
+            
+            bibtex_dict = parse_bibtex_string(bibtex_text)
+            if not bibtex_dict:
+                # 解析失败按出错处理，不缓存
+                self.logger.warning(f"Failed to parse BibTeX for: {title}")
+                return None
+            self.last_lookup_status = 'found'
+            self.last_bibtex_text = bibtex_text
+            if self._healthy:
+                self.rate_controller.record_success()
+            self.logger.info(f"Successfully retrieved BibTeX for: {title}")
+            self._delay()
+            return bibtex_dict
+        
+        except CaptchaError as e:
+            # HTTP后端无法让用户处理验证码，放慢速度，留给下次或浏览器后端重新检索
+            self.logger.warning(f"CAPTCHA or rate limit while searching '{title}': {str(e)}")
+            self.rate_controller.record_pushback('captcha')
+            return None
+        except Exception as e:
+            self.logger.error(f"Error searching paper '{title}': {str(e)}")
+            return None
+    
+    def close(self):
+        """关闭HTTP会话及其连接池"""
+        self.session.close()
@@ -3,7 +3,7 @@
 提供批量审查和选择差异修正的功能
 """
 
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 from tabulate import tabulate
 from colorama import Fore, Style, init
 from comparator import EntryComparison, DifferenceType
@@ -289,14 +289,31 @@ def display_progress(current: int, total: int):
         print()  # 完成后换行
 
 
-def display_summary(comparisons: List[EntryComparison]):
+def display_streamed_comparison(comparison: EntryComparison):
+    """
+    检索过程中显示一条刚比对出差异的条目，随后进度条在下一行重新绘制
+    
+    Args:
+        comparison: 比对结果
+    """
+    # 清除当前的进度条
+    print('\r' + ' ' * 100 + '\r', end='')
+    if comparison.title_mismatch:
+        print(f"  {Fore.RED}⚠ {comparison.citation_key}: 标题不匹配{Style.RESET_ALL}")
+    elif comparison.has_differences:
+        print(f"  {Fore.YELLOW}✗ {comparison.citation_key}: {len(comparison.differences)} 个字段存在差异{Style.RESET_ALL}")
+
+
+def display_summary(comparisons: List[EntryComparison], total: Optional[int] = None):
     """
     显示摘要信息
     
     Args:
-        comparisons: 比对结果列表
+        comparisons: 比对结果列表，可以只包含有差异的条目
+        total: 比对的条目总数，为None时使用comparisons的长度
     """
-    total = len(comparisons)
+    if total is None:
+        total = len(comparisons)
     with_differences = sum(1 for c in comparisons if c.has_differences)
     
     print(f"\n{Fore.CYAN}{'='*80}{Style.RESET_ALL}")
@@ -5,15 +5,27 @@ BibTeX参考文献检查与修正工具
 """
 
 import argparse
+import os
+import subprocess
 import sys
 import logging
+from functools import partial
 from typing import Optional
 from colorama import Fore, Style, init
 
 from parser import BibTeXParser
-from scholar_scraper import ScholarScraper
-from comparator import FieldComparator
-from interactive_review import InteractiveReviewer, display_progress, display_summary
+from parse_cache import ParseCache, DEFAULT_CACHE_DIR
+from scholar_scraper import ScholarScraper, DEFAULT_PROFILE_DIR
+from scraper_pool import ScraperPool
+from http_scraper import HttpScholarBackend, SCHOLAR_BASE_URL
+from offline_index import OfflineBackend, DEFAULT_INDEX_PATH
+from rate_limiter import TokenBucket
+from checkpoint import CheckpointJournal
+from checker_daemon import DaemonClient, DaemonError, DEFAULT_SOCKET_PATH
+from result_cache import ResultCache, DEFAULT_RESULT_CACHE_PATH, DEFAULT_TTL_DAYS, DEFAULT_NEGATIVE_TTL_DAYS
+from normalizer import normalization_stats
+from pipeline import ComparisonPipeline
+from interactive_review import InteractiveReviewer, display_progress, display_streamed_comparison, display_summary
 from file_updater import FileUpdater
 
 
@@ -54,17 +66,83 @@ def parse_arguments():
         help='BibTeX文件路径'
     )
     
+    parser.add_argument(
+        '--backend',
+        choices=['scholar', 'http', 'offline'],
+        default='scholar',
+        help='元数据来源：scholar（浏览器访问Google Scholar，默认）、http（直接HTTP请求Google Scholar，'
+             '不启动浏览器）或offline（本地DBLP/Crossref索引，不需要浏览器和网络）'
+    )
+    
+    parser.add_argument(
+        '--scholar-url',
+        type=str,
+        default=SCHOLAR_BASE_URL,
+        help=f'Scholar地址（可指向mock_scholar.py启动的模拟服务器），默认: {SCHOLAR_BASE_URL}'
+    )
+    
+    parser.add_argument(
+        '--index',
+        type=str,
+        default=DEFAULT_INDEX_PATH,
+        help=f'离线索引数据库（offline_index.py build生成），默认: {DEFAULT_INDEX_PATH}'
+    )
+    
+    parser.add_argument(
+        '--daemon',
+        nargs='?',
+        const=DEFAULT_SOCKET_PATH,
+        metavar='SOCKET',
+        help=f'通过已启动的检查守护进程（python checker_daemon.py serve）检索，浏览器无需重新启动；'
+             f'默认套接字: {DEFAULT_SOCKET_PATH}'
+    )
+    
     parser.add_argument(
         '--headless',
         action='store_true',
         help='使用无头浏览器模式（不显示浏览器窗口）'
     )
     
+    parser.add_argument(
+        '--lean',
+        action='store_true',
+        help='浏览器精简模式：屏蔽样式表、字体、图片和统计脚本，页面DOM就绪后即开始识别'
+    )
+    
+    parser.add_argument(
+        '--profile-dir',
+        nargs='?',
+        const=DEFAULT_PROFILE_DIR,
+        metavar='DIR',
+        help=f'保留浏览器配置（Cookie等）的目录，多次运行之间复用；默认目录: {DEFAULT_PROFILE_DIR}'
+    )
+    
     parser.add_argument(
         '--delay',
         type=str,
         default='2-4',
-        help='搜索延迟范围（秒），格式: min-max，默认: 2-4'
+        help='请求间隔的下限和上限（秒），格式: min-max，默认: 2-4；实际间隔根据Scholar的响应在此范围内自动调整'
+    )
+    
+    parser.add_argument(
+        '--browsers',
+        type=int,
+        default=1,
+        help='并行检索的浏览器数量（http后端为并发会话数），默认: 1'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=20,
+        help='所有浏览器合计的Scholar请求速率上限（次/分钟），默认: 20'
+    )
+    
+    parser.add_argument(
+        '--burst',
+        type=int,
+        default=3,
+        help='允许的突发请求数，默认: 3'
     )
     
     parser.add_argument(
@@ -85,6 +163,71 @@ def parse_arguments():
         help='限制检查的文献数量（用于测试）'
     )
     
+    parser.add_argument(
+        '--lazy',
+        action='store_true',
+        help='延迟加载模式：内存映射文件，只解析实际检查的条目（适用于超大文件）'
+    )
+    
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='解析BibTeX文件的进程数，大文件按条目切分后并行解析，默认: 1'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='不使用解析缓存，每次都重新解析BibTeX文件'
+    )
+    
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help=f'解析缓存目录，默认: {DEFAULT_CACHE_DIR}'
+    )
+    
+    parser.add_argument(
+        '--result-cache',
+        type=str,
+        default=DEFAULT_RESULT_CACHE_PATH,
+        help=f'Scholar检索结果缓存数据库，默认: {DEFAULT_RESULT_CACHE_PATH}'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=DEFAULT_TTL_DAYS,
+        help=f'检索结果缓存有效期（天），默认: {DEFAULT_TTL_DAYS}'
+    )
+    
+    parser.add_argument(
+        '--negative-ttl',
+        type=float,
+        default=DEFAULT_NEGATIVE_TTL_DAYS,
+        help=f'未找到结果的缓存有效期（天），默认: {DEFAULT_NEGATIVE_TTL_DAYS}'
+    )
+    
+    parser.add_argument(
+        '--no-result-cache',
+        action='store_true',
+        help='不使用检索结果缓存，所有标题都重新检索'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='从上次中断处继续，跳过断点日志中已完成检索的标题'
+    )
+    
+    parser.add_argument(
+        '--captcha-command',
+        type=str,
+        help='需要处理验证码时执行的命令（如发送桌面通知），推迟的标题数通过环境变量BIB_CHECKER_DEFERRED传入'
+    )
+    
     return parser.parse_args()
 
 
@@ -107,6 +250,31 @@ def parse_delay_range(delay_str: str) -> tuple:
         return (2, 4)
 
 
+def make_captcha_notifier(command: Optional[str] = None):
+    """
+    创建验证码通知回调：终端响铃提示，并执行用户指定的命令
+    
+    Args:
+        command: 通知命令，为None时只在终端提示
+    
+    Returns:
+        接受推迟标题列表的回调函数
+    """
+    logger = logging.getLogger(__name__)
+    
+    def notify(titles: list):
+        print(f"\n\a{Fore.RED}⚠ {len(titles)} 条文献遇到验证码，其余文献已检索完毕；"
+              f"请在浏览器中处理验证码后按回车，程序将重新检索这些文献{Style.RESET_ALL}")
+        if command:
+            env = dict(os.environ, BIB_CHECKER_DEFERRED=str(len(titles)))
+            try:
+                subprocess.run(command, shell=True, env=env, timeout=60)
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.warning(f"CAPTCHA notification command failed: {str(e)}")
+    
+    return notify
+
+
 def print_banner():
     """打印程序横幅"""
     banner = f"""
@@ -123,6 +291,128 @@ def print_banner():
     print(banner)
 
 
+def stream_comparisons(backend, entries: list, journal=None) -> tuple:
+    """
+    检索并比对所有条目，比对出差异的条目立即显示
+    
+    Args:
+        backend: 检索后端或ScraperPool
+        entries: 原始条目列表
+        journal: 断点日志（CheckpointJournal）
+    
+    Returns:
+        (有差异或标题不匹配的比对结果列表, ComparisonPipeline)
+    """
+    pipeline = ComparisonPipeline(backend, journal=journal, progress_callback=display_progress)
+    total = sum(1 for entry in entries if entry.get('title'))
+    # 只保留有差异的比对结果，内存占用与条目总数无关
+    comparisons = []
+    for comparison in pipeline.run(entries, total):
+        if comparison.has_differences:
+            display_streamed_comparison(comparison)
+            comparisons.append(comparison)
+    return comparisons, pipeline
+
+
+def search_with_daemon(args, client: DaemonClient, entries: list) -> tuple:
+    """
+    通过守护进程检索所有条目并比对
+    
+    Args:
+        args: 命令行参数
+        client: 守护进程客户端
+        entries: 原始条目列表
+    
+    Returns:
+        (有差异或标题不匹配的比对结果列表, ComparisonPipeline)
+    """
+    print(f"{Fore.YELLOW}[2/5] 通过守护进程从Google Scholar搜索验证...{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}ℹ 守护进程: {args.daemon}{Style.RESET_ALL}\n")
+    
+    journal = CheckpointJournal(args.bibfile)
+    resumed = journal.open(resume=args.resume)
+    if resumed:
+        print(f"{Fore.CYAN}ℹ 从断点继续: 已完成 {resumed} 条{Style.RESET_ALL}\n")
+    try:
+        comparisons, pipeline = stream_comparisons(client, entries, journal)
+    finally:
+        journal.close()
+    journal.discard()
+    
+    print(f"\n{Fore.CYAN}ℹ 守护进程缓存命中 {client.cache_hits} 条{Style.RESET_ALL}")
+    return comparisons, pipeline
+
+
+def search_scholar(args, entries: list, delay_range: tuple) -> tuple:
+    """
+    从Google Scholar检索所有条目并比对
+    
+    Args:
+        args: 命令行参数
+        entries: 原始条目列表
+        delay_range: 请求间隔的下限和上限
+    
+    Returns:
+        (有差异或标题不匹配的比对结果列表, ComparisonPipeline)
+    """
+    logger = logging.getLogger(__name__)
+    
+    use_http = args.backend == 'http'
+    print(f"{Fore.YELLOW}[2/5] 从Google Scholar搜索验证...{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}ℹ 请求间隔: {delay_range[0]}-{delay_range[1]}秒（自动调整）{Style.RESET_ALL}")
+    if use_http:
+        print(f"{Fore.CYAN}ℹ HTTP模式: {args.scholar_url}{Style.RESET_ALL}")
+    else:
+        print(f"{Fore.CYAN}ℹ 无头模式: {'是' if args.headless else '否'}，"
+              f"精简模式: {'是' if args.lean else '否'}{Style.RESET_ALL}")
+        if args.profile_dir:
+            print(f"{Fore.CYAN}ℹ 浏览器配置目录: {args.profile_dir}{Style.RESET_ALL}")
+        if args.scholar_url != SCHOLAR_BASE_URL:
+            print(f"{Fore.CYAN}ℹ Scholar地址: {args.scholar_url}{Style.RESET_ALL}")
+    print(f"{Fore.CYAN}ℹ 并行数量: {args.browsers}，请求速率上限: {args.rate:g}次/分钟{Style.RESET_ALL}\n")
+    
+    result_cache = None
+    if not args.no_result_cache:
+        result_cache = ResultCache(args.result_cache, ttl_days=args.cache_ttl,
+                                   negative_ttl_days=args.negative_ttl)
+    journal = CheckpointJournal(args.bibfile)
+    resumed = journal.open(resume=args.resume)
+    if resumed:
+        print(f"{Fore.CYAN}ℹ 从断点继续: 已完成 {resumed} 条{Style.RESET_ALL}\n")
+    try:
+        rate_limiter = TokenBucket.per_minute(args.rate, burst=args.burst)
+        if use_http:
+            factory = partial(HttpScholarBackend, base_url=args.scholar_url)
+        else:
+            factory = partial(ScholarScraper, headless=args.headless, base_url=args.scholar_url,
+                              lean=args.lean, profile_dir=args.profile_dir)
+        if args.browsers > 1:
+            scraper = ScraperPool(workers=args.browsers, delay_range=delay_range, rate_limiter=rate_limiter,
+                                  result_cache=result_cache, scraper_factory=factory)
+        else:
+            scraper = factory(delay_range=delay_range, result_cache=result_cache, rate_limiter=rate_limiter)
+        # 遇到验证码的文献推迟到最后，统一处理一次验证码后重新检索
+        scraper.captcha_hook = make_captcha_notifier(args.captcha_command)
+        with scraper:
+            comparisons, pipeline = stream_comparisons(scraper, entries, journal)
+            cache_hits = scraper.cache_hits
+            controller_stats = scraper.rate_controller.stats()
+    finally:
+        journal.close()
+        if result_cache is not None:
+            result_cache.close()
+    
+    # 检索全部完成，不再需要断点
+    journal.discard()
+    
+    if result_cache is not None:
+        print(f"\n{Fore.CYAN}ℹ 缓存命中 {cache_hits} 条{Style.RESET_ALL}")
+    logger.info(f"Rate controller: final delay {controller_stats['delay']:.2f}s "
+                f"({controller_stats['requests_per_minute']:.1f} req/min), "
+                f"pushbacks {controller_stats['pushbacks']}")
+    return comparisons, pipeline
+
+
 def main():
     """主函数"""
     args = parse_arguments()
@@ -136,16 +426,25 @@ def main():
     
     # 解析延迟范围
     delay_range = parse_delay_range(args.delay)
+    if args.rate <= 0:
+        print(f"{Fore.YELLOW}⚠ 无效的请求速率，使用默认值 20次/分钟{Style.RESET_ALL}")
+        args.rate = 20
     
     print(f"{Fore.CYAN}正在处理: {args.bibfile}{Style.RESET_ALL}\n")
     
     try:
         # 步骤1: 解析BibTeX文件
         print(f"{Fore.YELLOW}[1/5] 解析BibTeX文件...{Style.RESET_ALL}")
-        parser = BibTeXParser(args.bibfile)
+        parse_cache = None if args.no_cache else ParseCache(args.cache_dir)
+        parser = BibTeXParser(args.bibfile, lazy=args.lazy, cache=parse_cache, workers=args.jobs)
         parser.parse()
         entries = parser.get_entries()
         
+        if parser.malformed_entries:
+            print(f"{Fore.YELLOW}⚠ 跳过 {len(parser.malformed_entries)} 条格式错误的条目:{Style.RESET_ALL}")
+            for span in parser.malformed_entries:
+                print(f"{Fore.YELLOW}  第 {span.line} 行 @{span.entry_type}: {span.error}{Style.RESET_ALL}")
+        
         if not entries:
             print(f"{Fore.RED}✗ 未找到任何BibTeX条目{Style.RESET_ALL}")
             return 1
@@ -157,33 +456,44 @@ def main():
         
         print(f"{Fore.GREEN}✓ 找到 {len(entries)} 条参考文献{Style.RESET_ALL}\n")
         
-        # 步骤2: 从Google Scholar搜索
-        print(f"{Fore.YELLOW}[2/5] 从Google Scholar搜索验证...{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}ℹ 延迟范围: {delay_range[0]}-{delay_range[1]}秒{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}ℹ 无头模式: {'是' if args.headless else '否'}{Style.RESET_ALL}\n")
-        
-        # 提取标题
-        titles = [entry.get('title', '') for entry in entries if entry.get('title')]
-        
-        # 搜索
-        with ScholarScraper(headless=args.headless, delay_range=delay_range) as scraper:
-            scholar_results = scraper.batch_search(titles, progress_callback=display_progress)
+        # 步骤2、3: 检索元数据，每个结果到达后立即比对字段
+        if args.backend == 'offline':
+            if not os.path.exists(args.index):
+                print(f"{Fore.RED}✗ 错误: 找不到离线索引 {args.index}，请先运行 python offline_index.py build{Style.RESET_ALL}")
+                return 1
+            print(f"{Fore.YELLOW}[2/5] 从离线索引检索验证...{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}ℹ 离线索引: {args.index}{Style.RESET_ALL}\n")
+            with OfflineBackend(args.index) as backend:
+                comparisons, pipeline = stream_comparisons(backend, entries)
+        elif args.daemon:
+            client = DaemonClient(args.daemon)
+            try:
+                client.ping()
+            except DaemonError:
+                print(f"{Fore.RED}✗ 错误: 检查守护进程未运行，请先运行 python checker_daemon.py serve{Style.RESET_ALL}")
+                return 1
+            comparisons, pipeline = search_with_daemon(args, client, entries)
+        else:
+            comparisons, pipeline = search_scholar(args, entries, delay_range)
         
-        successful_searches = sum(1 for v in scholar_results.values() if v is not None)
-        print(f"\n{Fore.GREEN}✓ 成功检索 {successful_searches}/{len(titles)} 条{Style.RESET_ALL}\n")
+        print(f"\n{Fore.GREEN}✓ 成功检索 {pipeline.found}/{pipeline.lookups} 条{Style.RESET_ALL}")
+        if pipeline.coalesced:
+            print(f"{Fore.CYAN}ℹ {pipeline.coalesced} 条文献与其他条目标题相同，合并检索节省 {pipeline.coalesced} 次检索{Style.RESET_ALL}")
+        print()
         
-        # 步骤3: 比对字段
         print(f"{Fore.YELLOW}[3/5] 比对字段差异...{Style.RESET_ALL}")
-        comparisons = FieldComparator.compare_batch(entries, scholar_results)
-        
-        if not comparisons:
+        if not pipeline.compared:
             print(f"{Fore.YELLOW}⚠ 没有可比对的结果{Style.RESET_ALL}")
             return 0
         
-        print(f"{Fore.GREEN}✓ 完成比对{Style.RESET_ALL}\n")
+        print(f"{Fore.GREEN}✓ 完成比对 {pipeline.compared} 条{Style.RESET_ALL}\n")
+        
+        for name, stats in normalization_stats().items():
+            logger.info(f"Normalization cache [{name}]: {stats['hits']} hits, {stats['misses']} misses, "
+                        f"hit rate {stats['hit_rate']:.1%}, size {stats['size']}/{stats['maxsize']}")
         
         # 显示摘要
-        display_summary(comparisons)
+        display_summary(comparisons, total=pipeline.compared)
         
         # 步骤4: 交互式审查
         print(f"\n{Fore.YELLOW}[4/5] 交互式审查...{Style.RESET_ALL}\n")
@@ -234,7 +544,7 @@ def main():
             
             # 生成HTML报告（如果指定）
             if args.output:
-                updater.generate_html_report(comparisons, selected_keys, args.output)
+                updater.generate_html_report(comparisons, selected_keys, args.output, total=pipeline.compared)
         else:
             print(f"\n{Fore.RED}✗ 保存失败{Style.RESET_ALL}")
             return 1
@@ -250,6 +560,8 @@ def main():
         
     except KeyboardInterrupt:
         print(f"\n\n{Fore.YELLOW}⚠ 用户中断操作{Style.RESET_ALL}")
+        if args.backend != 'offline' and os.path.exists(CheckpointJournal(args.bibfile).path):
+            print(f"{Fore.CYAN}ℹ 已完成的检索已保存，使用 --resume 可从断点继续{Style.RESET_ALL}")
         return 130
     
     except FileNotFoundError:
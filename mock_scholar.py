@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Google Scholar模拟服务器
+在本地提供与Scholar结构相同的搜索结果页、引用对话框和scholar.bib，用于测试检索后端和压测
+
+命令行用法:
+  python mock_scholar.py sample.bib --port 8000 --latency 0.05
+  python mock_scholar.py sample.bib --captcha-every 20 --error-every 50
+"""
+
+import argparse
+import hashlib
+import html
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from normalizer import TITLE_NORMALIZER
+from parser import BibTeXParser, parse_bibtex_string
+
+
+RESULTS_PER_PAGE = 10
+
+RESULT_TEMPLATE = (
+    '<div class="gs_r gs_or gs_scl" data-cid="{cid}" data-rp="{rank}">'
+    '<div class="gs_ri"><h3 class="gs_rt" ontouchstart="gs_evt_dsp(event)">'
+    '<a id="{cid}" href="https://example.org/{cid}">{title}</a></h3>'
+    '<div class="gs_a">{authors} - {venue}, {year}</div>'
+    '<div class="gs_fl gs_flb"><a href="javascript:void(0)" class="gs_or_cit gs_or_btn gs_nph" '
+    'role="button" aria-controls="gs_cit" aria-label="Cite">Cite</a></div></div></div>'
+)
+
+CITE_TEMPLATE = (
+    '<div id="gs_citt"><table><tr><th class="gs_cith">MLA</th><td><div class="gs_citr">{title}.</div></td></tr>'
+    '</table></div><div id="gs_citi">'
+    '<a class="gs_citi" href="/scholar.bib?q=info:{cid}:scholar.google.com/&amp;output=citation'
+    '&amp;scisdr=mock&amp;scisig=mock&amp;scisf=4&amp;ct=citation&amp;cd=-1&amp;hl=en">BibTeX</a> '
+    '<a class="gs_citi" href="/scholar.enw?q=info:{cid}:scholar.google.com/&amp;output=citation">EndNote</a></div>'
+)
+
+# 点击Cite按钮时加载引用对话框，使浏览器后端也能在模拟服务器上完成检索
+CITE_SCRIPT = (
+    '<div id="gs_cit"></div><script>'
+    'document.addEventListener("click", function (event) {'
+    'var button = event.target.closest(".gs_or_cit"); if (!button) { return; }'
+    'var cid = button.closest(".gs_or").getAttribute("data-cid");'
+    'fetch("/scholar?q=info:" + cid + ":scholar.google.com/&output=cite&hl=en")'
+    '.then(function (response) { return response.text(); })'
+    '.then(function (html) { document.getElementById("gs_cit").innerHTML = html; });'
+    '});</script>'
+)
+
+CAPTCHA_PAGE = (
+    '<html><body><form id="gs_captcha_f" method="post"><h1>Please show you&#39;re not a robot</h1>'
+    '</form></body></html>'
+)
+
+
+class _Paper:
+    """模拟数据库中的一篇论文"""
+    
+    def __init__(self, bibtex: str):
+        self.bibtex = bibtex.strip()
+        self.entry = parse_bibtex_string(self.bibtex)
+        self.title = self.entry.get('title', '')
+        self.words = set(TITLE_NORMALIZER.normalize(self.title).split())
+        self.cid = hashlib.sha1(self.entry.get('ID', self.title).encode('utf-8')).hexdigest()[:12]
+
+
+class MockScholarServer:
+    """在后台线程运行的模拟Scholar服务器"""
+    
+    def __init__(self, bibtex_entries: List[str], host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, captcha_every: int = 0, error_every: int = 0):
+        """
+        初始化模拟服务器
+        
+        Args:
+            bibtex_entries: 作为"Scholar数据库"的BibTeX条目文本
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            latency: 每个请求的模拟延迟（秒）
+            captcha_every: 每隔多少次搜索返回一次验证码页面，0表示从不
+            error_every: 每隔多少个请求（任意类型）返回一次503错误，0表示从不
+        """
+        self.papers = [_Paper(bibtex) for bibtex in bibtex_entries]
+        self.papers_by_cid = {paper.cid: paper for paper in self.papers}
+        self.latency = latency
+        self.captcha_every = captcha_every
+        self.error_every = error_every
+        self.requests: Dict[str, int] = {}
+        # 返回验证码页面的时刻（time.monotonic），用于统计恢复时间
+        self.captcha_times: List[float] = []
+        self.connections = 0
+        self.total_requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def url(self) -> str:
+        """服务器根地址"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+    
+    def search(self, query: str) -> List[_Paper]:
+        """按标题单词的重合度排序，返回至少包含一半查询单词的论文"""
+        words = set(TITLE_NORMALIZER.normalize(query).split())
+        if not words:
+            return []
+        scored = []
+        for paper in self.papers:
+            overlap = len(words & paper.words)
+            if overlap * 2 >= len(words):
+                scored.append((-overlap, len(paper.words - words), paper))
+        scored.sort(key=lambda item: item[:2])
+        return [paper for _, _, paper in scored[:RESULTS_PER_PAGE]]
+    
+    def _count(self, name: str) -> int:
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+            return self.requests[name]
+    
+    def _next_request(self) -> int:
+        with self._lock:
+            self.total_requests += 1
+            return self.total_requests
+    
+    def _record_captcha(self):
+        with self._lock:
+            self.captcha_times.append(time.monotonic())
+    
+    def _count_connection(self):
+        with self._lock:
+            self.connections += 1
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1，客户端可以复用连接
+            protocol_version = 'HTTP/1.1'
+            
+            def setup(self):
+                super().setup()
+                server._count_connection()
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send(self, status: int, body: str, content_type: str = 'text/html; charset=utf-8'):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                query = parse_qs(parts.query)
+                q = query.get('q', [''])[0]
+                
+                request_number = server._next_request()
+                if server.error_every and request_number % server.error_every == 0:
+                    server._count('error')
+                    self._send(503, 'Service Unavailable')
+                elif parts.path == '/scholar' and q.startswith('info:'):
+                    server._count('cite')
+                    paper = server.papers_by_cid.get(q.split(':')[1])
+                    if paper is None:
+                        self._send(404, 'Not found')
+                    else:
+                        self._send(200, CITE_TEMPLATE.format(cid=paper.cid, title=html.escape(paper.title)))
+                elif parts.path == '/scholar':
+                    count = server._count('search')
+                    if server.captcha_every and count % server.captcha_every == 0:
+                        server._record_captcha()
+                        self._send(200, CAPTCHA_PAGE)
+                    else:
+                        self._send(200, server.render_results(q))
+                elif parts.path == '/scholar.bib':
+                    server._count('bibtex')
+                    paper = server.papers_by_cid.get(q.split(':')[1] if q.startswith('info:') else '')
+                    if paper is None:
+                        self._send(404, 'Not found')
+                    else:
+                        self._send(200, paper.bibtex + '\n', 'text/plain; charset=utf-8')
+                else:
+                    self._send(404, 'Not found')
+        
+        return Handler
+    
+    def render_results(self, query: str) -> str:
+        """生成搜索结果页"""
+        papers = self.search(query)
+        if not papers:
+            body = (f'<div id="gs_res_ccl_mid"></div><div class="gs_med">Your search - '
+                    f'<b>{html.escape(query)}</b> - did not match any articles.</div>')
+        else:
+            body = '<div id="gs_res_ccl_mid">' + ''.join(
+                RESULT_TEMPLATE.format(
+                    cid=paper.cid, rank=rank, title=html.escape(paper.title),
+                    authors=html.escape(paper.entry.get('author', '')),
+                    venue=html.escape(paper.entry.get('journal') or paper.entry.get('booktitle', '')),
+                    year=paper.entry.get('year', ''))
+                for rank, paper in enumerate(papers)
+            ) + '</div>' + CITE_SCRIPT
+        return f'<html><head><title>{html.escape(query)} - Google Scholar</title></head><body>{body}</body></html>'
+    
+    def start(self) -> 'MockScholarServer':
+        """在后台线程启动服务器"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def serve_forever(self):
+        """在当前线程运行服务器，直到Ctrl-C"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+    
+    def stop(self):
+        """停止服务器"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.stop()
+
+
+def load_bibtex_entries(filepath: str) -> List[str]:
+    """读取.bib文件中每个条目的原始文本"""
+    parser = BibTeXParser(filepath)
+    parser.parse()
+    return [raw['raw_text'] for raw in parser.raw_entries.values()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """模拟服务器命令行入口"""
+    arg_parser = argparse.ArgumentParser(description='Google Scholar模拟服务器')
+    arg_parser.add_argument('bibfile', help='作为模拟数据库的BibTeX文件')
+    arg_parser.add_argument('--host', default='127.0.0.1', help='监听地址')
+    arg_parser.add_argument('--port', type=int, default=8000, help='监听端口')
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    arg_parser.add_argument('--captcha-every', type=int, default=0, help='每隔多少次搜索返回一次验证码页面')
+    arg_parser.add_argument('--error-every', type=int, default=0, help='每隔多少个请求返回一次503错误')
+    args = arg_parser.parse_args(argv)
+    
+    server = MockScholarServer(load_bibtex_entries(args.bibfile), args.host, args.port,
+                               args.latency, args.captcha_every, args.error_every)
+    print(f"模拟Scholar服务器运行在 {server.url}（{len(server.papers)} 篇论文），按Ctrl-C停止")
+    server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
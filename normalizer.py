@@ -0,0 +1,212 @@
+"""
+字段规范化模块
+解析器和比对器共用的规范化引擎：按字段预编译处理流程，查表折叠LaTeX重音，并缓存规范化结果
+"""
+
+import re
+import unicodedata
+from functools import lru_cache, partial
+from typing import Callable, Dict, Iterable, Tuple
+
+
+# LaTeX重音命令对应的Unicode组合字符
+LATEX_ACCENT_MARKS = {
+    "'": '\u0301', '`': '\u0300', '^': '\u0302', '"': '\u0308', '~': '\u0303',
+    '=': '\u0304', '.': '\u0307', 'c': '\u0327', 'u': '\u0306', 'v': '\u030c',
+    'H': '\u030b',
+}
+
+
+def _build_accent_table() -> Dict[Tuple[str, str], str]:
+    """生成 (重音命令, 字母) -> 组合后字符 的查找表"""
+    table = {}
+    letters = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    for command, mark in LATEX_ACCENT_MARKS.items():
+        for letter in letters:
+            composed = unicodedata.normalize('NFC', letter + mark)
+            if len(composed) == 1:
+                table[(command, letter)] = composed
+    return table
+
+
+ACCENT_TABLE = _build_accent_table()
+
+# \'e  \'{e}  {\'e}  \'\i  \c{c}  \c c 等形式，一次扫描完成所有替换；外层花括号必须成对出现
+ACCENT_PATTERN = re.compile(
+    r"(\{)?\\(?:([`'^\"~=.])\s*(?:\{([A-Za-z]|\\[ij])\}|([A-Za-z]|\\[ij](?![A-Za-z])))"
+    r"|([cuvH])(?:\{([A-Za-z])\}|\s+([A-Za-z])))(?(1)\})"
+)
+
+
+def fold_latex_accents(value: str) -> str:
+    """
+    将LaTeX重音命令折叠为对应的Unicode字符
+    
+    Args:
+        value: 原始值
+    
+    Returns:
+        折叠后的值，无法识别的命令保持原样
+    """
+    if '\\' not in value:
+        return value
+    
+    def replace(match):
+        command = match.group(2) or match.group(5)
+        letter = match.group(3) or match.group(4) or match.group(6) or match.group(7)
+        # \i 和 \j 是无点字母，加重音时当作普通的 i 和 j
+        letter = letter.lstrip('\\')
+        return ACCENT_TABLE.get((command, letter), match.group(0))
+    
+    return ACCENT_PATTERN.sub(replace, value)
+
+
+def _sub(pattern: str, replacement: str, flags: int = 0) -> Callable[[str], str]:
+    """预编译正则替换步骤"""
+    return partial(re.compile(pattern, flags).sub, replacement)
+
+
+def _strip(value: str) -> str:
+    return value.strip()
+
+
+class NormalizationEngine:
+    """
+    按字段预编译处理流程的规范化引擎
+    
+    每个字段对应一条由替换步骤组成的流程，没有专门流程的字段使用默认流程。
+    规范化结果保存在有界LRU缓存中，同一个期刊名或作者串只会处理一次。
+    """
+    
+    def __init__(self, common_steps: Iterable[Callable[[str], str]],
+                 field_steps: Dict[str, Iterable[Callable[[str], str]]],
+                 final_steps: Iterable[Callable[[str], str]] = (),
+                 cache_size: int = 65536):
+        """
+        初始化规范化引擎
+        
+        Args:
+            common_steps: 所有字段共用的前置步骤
+            field_steps: 字段名 -> 该字段特有的步骤
+            final_steps: 所有字段共用的后置步骤
+            cache_size: LRU缓存的最大条目数
+        """
+        common_steps = tuple(common_steps)
+        final_steps = tuple(final_steps)
+        self._default_pipeline = common_steps + final_steps
+        self._pipelines = {
+            field: common_steps + tuple(steps) + final_steps
+            for field, steps in field_steps.items()
+        }
+        self._cached_normalize = lru_cache(maxsize=cache_size)(self._run)
+    
+    def _run(self, value: str, pipeline_key: str) -> str:
+        for step in self._pipelines.get(pipeline_key, self._default_pipeline):
+            value = step(value)
+        return value
+    
+    def normalize(self, value, field_name: str = '') -> str:
+        """
+        规范化字段值
+        
+        Args:
+            value: 原始值
+            field_name: 字段名
+        
+        Returns:
+            规范化后的值
+        """
+        if not value:
+            return ""
+        # 没有专门流程的字段共用同一个缓存键，提高命中率
+        pipeline_key = field_name if field_name in self._pipelines else ''
+        return self._cached_normalize(str(value), pipeline_key)
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计信息
+        
+        Returns:
+            包含hits、misses、size、maxsize和hit_rate的字典
+        """
+        info = self._cached_normalize.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
+    
+    def clear_cache(self):
+        """清空缓存和统计信息"""
+        self._cached_normalize.cache_clear()
+
+
+# 解析器使用的规范化：只去掉\text包装，统一页码和作者格式
+BIBTEX_FIELD_NORMALIZER = NormalizationEngine(
+    common_steps=[
+        _strip,
+        _sub(r'\{\\text\{([^}]+)\}\}', r'\1'),
+        _sub(r'\\text\{([^}]+)\}', r'\1'),
+    ],
+    field_steps={
+        'pages': [_sub(r'(\d+)\s*-\s*(\d+)', r'\1--\2')],
+        'author': [
+            _sub(r'\s+', ' '),
+            _sub(r'\s*,\s*', ', '),
+            _sub(r'\s+and\s+', ' and '),
+        ],
+    },
+)
+
+# 比对器使用的规范化：额外折叠重音、去掉花括号，并按字段统一格式
+COMPARISON_NORMALIZER = NormalizationEngine(
+    common_steps=[
+        _strip,
+        fold_latex_accents,
+        _sub(r'\\text\{([^}]+)\}', r'\1'),
+        _sub(r'\{\\text\{([^}]+)\}\}', r'\1'),
+        _sub(r'\{([^}]+)\}', r'\1'),
+    ],
+    field_steps={
+        'pages': [
+            _sub(r'(\d+)\s*-\s*(\d+)', r'\1--\2'),
+            _sub(r'(\d+)\s*–\s*(\d+)', r'\1--\2'),  # en dash
+        ],
+        'author': [
+            _sub(r'\s+', ' '),
+            _sub(r'\s*,\s*', ', '),
+            _sub(r'\s+and\s+', ' and ', re.IGNORECASE),
+        ],
+        'journal': [_sub(r'\s+', ' ')],
+        'booktitle': [_sub(r'\s+', ' ')],
+        'year': [_sub(r'\D', '')],
+    },
+    final_steps=[_strip],
+)
+
+# 标题规范化：去掉LaTeX格式和标点，转小写并统一空格
+TITLE_NORMALIZER = NormalizationEngine(
+    common_steps=[
+        fold_latex_accents,
+        _sub(r'\\text\{([^}]+)\}', r'\1'),
+        _sub(r'\{\\text\{([^}]+)\}\}', r'\1'),
+        _sub(r'\{([^}]+)\}', r'\1'),
+        _sub(r'[^\w\s]', ' '),
+        lambda title: ' '.join(title.lower().split()),
+    ],
+    field_steps={},
+)
+
+ENGINES = {
+    'bibtex_field': BIBTEX_FIELD_NORMALIZER,
+    'comparison': COMPARISON_NORMALIZER,
+    'title': TITLE_NORMALIZER,
+}
+
+
+def normalization_stats() -> Dict[str, Dict[str, float]]:
+    """获取所有规范化引擎的缓存统计信息"""
+    return {name: engine.cache_stats() for name, engine in ENGINES.items()}
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+离线元数据模块
+从DBLP XML或Crossref JSONL数据流式构建本地SQLite全文索引，提供与ScholarScraper相同的
+search_paper接口，检索不需要浏览器和网络
+
+命令行用法:
+  python offline_index.py build dblp.xml.gz
+  python offline_index.py build crossref.jsonl.gz --format crossref
+  python offline_index.py search "A fast and elitist multiobjective genetic algorithm"
+"""
+
+import argparse
+import gzip
+import html.entities
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from typing import Dict, IO, Iterator, List, Optional
+
+from comparator import FieldComparator
+from normalizer import TITLE_NORMALIZER
+from parse_cache import DEFAULT_CACHE_DIR
+from search_backend import SearchBackend
+
+
+DEFAULT_INDEX_PATH = os.path.join(DEFAULT_CACHE_DIR, 'metadata_index.sqlite3')
+
+# DBLP记录类型 -> BibTeX条目类型
+DBLP_RECORD_TYPES = {
+    'article': 'article',
+    'inproceedings': 'inproceedings',
+    'proceedings': 'proceedings',
+    'book': 'book',
+    'incollection': 'incollection',
+    'phdthesis': 'phdthesis',
+    'mastersthesis': 'mastersthesis',
+}
+
+# DBLP字段 -> BibTeX字段，author和editor单独处理
+DBLP_FIELDS = {
+    'title': 'title',
+    'year': 'year',
+    'journal': 'journal',
+    'booktitle': 'booktitle',
+    'volume': 'volume',
+    'number': 'number',
+    'pages': 'pages',
+    'publisher': 'publisher',
+    'school': 'school',
+    'series': 'series',
+    'isbn': 'isbn',
+}
+
+# Crossref作品类型 -> BibTeX条目类型
+CROSSREF_TYPES = {
+    'journal-article': 'article',
+    'proceedings-article': 'inproceedings',
+    'book-chapter': 'incollection',
+    'book-section': 'incollection',
+    'book': 'book',
+    'monograph': 'book',
+    'edited-book': 'book',
+    'dissertation': 'phdthesis',
+    'report': 'techreport',
+    'posted-content': 'misc',
+}
+
+READ_CHUNK_SIZE = 1024 * 1024
+INSERT_BATCH_SIZE = 10000
+# 模糊检索时交给标题比对的候选数
+FUZZY_CANDIDATES = 20
+# 模糊检索忽略的常见词和短词（含数字的短词如"3d"、"h2"保留），它们几乎出现在每个标题中，只会拖慢全文检索
+FUZZY_STOPWORDS = {'a', 'an', 'the', 'on', 'of', 'in', 'for', 'and', 'to', 'with', 'towards',
+                   'by', 'from', 'via', 'using', 'is', 'are', 'at', 'as', 'its', 'or', 'into'}
+FUZZY_MIN_TERM_LENGTH = 3
+
+DOI_URL_PATTERN = re.compile(r'^https?://(?:dx\.)?doi\.org/(.+)$', re.IGNORECASE)
+# DBLP用四位数字区分同名作者，如 "Wei Wang 0001"
+HOMONYM_SUFFIX_PATTERN = re.compile(r'\s+\d{4}$')
+MARKUP_PATTERN = re.compile(r'<[^>]+>')
+CITATION_KEY_STOPWORDS = {'a', 'an', 'the', 'on', 'of', 'in', 'for', 'and', 'to', 'with', 'towards'}
+
+logger = logging.getLogger(__name__)
+
+
+def _format_person(name: str) -> str:
+    """将 "First Last" 转换为 "Last, First"，与Scholar的作者格式一致"""
+    name = HOMONYM_SUFFIX_PATTERN.sub('', name.strip())
+    parts = name.rsplit(' ', 1)
+    if len(parts) == 1:
+        return name
+    return f"{parts[1]}, {parts[0]}"
+
+
+def _format_pages(pages: str) -> str:
+    return re.sub(r'(\d+)\s*-+\s*(\d+)', r'\1--\2', pages)
+
+
+def make_citation_key(entry: Dict) -> str:
+    """
+    生成Scholar风格的引用键：第一作者姓氏 + 年份 + 标题第一个实词
+    
+    Args:
+        entry: BibTeX字典
+    
+    Returns:
+        引用键
+    """
+    author = entry.get('author') or entry.get('editor') or ''
+    last_name = author.split(' and ')[0].split(',')[0]
+    words = TITLE_NORMALIZER.normalize(entry.get('title', '')).split()
+    first_word = next((word for word in words if word not in CITATION_KEY_STOPWORDS), '')
+    key = TITLE_NORMALIZER.normalize(last_name).replace(' ', '') + entry.get('year', '') + first_word
+    return key or 'unknown'
+
+
+class _DblpTarget:
+    """DBLP XML流式解析目标，每完成一条记录就放入records"""
+    
+    def __init__(self):
+        self.records: List[Dict] = []
+        self._depth = 0
+        self._record = None
+        self._field = None
+        self._text: List[str] = []
+    
+    def start(self, tag, attrib):
+        self._depth += 1
+        if self._depth == 2 and tag in DBLP_RECORD_TYPES:
+            self._record = {'ENTRYTYPE': DBLP_RECORD_TYPES[tag], 'author': [], 'editor': []}
+        elif self._depth == 3 and self._record is not None:
+            self._field = tag
+            self._text = []
+        # 更深层是标题中的<i>、<sub>等排版标记，只保留其中的文字
+    
+    def data(self, text):
+        if self._field is not None:
+            self._text.append(text)
+    
+    def end(self, tag):
+        if self._depth == 3 and self._field is not None:
+            self._store_field(self._field, ''.join(self._text).strip())
+            self._field = None
+        elif self._depth == 2 and self._record is not None:
+            self._finish_record()
+        self._depth -= 1
+    
+    def close(self):
+        pass
+    
+    def _store_field(self, tag: str, value: str):
+        record = self._record
+        if not value:
+            return
+        if tag in ('author', 'editor'):
+            record[tag].append(_format_person(value))
+        elif tag == 'ee':
+            # 只保留DOI，出版商页面链接在Scholar的结果中没有对应字段
+            match = DOI_URL_PATTERN.match(value)
+            if match and 'doi' not in record:
+                record['doi'] = match.group(1)
+        elif tag in DBLP_FIELDS and DBLP_FIELDS[tag] not in record:
+            record[DBLP_FIELDS[tag]] = value
+    
+    def _finish_record(self):
+        record = self._record
+        self._record = None
+        if 'title' not in record:
+            return
+        for role in ('author', 'editor'):
+            if record[role]:
+                record[role] = ' and '.join(record[role])
+            else:
+                del record[role]
+        record['title'] = record['title'].rstrip('.')
+        if 'pages' in record:
+            record['pages'] = _format_pages(record['pages'])
+        self.records.append(record)
+
+
+def iter_dblp_records(stream: IO[bytes]) -> Iterator[Dict]:
+    """
+    流式解析DBLP XML
+    
+    dblp.xml引用了外部DTD中的HTML字符实体（如&uuml;），这里直接用HTML实体表解析，
+    不需要dblp.dtd。
+    
+    Args:
+        stream: 二进制输入流
+    
+    Yields:
+        BibTeX字典（不含ID）
+    """
+    target = _DblpTarget()
+    xml_parser = ET.XMLParser(target=target)
+    xml_parser.entity.update((name, chr(codepoint))
+                             for name, codepoint in html.entities.name2codepoint.items())
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        xml_parser.feed(chunk)
+        yield from target.records
+        target.records.clear()
+    xml_parser.close()
+    yield from target.records
+
+
+def _crossref_to_entry(work: Dict) -> Optional[Dict]:
+    """将Crossref作品记录转换为BibTeX字典"""
+    titles = work.get('title') or []
+    if not titles:
+        return None
+    entry_type = CROSSREF_TYPES.get(work.get('type'), 'misc')
+    entry = {'ENTRYTYPE': entry_type, 'title': MARKUP_PATTERN.sub('', titles[0]).strip()}
+    
+    authors = []
+    for person in work.get('author') or []:
+        if person.get('family'):
+            authors.append(f"{person['family']}, {person['given']}" if person.get('given') else person['family'])
+        elif person.get('name'):
+            authors.append(person['name'])
+    if authors:
+        entry['author'] = ' and '.join(authors)
+    
+    date_parts = ((work.get('issued') or work.get('published') or {}).get('date-parts') or [[None]])[0]
+    if date_parts and date_parts[0]:
+        entry['year'] = str(date_parts[0])
+    
+    containers = work.get('container-title') or []
+    if containers:
+        entry['booktitle' if entry_type in ('inproceedings', 'incollection') else 'journal'] = containers[0]
+    
+    for source, field in (('volume', 'volume'), ('issue', 'number'), ('publisher', 'publisher'),
+                          ('DOI', 'doi')):
+        if work.get(source):
+            entry[field] = str(work[source])
+    if work.get('page'):
+        entry['pages'] = _format_pages(work['page'])
+    return entry
+
+
+def iter_crossref_records(stream: IO[bytes]) -> Iterator[Dict]:
+    """
+    流式解析Crossref JSONL（每行一个作品，或每行一个带items列表的API响应）
+    
+    Args:
+        stream: 二进制输入流
+    
+    Yields:
+        BibTeX字典（不含ID）
+    """
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.warning(f"Skipping invalid JSON at line {number}")
+            continue
+        record = record.get('message', record)
+        for work in record.get('items', [record]):
+            entry = _crossref_to_entry(work)
+            if entry is not None:
+                yield entry
+
+
+def _open_dump(path: str) -> IO[bytes]:
+    """打开数据文件，.gz文件透明解压"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def detect_dump_format(path: str) -> str:
+    """根据扩展名判断数据格式：'dblp'或'crossref'"""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return 'dblp' if name.endswith('.xml') else 'crossref'
+
+
+def build_index(dump_path: str, db_path: str = DEFAULT_INDEX_PATH,
+                dump_format: Optional[str] = None) -> int:
+    """
+    从数据文件构建离线索引
+    
+    先写入临时数据库，完成后整体替换，构建中断不会破坏已有索引。
+    
+    Args:
+        dump_path: DBLP XML或Crossref JSONL文件（可以是.gz）
+        db_path: 索引数据库路径
+        dump_format: 'dblp'或'crossref'，默认按扩展名判断
+    
+    Returns:
+        索引的记录数
+    """
+    dump_format = dump_format or detect_dump_format(dump_path)
+    iter_records = iter_dblp_records if dump_format == 'dblp' else iter_crossref_records
+    
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    temp_path = db_path + '.building'
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    
+    conn = sqlite3.connect(temp_path)
+    count = 0
+    try:
+        # 临时文件构建失败直接丢弃，不需要日志和同步
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('CREATE TABLE works (id INTEGER PRIMARY KEY, title_key TEXT NOT NULL, '
+                     'entry_json TEXT NOT NULL)')
+        
+        batch = []
+        with _open_dump(dump_path) as stream:
+            for entry in iter_records(stream):
+                title_key = TITLE_NORMALIZER.normalize(entry['title'])
+                if not title_key:
+                    continue
+                entry['ID'] = make_citation_key(entry)
+                batch.append((title_key, json.dumps(entry, ensure_ascii=False)))
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    conn.executemany('INSERT INTO works (title_key, entry_json) VALUES (?, ?)', batch)
+                    count += len(batch)
+                    batch = []
+                    logger.info(f"Indexed {count} records")
+                    # 标题只出现一次，不必占用规范化缓存
+                    TITLE_NORMALIZER.clear_cache()
+            if batch:
+                conn.executemany('INSERT INTO works (title_key, entry_json) VALUES (?, ?)', batch)
+                count += len(batch)
+        
+        # 数据全部写入后再建索引，比边写边维护快得多
+        conn.execute('CREATE INDEX works_title_key ON works (title_key)')
+        conn.execute("CREATE VIRTUAL TABLE works_fts USING fts5(title_key, content='works', content_rowid='id')")
+        conn.execute("INSERT INTO works_fts (works_fts) VALUES ('rebuild')")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(temp_path)
+        raise
+    conn.close()
+    
+    os.replace(temp_path, db_path)
+    logger.info(f"Built offline index {db_path} with {count} records")
+    return count
+
+
+class OfflineBackend(SearchBackend):
+    """基于离线索引的检索后端，接口与ScholarScraper相同"""
+    
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        """
+        打开离线索引
+        
+        Args:
+            db_path: build_index生成的索引数据库
+        """
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        super().__init__()
+        self.db_path = db_path
+        self._conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    
+    @staticmethod
+    def _prefer(entries: List[Dict]) -> Dict:
+        """同一标题有多条记录时优先正式发表的版本，其次是较新的版本"""
+        def rank(entry):
+            preprint = entry.get('journal') == 'CoRR' or entry['ENTRYTYPE'] == 'misc'
+            year = entry.get('year', '')
+            return (preprint, -int(year) if year.isdigit() else 0)
+        return min(entries, key=rank)
+    
+    def _exact_matches(self, title_key: str) -> List[Dict]:
+        rows = self._conn.execute('SELECT entry_json FROM works WHERE title_key = ?', (title_key,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    @staticmethod
+    def _fuzzy_terms(title_key: str) -> List[str]:
+        """模糊检索使用的关键词：去掉常见词和短词，全部被去掉时使用原有单词"""
+        words = list(dict.fromkeys(title_key.split()))
+        terms = [word for word in words if word not in FUZZY_STOPWORDS
+                 and (len(word) >= FUZZY_MIN_TERM_LENGTH or any(c.isdigit() for c in word))]
+        return terms or words
+    
+    def _fuzzy_matches(self, title: str, title_key: str) -> List[Dict]:
+        """
+        全文检索候选，再用标题比对规则筛选（允许一个单词不同）
+        
+        先要求包含全部关键词（按前缀匹配，容许单复数等词尾差异），候选范围小；
+        没有符合的结果时（如有一个单词不同）再退回任一关键词匹配。两次都只取bm25排名靠前的候选。
+        """
+        terms = self._fuzzy_terms(title_key)
+        matches = self._match_candidates(title, ' AND '.join(f'"{term}"*' for term in terms))
+        if not matches and len(terms) > 1:
+            matches = self._match_candidates(title, ' OR '.join(f'"{term}"' for term in terms))
+        return matches
+    
+    def _match_candidates(self, title: str, query: str) -> List[Dict]:
+        """执行全文检索，返回与标题最接近的候选"""
+        rows = self._conn.execute(
+            'SELECT works.entry_json FROM works_fts JOIN works ON works.id = works_fts.rowid '
+            'WHERE works_fts MATCH ? ORDER BY bm25(works_fts) LIMIT ?',
+            (query, FUZZY_CANDIDATES)
+        ).fetchall()
+        
+        scored = []
+        for row in rows:
+            entry = json.loads(row[0])
+            is_match, diff_count = FieldComparator.calculate_title_match_score(title, entry['title'])
+            if is_match:
+                scored.append((diff_count, entry))
+        if not scored:
+            return []
+        best = min(diff_count for diff_count, _ in scored)
+        return [entry for diff_count, entry in scored if diff_count == best]
+    
+    def search_paper(self, title: str) -> Optional[Dict]:
+        """
+        在离线索引中检索论文
+        
+        Args:
+            title: 论文标题
+        
+        Returns:
+            BibTeX字典，如果没有找到返回None
+        """
+        self.last_bibtex_text = None
+        title_key = TITLE_NORMALIZER.normalize(title)
+        if not title_key:
+            self.last_lookup_status = 'not_found'
+            return None
+        
+        try:
+            candidates = self._exact_matches(title_key) or self._fuzzy_matches(title, title_key)
+        except sqlite3.Error as e:
+            logger.error(f"Error searching offline index for '{title}': {str(e)}")
+            self.last_lookup_status = 'error'
+            return None
+        
+        if not candidates:
+            logger.warning(f"No offline record found for: {title}")
+            self.last_lookup_status = 'not_found'
+            return None
+        
+        self.last_lookup_status = 'found'
+        return self._prefer(candidates)
+    
+    def close(self):
+        """关闭索引"""
+        self._conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """离线索引命令行入口"""
+    parser = argparse.ArgumentParser(description='离线元数据索引')
+    parser.add_argument('--db', default=DEFAULT_INDEX_PATH, help='索引数据库路径')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    build_parser = subparsers.add_parser('build', help='从DBLP XML或Crossref JSONL构建索引')
+    build_parser.add_argument('dump', help='数据文件，支持.gz')
+    build_parser.add_argument('--format', choices=['dblp', 'crossref'], help='数据格式，默认按扩展名判断')
+    
+    search_parser = subparsers.add_parser('search', help='按标题检索')
+    search_parser.add_argument('title', help='论文标题')
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    if args.command == 'build':
+        count = build_index(args.dump, args.db, args.format)
+        print(f"已索引 {count} 条记录: {args.db}")
+    elif args.command == 'search':
+        with OfflineBackend(args.db) as backend:
+            entry = backend.search_paper(args.title)
+        if entry is None:
+            print("未找到")
+            return 1
+        print(json.dumps(entry, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+解析缓存模块
+将解析结果以二进制格式保存到磁盘，文件未变化时直接加载，避免重复解析
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from typing import Dict, Optional
+
+from atomic_writer import atomic_write
+
+
+# 缓存格式版本，解析结果的结构变化时需要递增
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bib_checker')
+
+logger = logging.getLogger(__name__)
+
+
+class ParseCache:
+    """以路径、大小、修改时间和内容哈希为键的解析缓存"""
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        """
+        初始化缓存
+        
+        Args:
+            cache_dir: 缓存目录
+        """
+        self.cache_dir = cache_dir
+    
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """计算文件内容的哈希"""
+        return hashlib.sha256(data).hexdigest()
+    
+    def _cache_path(self, filepath: str) -> str:
+        """每个源文件对应一个缓存文件，文件名由绝对路径的哈希决定"""
+        path_hash = hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{path_hash}.pickle")
+    
+    def load(self, filepath: str, size: int, mtime_ns: int, digest: str) -> Optional[Dict]:
+        """
+        加载缓存的解析结果
+        
+        大小不同时直接判定为失效；大小相同时以内容哈希为准，
+        因此只修改了时间戳（如git checkout）的文件仍然命中缓存。
+        
+        Args:
+            filepath: 源文件路径
+            size: 源文件大小
+            mtime_ns: 源文件修改时间（纳秒）
+            digest: 源文件内容哈希
+        
+        Returns:
+            解析结果字典，未命中时返回None
+        """
+        cache_path = self._cache_path(filepath)
+        try:
+            with open(cache_path, 'rb') as f:
+                record = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable parse cache {cache_path}: {str(e)}")
+            return None
+        
+        if (record.get('version') != CACHE_FORMAT_VERSION
+                or record.get('path') != os.path.abspath(filepath)
+                or record.get('size') != size
+                or record.get('hash') != digest):
+            return None
+        
+        if record.get('mtime_ns') != mtime_ns:
+            # 内容未变但时间戳变了，更新记录以便下次比对
+            record['mtime_ns'] = mtime_ns
+            try:
+                self._write(cache_path, record)
+            except Exception as e:
+                logger.warning(f"Failed to refresh parse cache {cache_path}: {str(e)}")
+        
+        logger.info(f"Loaded parse cache for {filepath}")
+        return record['result']
+    
+    def store(self, filepath: str, size: int, mtime_ns: int, digest: str, result: Dict):
+        """
+        保存解析结果
+        
+        Args:
+            filepath: 源文件路径
+            size: 源文件大小
+            mtime_ns: 源文件修改时间（纳秒）
+            digest: 源文件内容哈希
+            result: 解析结果字典
+        """
+        record = {
+            'version': CACHE_FORMAT_VERSION,
+            'path': os.path.abspath(filepath),
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'hash': digest,
+            'result': result
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._write(self._cache_path(filepath), record)
+        except Exception as e:
+            # 缓存只是加速手段，写入失败不影响正常流程
+            logger.warning(f"Failed to write parse cache for {filepath}: {str(e)}")
+    
+    @staticmethod
+    def _write(cache_path: str, record: Dict):
+        """原子写入，避免留下写了一半的缓存"""
+        with atomic_write(cache_path, 'wb') as f:
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def clear(self, filepath: str):
+        """删除指定源文件的缓存"""
+        try:
+            os.remove(self._cache_path(filepath))
+        except FileNotFoundError:
+            pass
@@ -7,62 +7,434 @@ import bibtexparser
 from bibtexparser.bparser import BibTexParser
 from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.bibdatabase import BibDatabase
+import bisect
+import logging
+import mmap
+import os
 import re
-from typing import Dict, List, Optional
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from atomic_writer import atomic_write
+from entry_scanner import EntrySpan, scan_entries
+from parse_cache import ParseCache
+from normalizer import BIBTEX_FIELD_NORMALIZER
+
+
+UTF8_BOM = b'\xef\xbb\xbf'
+
+# 条目头部中的引用键，如 @article{key,
+ENTRY_KEY_PATTERN = re.compile(rb'@\s*\w+\s*[{(]\s*([^,\s})]+)')
+
+logger = logging.getLogger(__name__)
+
+# 原始文本中每行开头的字段名，用于保持字段顺序
+FIELD_NAME_PATTERN = re.compile(r'^\s*([^\s=,{}]+)\s*=', re.MULTILINE)
+
+# 小于该大小的文件直接串行解析，进程池的启动开销不划算
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+# 不产生条目的特殊类型
+NON_ENTRY_TYPES = ('comment', 'preamble')
+
+
+class LazyEntryList(Sequence):
+    """延迟加载的条目列表，只有被访问的条目才会被解析"""
+    
+    def __init__(self, owner: 'BibTeXParser'):
+        self._owner = owner
+    
+    def __len__(self) -> int:
+        return len(self._owner._entry_offsets)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return list(self)[index]
+            entries = []
+            while start < min(stop, len(self)):
+                entry = self._owner._materialize(start)
+                if entry is None:
+                    # 条目无法解析，已从索引中移除，之后的条目前移一位
+                    stop -= 1
+                    continue
+                entries.append(entry)
+                start += 1
+            return entries
+        if index < 0:
+            index += len(self)
+        while True:
+            if not 0 <= index < len(self):
+                raise IndexError('entry index out of range')
+            entry = self._owner._materialize(index)
+            if entry is not None:
+                return entry
 
 
 class BibTeXParser:
     """BibTeX文件解析和处理类"""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, lazy: bool = False, cache: Optional[ParseCache] = None,
+                 workers: int = 1):
         """
         初始化解析器
         
         Args:
             filepath: BibTeX文件路径
+            lazy: 是否使用延迟加载模式（内存映射文件，只解析被访问的条目）
+            cache: 解析缓存，文件未变化时直接加载上次的解析结果（延迟加载模式下不使用）
+            workers: 解析进程数，大于1时大文件按条目边界切分后并行解析
         """
         self.filepath = filepath
+        self.lazy = lazy
+        self.cache = cache
+        self.workers = workers
         self.database = None
         self.raw_entries = {}  # 保存原始格式的条目
+        self.key_index: Dict[str, Dict] = {}  # 引用键 -> 条目
+        self.type_year_index: Dict[Tuple[str, str], Dict[str, None]] = {}  # (类型, 年份) -> 有序键集合
+        self.modified_keys: Set[str] = set()  # 通过update_entry修改过的条目
+        self.malformed_entries: List[EntrySpan] = []  # 格式错误、未被解析的条目
+        self._source_stat: Optional[Tuple[int, int]] = None  # 解析时源文件的(大小, 修改时间)
+        
+        # 延迟加载模式的状态
+        self._file = None
+        self._mmap = None
+        self._lazy_parser = None
+        self._entry_offsets: List[Tuple[str, str, int, int]] = []  # (类型, 引用键, 起始, 结束)
+        self._key_positions: Dict[str, int] = {}  # 引用键 -> 条目序号
+        self._materialized: Dict[int, Dict] = {}  # 条目序号 -> 已解析的条目
+        self._fully_loaded = False
         
     def parse(self) -> BibDatabase:
         """
         解析BibTeX文件
         
+        文件只读取一次：先按条目边界切分字节内容，再逐段交给bibtexparser解析，
+        这样解析出的条目与其原始文本、字节区间在同一遍扫描中得到。
+        
+        延迟加载模式下只建立条目边界的偏移索引，返回的数据库中条目为空，
+        条目通过get_entries()等方法在访问时才被解析。
+        
         Returns:
             BibDatabase对象
         """
-        parser = BibTexParser(common_strings=True)
-        parser.ignore_nonstandard_types = False
-        parser.homogenize_fields = False  # 保持原始字段名大小写
+        if self.lazy:
+            return self._parse_lazy()
         
-        with open(self.filepath, 'r', encoding='utf-8') as bibtex_file:
-            self.database = bibtexparser.load(bibtex_file, parser=parser)
-            
-        # 保存每个条目的原始格式
-        self._extract_raw_entries()
+        with open(self.filepath, 'rb') as bibtex_file:
+            stat = os.fstat(bibtex_file.fileno())
+            data = bibtex_file.read()
+        
+        digest = None
+        cached = None
+        if self.cache is not None:
+            digest = ParseCache.content_hash(data)
+            cached = self.cache.load(self.filepath, stat.st_size, stat.st_mtime_ns, digest)
+        
+        if cached is not None:
+            self._restore_parse_result(cached)
+        else:
+            self._parse_data(data)
+            if self.cache is not None:
+                self.cache.store(self.filepath, stat.st_size, stat.st_mtime_ns, digest,
+                                 self._export_parse_result())
+        
+        self._build_indexes()
+        self.modified_keys = set()
+        self._source_stat = (stat.st_size, stat.st_mtime_ns)
         
         return self.database
     
-    def _extract_raw_entries(self):
-        """提取每个条目的原始文本格式"""
-        with open(self.filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+    def _parse_data(self, data: bytes):
+        """
+        解析文件内容，同时记录每个条目的原始文本和字节区间
+        
+        workers大于1且文件足够大时，按条目边界切分后在进程池中并行解析。
+        
+        Args:
+            data: 文件的字节内容
+        """
+        # 跳过UTF-8 BOM，字节偏移仍然相对于文件开头
+        position = len(UTF8_BOM) if data.startswith(UTF8_BOM) else 0
+        
+        spans = list(scan_entries(data, position))
+        self.malformed_entries = []
+        for span in spans:
+            if span.error is not None:
+                self._report_malformed(span)
+        
+        if self.workers > 1 and len(data) >= PARALLEL_MIN_BYTES:
+            result = self._parse_spans_parallel(data, spans, position)
+        else:
+            result = _parse_spans(data, 0, spans, position, len(data))
+        
+        self.database = BibDatabase()
+        self.database.entries = result['entries']
+        self.database.strings = result['strings']
+        self.database.comments = result['comments']
+        self.database.preambles = result['preambles']
+        self.raw_entries = result['raw_entries']
+        for span in result['rejected']:
+            self._report_malformed(span)
+    
+    def _parse_spans_parallel(self, data: bytes, spans: List[EntrySpan], position: int) -> Dict:
+        """
+        将条目分成若干连续的块，在进程池中并行解析后按原始顺序合并
+        
+        Args:
+            data: 文件的字节内容
+            spans: 扫描得到的条目区间
+            position: 第一个块的起始偏移
+            
+        Returns:
+            合并后的解析结果
+        """
+        # 字符串宏可能被任何块引用，先在主进程中解析，再预先加载到每个工作进程
+        macro_parser = self._create_bibtex_parser()
+        for span in spans:
+            if span.error is None and span.entry_type.lower() == 'string':
+                macro_parser.parse(data[span.start:span.end].decode('utf-8'))
+        strings = macro_parser.bib_database.strings
+        
+        # 每个进程分到多个块，使各进程的负载更均衡
+        chunk_count = self.workers * 4
+        chunk_size = max(1, (len(data) - position) // chunk_count)
+        chunks = []
+        chunk_spans = []
+        chunk_start = position
+        for span in spans:
+            chunk_spans.append(span)
+            if span.end - chunk_start >= chunk_size:
+                chunks.append((chunk_start, span.end, chunk_spans))
+                chunk_start, chunk_spans = span.end, []
+        if chunk_start < len(data) or chunk_spans:
+            chunks.append((chunk_start, len(data), chunk_spans))
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(_parse_spans, data[start:end], start, chunk_spans, start, end, strings)
+                for start, end, chunk_spans in chunks
+            ]
+            results = [future.result() for future in futures]
+        
+        merged = {
+            'entries': [],
+            'strings': strings,
+            'comments': [],
+            'preambles': [],
+            'raw_entries': {},
+            'rejected': []
+        }
+        for result in results:
+            merged['rejected'].extend(result['rejected'])
+            merged['entries'].extend(result['entries'])
+            merged['comments'].extend(result['comments'])
+            merged['preambles'].extend(result['preambles'])
+            for key, raw in result['raw_entries'].items():
+                merged['raw_entries'].setdefault(key, raw)
+        return merged
+    
+    def _export_parse_result(self) -> Dict:
+        """导出可以写入缓存的解析结果"""
+        return {
+            'entries': self.database.entries,
+            'strings': self.database.strings,
+            'comments': self.database.comments,
+            'preambles': self.database.preambles,
+            'raw_entries': self.raw_entries,
+            'malformed_entries': self.malformed_entries
+        }
+    
+    def _restore_parse_result(self, result: Dict):
+        """从缓存的解析结果恢复数据库"""
+        self.database = BibDatabase()
+        self.database.entries = result['entries']
+        self.database.strings = result['strings']
+        self.database.comments = result['comments']
+        self.database.preambles = result['preambles']
+        self.raw_entries = result['raw_entries']
+        self.malformed_entries = result['malformed_entries']
+        for span in self.malformed_entries:
+            logger.warning(f"Malformed @{span.entry_type} entry at line {span.line}: {span.error}")
+    
+    def _parse_lazy(self) -> BibDatabase:
+        """内存映射文件并建立条目偏移索引"""
+        parser = self._create_bibtex_parser()
+        self._lazy_parser = parser
+        self.database = parser.bib_database
+        self.raw_entries = {}
+        self._entry_offsets = []
+        self._key_positions = {}
+        self._materialized = {}
+        self._fully_loaded = False
+        
+        self._remap()
+        data = self._mmap
+        
+        position = len(UTF8_BOM) if data[:len(UTF8_BOM)] == UTF8_BOM else 0
+        
+        self.malformed_entries = []
+        
+        for span in scan_entries(data, position):
+            entry_type, start, end = span.entry_type, span.start, span.end
+            if span.error is not None:
+                self._report_malformed(span)
+                continue
             
-        # 使用正则表达式提取每个条目
-        entry_pattern = r'@(\w+)\{([^,]+),\s*(.*?)\n\}'
-        matches = re.finditer(entry_pattern, content, re.DOTALL)
-        
-        for match in matches:
-            entry_type = match.group(1)
-            entry_key = match.group(2).strip()
-            entry_body = match.group(3)
+            normalized_type = entry_type.lower()
+            if normalized_type == 'string':
+                # 字符串宏体积很小，立即解析以便后续条目引用
+                parser.parse(data[start:end].decode('utf-8'))
+                continue
+            if normalized_type in NON_ENTRY_TYPES:
+                continue
             
-            self.raw_entries[entry_key] = {
-                'type': entry_type,
-                'key': entry_key,
-                'raw_text': match.group(0)
-            }
+            key_match = ENTRY_KEY_PATTERN.match(data, start)
+            if key_match is None:
+                continue
+            key = key_match.group(1).decode('utf-8')
+            
+            self._key_positions.setdefault(key, len(self._entry_offsets))
+            self._entry_offsets.append((entry_type, key, start, end))
+        
+        self.modified_keys = set()
+        self._record_source_stat()
+        
+        return self.database
+    
+    def _report_malformed(self, span: EntrySpan):
+        """记录格式错误的条目"""
+        self.malformed_entries.append(span)
+        logger.warning(f"Malformed @{span.entry_type} entry at line {span.line}: {span.error}")
+    
+    def _materialize(self, index: int) -> Optional[Dict]:
+        """
+        解析指定序号的条目（延迟加载模式）
+        
+        Returns:
+            条目字典；扫描器接受但bibtexparser无法解析的条目记为格式错误并从索引中移除，返回None
+        """
+        entry = self._materialized.get(index)
+        if entry is not None:
+            return entry
+        
+        entry_type, key, start, end = self._entry_offsets[index]
+        raw_text = self._mmap[start:end].decode('utf-8')
+        
+        # 解析后立即从解析器的数据库中取出，解析器只保留字符串宏
+        self._lazy_parser.parse(raw_text)
+        parsed = self._lazy_parser.bib_database.entries
+        if not parsed:
+            self._drop_offset(index)
+            return None
+        entry = _intern_field_names(parsed.pop())
+        
+        self._materialized[index] = entry
+        self.raw_entries.setdefault(key, {
+            'type': entry_type,
+            'key': key,
+            'raw_text': raw_text,
+            'start': start,
+            'end': end
+        })
+        return entry
+    
+    def _drop_offset(self, index: int):
+        """将无法解析的条目记为格式错误，并从延迟加载的偏移索引中移除"""
+        entry_type, key, start, end = self._entry_offsets.pop(index)
+        line = self._mmap[:start].count(b'\n') + 1
+        self._report_malformed(EntrySpan(entry_type, start, end, line, 'entry could not be parsed'))
+        
+        self._materialized = {i - (i > index): entry for i, entry in self._materialized.items()}
+        self._key_positions = {}
+        for position, (_, offset_key, _, _) in enumerate(self._entry_offsets):
+            self._key_positions.setdefault(offset_key, position)
+    
+    def _materialize_all(self):
+        """解析所有尚未解析的条目，之后的行为与普通模式相同"""
+        if not self.lazy or self._fully_loaded:
+            return
+        
+        self.database.entries = list(LazyEntryList(self))
+        self._build_indexes()
+        self._fully_loaded = True
+    
+    def _remap(self):
+        """（重新）内存映射源文件"""
+        self.close()
+        self._file = open(self.filepath, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 空文件无法映射
+            self._mmap = b''
+    
+    def _record_source_stat(self):
+        """记录源文件的大小和修改时间，用于判断增量保存是否安全"""
+        stat = os.stat(self.filepath)
+        self._source_stat = (stat.st_size, stat.st_mtime_ns)
+    
+    def close(self):
+        """释放延迟加载模式打开的内存映射和文件"""
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+    
+    def _build_indexes(self):
+        """根据当前数据库重建引用键索引和(类型, 年份)索引"""
+        self.key_index = {}
+        self.type_year_index = {}
+        
+        for entry in self.database.entries:
+            key = entry.get('ID')
+            # 重复的引用键以第一次出现的条目为准，与线性查找的行为一致
+            if key in self.key_index:
+                continue
+            self.key_index[key] = entry
+            self._add_to_type_year_index(key, entry)
+    
+    @staticmethod
+    def _type_year_of(entry: Dict) -> Tuple[str, str]:
+        """获取条目在二级索引中的位置"""
+        return (entry.get('ENTRYTYPE', '').lower(), str(entry.get('year', '')).strip())
+    
+    def _add_to_type_year_index(self, key: str, entry: Dict):
+        """将条目加入(类型, 年份)索引"""
+        self.type_year_index.setdefault(self._type_year_of(entry), {})[key] = None
+    
+    def _remove_from_type_year_index(self, key: str, entry: Dict):
+        """将条目从(类型, 年份)索引中移除"""
+        bucket_key = self._type_year_of(entry)
+        bucket = self.type_year_index.get(bucket_key)
+        if bucket is None:
+            return
+        bucket.pop(key, None)
+        if not bucket:
+            del self.type_year_index[bucket_key]
+    
+    @staticmethod
+    def _create_bibtex_parser() -> BibTexParser:
+        """创建配置好的bibtexparser解析器"""
+        parser = BibTexParser(common_strings=True)
+        parser.ignore_nonstandard_types = False
+        parser.homogenize_fields = False  # 保持原始字段名大小写
+        parser.expect_multiple_parse = True  # 按条目分段解析
+        return parser
     
     def get_entries(self) -> List[Dict]:
         """
@@ -73,6 +445,8 @@ class BibTeXParser:
         """
         if self.database is None:
             self.parse()
+        if self.lazy and not self._fully_loaded:
+            return LazyEntryList(self)
         return self.database.entries
     
     def get_entry_by_key(self, key: str) -> Optional[Dict]:
@@ -87,11 +461,39 @@ class BibTeXParser:
         """
         if self.database is None:
             self.parse()
+        
+        if self.lazy and not self._fully_loaded:
+            index = self._key_positions.get(key)
+            return None if index is None else self._materialize(index)
+        
+        return self.key_index.get(key)
+    
+    def get_entries_by_type_year(self, entry_type: str, year: Optional[str] = None) -> List[Dict]:
+        """
+        根据条目类型和年份获取条目
+        
+        Args:
+            entry_type: 条目类型（如 'article'），不区分大小写
+            year: 年份，为None时返回该类型的所有条目
             
-        for entry in self.database.entries:
-            if entry.get('ID') == key:
-                return entry
-        return None
+        Returns:
+            条目列表，同一年份内保持文件中的原始顺序
+        """
+        if self.database is None:
+            self.parse()
+        # 年份只有解析后才知道，延迟加载模式下需要先解析全部条目
+        self._materialize_all()
+        
+        entry_type = entry_type.lower()
+        if year is not None:
+            bucket = self.type_year_index.get((entry_type, str(year).strip()), {})
+            return [self.key_index[key] for key in bucket]
+        
+        entries = [self.key_index[key]
+                   for (bucket_type, _), bucket in self.type_year_index.items()
+                   if bucket_type == entry_type
+                   for key in bucket]
+        return entries
     
     def update_entry(self, key: str, updated_fields: Dict):
         """
@@ -101,35 +503,172 @@ class BibTeXParser:
             key: 引用键
             updated_fields: 要更新的字段字典（不包括ID和ENTRYTYPE）
         """
-        if self.database is None:
-            self.parse()
-            
-        for entry in self.database.entries:
-            if entry.get('ID') == key:
-                # 更新字段，但保留ID和ENTRYTYPE
-                for field, value in updated_fields.items():
-                    if field not in ['ID', 'ENTRYTYPE']:
-                        entry[field] = value
-                break
+        entry = self.get_entry_by_key(key)
+        if entry is None:
+            return
+        
+        # 年份可能变化，先从二级索引中移除，更新后再加入
+        # （延迟加载模式下索引尚未建立，全部解析时会按更新后的值建立）
+        indexed = key in self.key_index
+        if indexed:
+            self._remove_from_type_year_index(key, entry)
+        
+        # 更新字段，但保留ID和ENTRYTYPE
+        for field, value in updated_fields.items():
+            if field not in ['ID', 'ENTRYTYPE']:
+                entry[field] = value
+        self.modified_keys.add(key)
+        
+        if indexed:
+            self._add_to_type_year_index(key, entry)
     
-    def save(self, output_path: Optional[str] = None):
+    def save(self, output_path: Optional[str] = None, incremental: bool = False):
         """
         保存BibTeX数据库到文件
         
         Args:
             output_path: 输出文件路径，如果为None则覆盖原文件
+            incremental: 是否只重写被update_entry修改过的条目，其余内容按原样复制。
+                源文件在解析后被改动或修改的条目没有原始区间时，退回到完整重写
         """
         if self.database is None:
             raise ValueError("No database loaded. Call parse() first.")
         
         output_path = output_path or self.filepath
         
+        if incremental and self._can_splice():
+            self._save_incremental(output_path)
+            return
+        
+        self._materialize_all()
+        
+        with atomic_write(output_path) as bibtex_file:
+            self._write_database(bibtex_file)
+    
+    def _write_database(self, bibtex_file):
+        """
+        逐个条目流式写出数据库，输出与BibTexWriter.write(self.database)一致，
+        但不需要在内存中拼出整个文件
+        
+        Args:
+            bibtex_file: 文本模式的文件对象
+        """
+        writer = self._create_writer()
+        
+        # 注释、导言和字符串宏体积很小，直接用写入器生成
+        writer.contents = [content for content in writer.contents if content != 'entries']
+        bibtex_file.write(writer.write(self.database))
+        
+        writer.contents = ['entries']
+        single_entry = BibDatabase()
+        for i, entry in enumerate(self.database.entries):
+            if i:
+                bibtex_file.write(writer.entry_separator)
+            single_entry.entries = [entry]
+            bibtex_file.write(writer.write(single_entry))
+    
+    @staticmethod
+    def _create_writer() -> BibTexWriter:
+        """创建配置好的BibTeX写入器"""
         writer = BibTexWriter()
         writer.indent = '\t'  # 使用制表符缩进
         writer.order_entries_by = None  # 保持原始顺序
+        return writer
+    
+    def _entry_to_bibtex(self, entry: Dict) -> str:
+        """将单个条目序列化为BibTeX文本，字段保持原始文本中的顺序，新字段追加在后"""
+        writer = self._create_writer()
+        writer.contents = ['entries']
+        
+        raw = self.raw_entries.get(entry.get('ID'))
+        if raw is not None:
+            writer.display_order = [field for field in FIELD_NAME_PATTERN.findall(raw['raw_text'])
+                                    if field in entry]
+        
+        database = BibDatabase()
+        database.entries = [entry]
+        return writer.write(database).rstrip('\n')
+    
+    def _has_duplicate_keys(self) -> bool:
+        """文件中是否有重复的引用键"""
+        if self.lazy and not self._fully_loaded:
+            return len(self._key_positions) < len(self._entry_offsets)
+        return len(self.key_index) < len(self.database.entries)
+    
+    def _can_splice(self) -> bool:
+        """判断能否只替换修改过的条目区间；有重复引用键时按区间拼接容易改错条目，退回完整重写"""
+        if any(key not in self.raw_entries for key in self.modified_keys):
+            return False
+        if self._has_duplicate_keys():
+            return False
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self._source_stat
+    
+    def _save_incremental(self, output_path: str):
+        """
+        按原始字节区间拼接文件：未修改的部分原样复制，只重写修改过的条目
+        
+        Args:
+            output_path: 输出文件路径
+        """
+        edits = sorted(
+            (self.raw_entries[key]['start'], self.raw_entries[key]['end'], key)
+            for key in self.modified_keys
+        )
+        
+        # 原子写入：先写同目录下的临时文件，再替换目标文件，避免边读边写同一个文件
+        new_spans = []
+        with open(self.filepath, 'rb') as source, atomic_write(output_path, 'wb') as target:
+            position = 0
+            written = 0
+            for start, end, key in edits:
+                written += _copy_byte_range(source, target, position, start)
+                raw_bytes = self._entry_to_bibtex(self.get_entry_by_key(key)).encode('utf-8')
+                target.write(raw_bytes)
+                new_spans.append((key, start, end, written, written + len(raw_bytes), raw_bytes))
+                written += len(raw_bytes)
+                position = end
+            _copy_byte_range(source, target, position, None)
         
-        with open(output_path, 'w', encoding='utf-8') as bibtex_file:
-            bibtex_file.write(writer.write(self.database))
+        if os.path.abspath(output_path) == os.path.abspath(self.filepath):
+            self._apply_splice(new_spans)
+    
+    def _apply_splice(self, new_spans: List[Tuple[str, int, int, int, int, bytes]]):
+        """原文件被拼接覆盖后，更新记录的字节区间使其与新文件一致"""
+        # (旧结束位置, 累计偏移量)，用于平移修改条目之后的区间
+        shifts = []
+        for key, old_start, old_end, new_start, new_end, raw_bytes in new_spans:
+            shifts.append((old_end, new_end - old_end))
+            self.raw_entries[key].update({
+                'raw_text': raw_bytes.decode('utf-8'),
+                'start': new_start,
+                'end': new_end
+            })
+        edited_keys = {span[0] for span in new_spans}
+        
+        old_ends = [old_end for old_end, _ in shifts]
+        
+        def shift(offset: int) -> int:
+            index = bisect.bisect_right(old_ends, offset)
+            return offset + (shifts[index - 1][1] if index else 0)
+        
+        for key, raw in self.raw_entries.items():
+            if key not in edited_keys:
+                raw['start'], raw['end'] = shift(raw['start']), shift(raw['end'])
+        
+        if self.lazy:
+            new_bounds = {span[0]: (span[3], span[4]) for span in new_spans}
+            self._entry_offsets = [
+                (entry_type, key) + new_bounds.get(key, (shift(start), shift(end)))
+                for entry_type, key, start, end in self._entry_offsets
+            ]
+            self._remap()
+        
+        self.modified_keys.clear()
+        self._record_source_stat()
     
     def create_backup(self, backup_suffix: str = '.backup'):
         """
@@ -155,26 +694,7 @@ class BibTeXParser:
         Returns:
             规范化后的值
         """
-        if not value:
-            return ""
-        
-        value = str(value).strip()
-        
-        # 移除LaTeX特殊字符包围的花括号
-        value = re.sub(r'\{\\text\{([^}]+)\}\}', r'\1', value)
-        value = re.sub(r'\\text\{([^}]+)\}', r'\1', value)
-        
-        # 处理页码范围：统一使用双短横线
-        if field_name == 'pages':
-            value = re.sub(r'(\d+)\s*-\s*(\d+)', r'\1--\2', value)
-        
-        # 处理作者名：移除多余空格
-        if field_name == 'author':
-            value = re.sub(r'\s+', ' ', value)
-            value = re.sub(r'\s*,\s*', ', ', value)
-            value = re.sub(r'\s+and\s+', ' and ', value)
-        
-        return value
+        return BIBTEX_FIELD_NORMALIZER.normalize(value, field_name)
     
     @staticmethod
     def fields_are_equal(value1: str, value2: str, field_name: str) -> bool:
@@ -201,6 +721,140 @@ class BibTeXParser:
         return norm1 == norm2
 
 
+def _intern_field_names(entry: Dict) -> Dict:
+    """驻留字段名，所有条目共享同一组字段名字符串"""
+    return {sys.intern(field): value for field, value in entry.items()}
+
+
+def _parse_spans(data: bytes, base: int, spans: List[EntrySpan], position: int, end: int,
+                 strings: Optional[Dict] = None) -> Dict:
+    """
+    逐个解析条目，每个条目与它之前的间隙一起交给bibtexparser，保证每个字节只解析一次
+    
+    作为模块级函数以便在进程池中执行。
+    
+    Args:
+        data: 字节内容，覆盖文件中从base开始的区间
+        base: data第一个字节在文件中的偏移
+        spans: 要解析的条目区间（文件偏移）
+        position: 开始解析的文件偏移
+        end: 结束解析的文件偏移
+        strings: 预先加载的字符串宏，此时区间内的@string条目不再重复解析
+        
+    Returns:
+        解析结果字典
+    """
+    parser = BibTeXParser._create_bibtex_parser()
+    database = parser.bib_database
+    if strings:
+        database.strings.update(strings)
+    raw_entries = {}
+    rejected = []
+    
+    def parse_range(start: int, stop: int):
+        if start < stop:
+            parser.parse(data[start - base:stop - base].decode('utf-8'))
+    
+    for span in spans:
+        skip_entry = span.error is not None or (
+            strings is not None and span.entry_type.lower() == 'string')
+        if skip_entry:
+            # 格式错误的条目和已预先加载的字符串宏只解析它之前的间隙
+            parse_range(position, span.start)
+            position = span.end
+            continue
+        
+        entry_count = len(database.entries)
+        parse_range(position, span.end)
+        position = span.end
+        
+        if len(database.entries) == entry_count and span.entry_type.lower() not in NON_ENTRY_TYPES + ('string',):
+            # 扫描器接受但bibtexparser无法解析的条目
+            rejected.append(span._replace(error='entry could not be parsed'))
+        elif len(database.entries) == entry_count + 1:
+            entry_key = database.entries[-1].get('ID')
+            # 重复的引用键以第一次出现的条目为准，与key_index一致
+            raw_entries.setdefault(entry_key, {
+                'type': span.entry_type,
+                'key': entry_key,
+                'raw_text': data[span.start - base:span.end - base].decode('utf-8'),
+                'start': span.start,
+                'end': span.end
+            })
+    
+    # 剩余的内容
+    parse_range(position, end)
+    
+    return {
+        'entries': [_intern_field_names(entry) for entry in database.entries],
+        'strings': database.strings,
+        'comments': database.comments,
+        'preambles': database.preambles,
+        'raw_entries': raw_entries,
+        'rejected': rejected
+    }
+
+
+def _parse_file(filepath: str, cache: Optional[ParseCache]) -> Tuple[Dict, Tuple[int, int]]:
+    """在工作进程中解析单个文件，返回解析结果和文件状态"""
+    parser = BibTeXParser(filepath, cache=cache)
+    parser.parse()
+    return parser._export_parse_result(), parser._source_stat
+
+
+def parse_files(filepaths: List[str], workers: Optional[int] = None,
+                cache: Optional[ParseCache] = None) -> Dict[str, 'BibTeXParser']:
+    """
+    在进程池中并行解析多个BibTeX文件
+    
+    Args:
+        filepaths: 文件路径列表
+        workers: 进程数，为None时使用CPU核数
+        cache: 解析缓存
+        
+    Returns:
+        字典，键为文件路径，值为已解析的BibTeXParser
+    """
+    parsers = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(filepath, executor.submit(_parse_file, filepath, cache)) for filepath in filepaths]
+        for filepath, future in futures:
+            result, source_stat = future.result()
+            parser = BibTeXParser(filepath, cache=cache)
+            parser._restore_parse_result(result)
+            parser._build_indexes()
+            parser._source_stat = source_stat
+            parsers[filepath] = parser
+    return parsers
+
+
+def _copy_byte_range(source, target, start: int, end: Optional[int],
+                     chunk_size: int = 1024 * 1024) -> int:
+    """
+    按块复制文件中的字节区间
+    
+    Args:
+        source: 源文件对象（二进制模式）
+        target: 目标文件对象（二进制模式）
+        start: 起始偏移
+        end: 结束偏移，为None时复制到文件末尾
+        chunk_size: 每次读取的字节数
+        
+    Returns:
+        复制的字节数
+    """
+    source.seek(start)
+    copied = 0
+    while end is None or copied < end - start:
+        size = chunk_size if end is None else min(chunk_size, end - start - copied)
+        chunk = source.read(size)
+        if not chunk:
+            break
+        target.write(chunk)
+        copied += len(chunk)
+    return copied
+
+
 def parse_bibtex_string(bibtex_str: str) -> Dict:
     """
     解析BibTeX字符串为字典
@@ -0,0 +1,130 @@
+"""
+流式比对模块
+检索结果一到达就与原始条目比对并产出比对结果，不必等全部标题检索完成；
+规范化标题相同的条目合并为一次检索，结果分发给所有引用同一论文的条目
+"""
+
+import logging
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from comparator import EntryComparison, FieldComparator
+
+
+logger = logging.getLogger(__name__)
+
+# 为合并重复标题保留的已完成结果数；超出后淘汰最久未命中的结果，
+# 之后再读到该论文时重新检索（通常命中结果缓存或断点日志）
+COMPLETED_RESULTS_LIMIT = 4096
+
+
+class ComparisonPipeline:
+    """检索 → 比对 的流式管道"""
+    
+    def __init__(self, backend, journal=None, progress_callback: Optional[Callable[[int, int], None]] = None,
+                 completed_limit: int = COMPLETED_RESULTS_LIMIT):
+        """
+        初始化管道
+        
+        Args:
+            backend: 检索后端（SearchBackend或ScraperPool），需提供iter_search
+            journal: 断点日志（CheckpointJournal）
+            progress_callback: 进度回调函数，接受(已处理条目数, 条目总数)参数
+            completed_limit: 为合并重复标题保留的已完成结果数上限
+        """
+        self.backend = backend
+        self.completed_limit = completed_limit
+        self.journal = journal
+        self.progress_callback = progress_callback
+        # 检索次数、检索到结果的次数、完成比对的条目数
+        self.lookups = 0
+        self.found = 0
+        self.compared = 0
+        # 与其他条目合并、没有单独检索的条目数，即节省的检索次数
+        self.coalesced = 0
+        self._processed = 0
+        # 等待检索结果的条目，键为规范化标题
+        self._waiting: Dict[str, List[Dict]] = {}
+        # 已完成检索的结果，键为规范化标题，按最近命中的顺序排列；之后读到的同一论文直接使用
+        self._completed: Dict[str, Optional[Dict]] = {}
+        # 命中已完成结果、等待产出的条目
+        self._ready = deque()
+    
+    @staticmethod
+    def _key(title: str) -> str:
+        """合并检索使用的键；规范化后为空的标题（如只有符号）按原文区分"""
+        return FieldComparator.normalize_title(title) or title
+    
+    def _titles(self, entries: Iterable[Dict]) -> Iterator[str]:
+        """按需产出需要检索的标题，同一论文只产出一次"""
+        for entry in entries:
+            title = entry.get('title')
+            if not title:
+                continue
+            key = self._key(title)
+            if key in self._completed:
+                self.coalesced += 1
+                # 移到末尾，最后才被淘汰
+                result = self._completed.pop(key)
+                self._completed[key] = result
+                self._ready.append((entry, result))
+                continue
+            if key in self._waiting:
+                self.coalesced += 1
+                self._waiting[key].append(entry)
+                continue
+            self._waiting[key] = [entry]
+            yield title
+    
+    def _compare(self, pairs: Iterable[Tuple[Dict, Optional[Dict]]]) -> Iterator[EntryComparison]:
+        """比对条目与检索结果，没有结果的条目只计入进度"""
+        for entry, result in pairs:
+            self._processed += 1
+            if result is not None:
+                self.compared += 1
+                yield FieldComparator.compare_entries(entry, result)
+    
+    def _drain_ready(self) -> Iterator[EntryComparison]:
+        """比对命中已完成结果的条目"""
+        while self._ready:
+            yield from self._compare([self._ready.popleft()])
+    
+    def run(self, entries: Iterable[Dict], total: Optional[int] = None) -> Iterator[EntryComparison]:
+        """
+        检索并比对条目，每比对完一个条目立即产出
+        
+        Args:
+            entries: 原始条目的可迭代对象，按需读取
+            total: 有标题的条目总数，用于进度回调；为None时不回调
+        
+        Yields:
+            EntryComparison对象，没有检索结果的条目不产出
+        """
+        for title, result in self.backend.iter_search(self._titles(entries), self.journal):
+            self.lookups += 1
+            if result is not None:
+                self.found += 1
+            key = self._key(title)
+            self._remember(key, result)
+            yield from self._drain_ready()
+            yield from self._compare((entry, result) for entry in self._waiting.pop(key, []))
+            self._report_progress(total)
+        
+        # 最后一次检索之后读到的重复条目
+        if self._ready:
+            yield from self._drain_ready()
+            self._report_progress(total)
+        logger.info(f"Pipeline: {self.lookups} lookups, {self.found} found, {self.compared} entries compared, "
+                    f"{self.coalesced} lookups saved by coalescing duplicate titles")
+    
+    def _remember(self, key: str, result: Optional[Dict]):
+        """保留已完成的结果，超出上限时淘汰最久未命中的结果"""
+        self._completed.pop(key, None)
+        self._completed[key] = result
+        while len(self._completed) > self.completed_limit:
+            del self._completed[next(iter(self._completed))]
+    
+    def _report_progress(self, total: Optional[int]):
+        """报告已处理的条目数"""
+        if self.progress_callback and total:
+            self.progress_callback(min(self._processed, total), total)
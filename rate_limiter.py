@@ -0,0 +1,169 @@
+"""
+限速模块
+令牌桶限速器使所有浏览器的总请求速率不超过设定值；自适应间隔控制器根据Scholar的响应调整请求间隔
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+    
+    def __init__(self, rate: float, capacity: float = 1.0, clock=time.monotonic, sleep=time.sleep):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate: 每秒补充的令牌数，即长期平均请求速率
+            capacity: 桶容量，即允许的最大突发请求数
+            clock: 单调时钟函数（测试时可替换）
+            sleep: 休眠函数（测试时可替换）
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.total_wait = 0.0
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        取出令牌，不足时阻塞等待
+        
+        令牌在锁内预定（余额可以为负），等待在锁外进行，
+        因此并发的请求按到达顺序依次放行，不会同时醒来争抢。
+        
+        Args:
+            tokens: 需要的令牌数
+        
+        Returns:
+            实际等待的秒数
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.total_wait += wait
+        
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+    
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: float = 1.0) -> 'TokenBucket':
+        """按每分钟请求数创建令牌桶"""
+        return cls(requests_per_minute / 60.0, burst)
+
+
+class AdaptiveDelay:
+    """
+    自适应请求间隔
+    
+    响应正常时逐步缩短间隔（加性减少），遇到验证码、响应缓慢或空结果页时
+    成倍延长间隔（乘性增加），间隔始终保持在[floor, ceiling]之间。
+    """
+    
+    def __init__(self, floor: float, ceiling: float, step: Optional[float] = None,
+                 backoff: float = 2.0, slow_threshold: float = 5.0, jitter: float = 0.2):
+        """
+        初始化控制器
+        
+        Args:
+            floor: 最短间隔（秒）
+            ceiling: 最长间隔（秒）
+            step: 每次正常响应缩短的秒数，默认为区间宽度的1/10
+            backoff: 受阻时间隔的放大倍数
+            slow_threshold: 页面加载超过该秒数视为响应缓慢
+            jitter: 随机抖动比例，避免请求间隔过于规律
+        """
+        self.floor = floor
+        self.ceiling = max(ceiling, floor)
+        self.step = step if step is not None else (self.ceiling - self.floor) / 10
+        self.backoff = backoff
+        self.slow_threshold = slow_threshold
+        self.jitter = jitter
+        self.delay = (self.floor + self.ceiling) / 2
+        self.pushbacks: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def requests_per_minute(self) -> float:
+        """当前间隔对应的请求速率"""
+        return 60.0 / self.delay if self.delay > 0 else float('inf')
+    
+    def next_delay(self) -> float:
+        """
+        获取下一次等待的秒数
+        
+        Returns:
+            加入随机抖动后的间隔，不超出[floor, ceiling]
+        """
+        with self._lock:
+            delay = self.delay
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return min(self.ceiling, max(self.floor, delay))
+    
+    def record_success(self):
+        """记录一次正常的检索，缩短间隔"""
+        with self._lock:
+            if self.delay <= self.floor:
+                return
+            self.delay = max(self.floor, self.delay - self.step)
+            logger.debug(f"Rate controller: delay {self.delay:.2f}s "
+                         f"({self.requests_per_minute:.1f} req/min)")
+    
+    def record_pushback(self, reason: str):
+        """
+        记录一次受阻，延长间隔
+        
+        Args:
+            reason: 受阻原因，如'captcha'、'slow response'、'empty results'
+        """
+        with self._lock:
+            self.pushbacks[reason] = self.pushbacks.get(reason, 0) + 1
+            # 间隔为0时无法成倍增加，先退到一个步长
+            self.delay = min(self.ceiling, max(self.delay * self.backoff, self.floor + self.step, 0.1))
+            logger.info(f"Rate controller: backing off after {reason}, delay {self.delay:.2f}s "
+                        f"({self.requests_per_minute:.1f} req/min)")
+    
+    def observe_response(self, seconds: float) -> bool:
+        """
+        记录页面加载耗时，过慢时视为受阻
+        
+        Args:
+            seconds: 页面加载耗时
+        
+        Returns:
+            是否响应缓慢
+        """
+        if seconds > self.slow_threshold:
+            self.record_pushback('slow response')
+            return True
+        return False
+    
+    def stats(self) -> Dict:
+        """
+        获取控制器状态
+        
+        Returns:
+            包含delay、requests_per_minute和pushbacks的字典
+        """
+        with self._lock:
+            return {
+                'delay': self.delay,
+                'requests_per_minute': self.requests_per_minute,
+                'pushbacks': dict(self.pushbacks)
+            }
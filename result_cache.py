@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Scholar检索结果缓存模块
+将检索结果按规范化标题持久化到SQLite，在有效期内直接复用，包括未找到结果的标题
+
+命令行用法:
+  python result_cache.py inspect [--list]
+  python result_cache.py prune [--all | --older-than DAYS | --negative]
+  python result_cache.py export output.bib
+  python result_cache.py export output.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from atomic_writer import atomic_write
+from normalizer import TITLE_NORMALIZER
+
+
+DEFAULT_RESULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'bib_checker',
+                                         'scholar_results.sqlite3')
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """以规范化标题为键的Scholar检索结果缓存"""
+    
+    def __init__(self, db_path: str = DEFAULT_RESULT_CACHE_PATH,
+                 ttl_days: float = DEFAULT_TTL_DAYS,
+                 negative_ttl_days: float = DEFAULT_NEGATIVE_TTL_DAYS):
+        """
+        初始化缓存
+        
+        Args:
+            db_path: SQLite数据库路径
+            ttl_days: 找到结果的缓存有效期（天）
+            negative_ttl_days: 未找到结果的缓存有效期（天），通常比ttl_days短
+        """
+        self.db_path = db_path
+        self.ttl = ttl_days * SECONDS_PER_DAY
+        self.negative_ttl = negative_ttl_days * SECONDS_PER_DAY
+        self.hits = 0
+        self.misses = 0
+        
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        
+        # 并发检索时多个线程共享同一个连接，由锁保证串行访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS results (
+                title_key TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                found INTEGER NOT NULL,
+                bibtex TEXT,
+                entry_json TEXT,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+    
+    @staticmethod
+    def title_key(title: str) -> str:
+        """缓存键：规范化后的标题，大小写、标点和LaTeX格式不同的同一标题共用缓存"""
+        return TITLE_NORMALIZER.normalize(title)
+    
+    def _is_expired(self, found: bool, fetched_at: float, now: float) -> bool:
+        ttl = self.ttl if found else self.negative_ttl
+        return now - fetched_at > ttl
+    
+    def lookup(self, title: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        查询缓存
+        
+        Args:
+            title: 论文标题
+        
+        Returns:
+            (是否命中, BibTeX字典)，命中的未找到结果返回(True, None)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT found, entry_json, fetched_at FROM results WHERE title_key = ?',
+                (self.title_key(title),)
+            ).fetchone()
+        
+        if row is None or self._is_expired(bool(row[0]), row[2], time.time()):
+            self.misses += 1
+            return (False, None)
+        
+        self.hits += 1
+        found, entry_json, _ = row
+        return (True, json.loads(entry_json) if found else None)
+    
+    def store(self, title: str, result: Optional[Dict], bibtex: Optional[str] = None):
+        """
+        保存检索结果
+        
+        Args:
+            title: 论文标题
+            result: BibTeX字典，None表示Scholar上没有找到
+            bibtex: Scholar返回的原始BibTeX文本
+        """
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results '
+                '(title_key, title, found, bibtex, entry_json, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (self.title_key(title), title, int(result is not None), bibtex,
+                 json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 time.time())
+            )
+            self._conn.commit()
+    
+    def rows(self) -> List[Dict]:
+        """获取所有缓存记录，按获取时间排序"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'SELECT title_key, title, found, bibtex, entry_json, fetched_at '
+                'FROM results ORDER BY fetched_at'
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        统计缓存内容
+        
+        Returns:
+            包含total、found、negative和expired的字典
+        """
+        now = time.time()
+        rows = self.rows()
+        return {
+            'total': len(rows),
+            'found': sum(1 for row in rows if row['found']),
+            'negative': sum(1 for row in rows if not row['found']),
+            'expired': sum(1 for row in rows if self._is_expired(bool(row['found']), row['fetched_at'], now))
+        }
+    
+    def prune(self, remove_all: bool = False, older_than_days: Optional[float] = None,
+              negative_only: bool = False) -> int:
+        """
+        清理缓存
+        
+        默认只删除已过期的记录。
+        
+        Args:
+            remove_all: 删除全部记录
+            older_than_days: 删除早于指定天数获取的记录
+            negative_only: 只删除未找到结果的记录
+        
+        Returns:
+            删除的记录数
+        """
+        now = time.time()
+        with self._lock:
+            if remove_all:
+                cursor = self._conn.execute(
+                    'DELETE FROM results' + (' WHERE found = 0' if negative_only else ''))
+            elif older_than_days is not None:
+                cursor = self._conn.execute(
+                    'DELETE FROM results WHERE fetched_at < ?' + (' AND found = 0' if negative_only else ''),
+                    (now - older_than_days * SECONDS_PER_DAY,))
+            else:
+                # 默认只删除已过期的记录
+                query = 'DELETE FROM results WHERE (found = 0 AND fetched_at < ?)'
+                params = [now - self.negative_ttl]
+                if not negative_only:
+                    query += ' OR (found = 1 AND fetched_at < ?)'
+                    params.append(now - self.ttl)
+                cursor = self._conn.execute(query, params)
+            self._conn.commit()
+            return cursor.rowcount
+    
+    def export(self, output_path: str) -> int:
+        """
+        导出缓存
+        
+        .bib文件只导出找到结果的原始BibTeX，其他扩展名导出为JSON。
+        
+        Args:
+            output_path: 输出文件路径
+        
+        Returns:
+            导出的记录数
+        """
+        rows = self.rows()
+        if output_path.lower().endswith('.bib'):
+            rows = [row for row in rows if row['found'] and row['bibtex']]
+            with atomic_write(output_path) as f:
+                f.write('\n\n'.join(row['bibtex'].strip() for row in rows) + '\n')
+        else:
+            for row in rows:
+                row['found'] = bool(row['found'])
+                row['entry'] = json.loads(row.pop('entry_json')) if row['entry_json'] else None
+            with atomic_write(output_path) as f:
+                json.dump(rows, f, indent=2, ensure_ascii=False)
+        return len(rows)
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def _format_age(seconds: float) -> str:
+    """格式化缓存记录的存在时间"""
+    if seconds < 3600:
+        return f"{int(seconds // 60)}分钟"
+    if seconds < SECONDS_PER_DAY:
+        return f"{int(seconds // 3600)}小时"
+    return f"{int(seconds // SECONDS_PER_DAY)}天"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """缓存管理命令行入口"""
+    parser = argparse.ArgumentParser(description='Scholar检索结果缓存管理')
+    parser.add_argument('--db', default=DEFAULT_RESULT_CACHE_PATH, help='缓存数据库路径')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL_DAYS, help='找到结果的有效期（天）')
+    parser.add_argument('--negative-ttl', type=float, default=DEFAULT_NEGATIVE_TTL_DAYS,
+                        help='未找到结果的有效期（天）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    inspect_parser = subparsers.add_parser('inspect', help='显示缓存统计信息')
+    inspect_parser.add_argument('--list', action='store_true', help='列出所有缓存记录')
+    
+    prune_parser = subparsers.add_parser('prune', help='清理缓存（默认只删除过期记录）')
+    prune_parser.add_argument('--all', action='store_true', help='删除全部记录')
+    prune_parser.add_argument('--older-than', type=float, metavar='DAYS', help='删除早于指定天数的记录')
+    prune_parser.add_argument('--negative', action='store_true', help='只删除未找到结果的记录')
+    
+    export_parser = subparsers.add_parser('export', help='导出缓存（.bib或.json）')
+    export_parser.add_argument('output', help='输出文件路径')
+    
+    args = parser.parse_args(argv)
+    cache = ResultCache(args.db, ttl_days=args.ttl, negative_ttl_days=args.negative_ttl)
+    
+    try:
+        if args.command == 'inspect':
+            stats = cache.stats()
+            print(f"缓存文件: {cache.db_path}")
+            print(f"总记录数: {stats['total']}")
+            print(f"找到结果: {stats['found']}")
+            print(f"未找到结果: {stats['negative']}")
+            print(f"已过期: {stats['expired']}")
+            if args.list:
+                now = time.time()
+                for row in cache.rows():
+                    status = '✓' if row['found'] else '✗'
+                    print(f"  {status} [{_format_age(now - row['fetched_at'])}前] {row['title']}")
+        elif args.command == 'prune':
+            removed = cache.prune(remove_all=args.all, older_than_days=args.older_than,
+                                  negative_only=args.negative)
+            print(f"已删除 {removed} 条缓存记录")
+        elif args.command == 'export':
+            exported = cache.export(args.output)
+            print(f"已导出 {exported} 条缓存记录到: {args.output}")
+    finally:
+        cache.close()
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,41 +3,333 @@ Google Scholar爬虫模块
 负责自动搜索、提取和解析BibTeX数据
 """
 
+import os
 import time
-import random
 import re
-from typing import Optional, Dict
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, urlencode, urljoin
 import logging
 
+from comparator import FieldComparator
 from parser import parse_bibtex_string
+from rate_limiter import AdaptiveDelay
+from search_backend import SearchBackend
 
+try:
+    import fcntl
+except ImportError:
+    # Windows没有fcntl，配置目录只在本进程内互斥
+    fcntl = None
 
-class ScholarScraper:
+
+SCHOLAR_BASE_URL = 'https://scholar.google.com/'
+
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# 多个浏览器同时遇到验证码时，依次提示用户处理
+_CAPTCHA_PROMPT_LOCK = threading.Lock()
+
+# 持久化浏览器配置（Cookie等）的默认目录，每个同时运行的浏览器使用其中一个子目录
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bib_checker', 'chrome-profiles')
+
+# Chrome不允许两个实例共用同一配置目录。使用中的目录持有其中锁文件的flock，
+# 其他进程（如同时运行的另一次检查或守护进程）会跳过该目录；进程退出时锁自动释放。
+# 不支持flock的平台上只在本进程内互斥
+PROFILE_LOCK_FILE = '.bib_checker.lock'
+_PROFILE_LOCK = threading.Lock()
+# 本进程正在使用的配置目录 -> 锁文件（不支持flock时为None）
+_PROFILES_IN_USE: Dict[str, object] = {}
+
+# 精简模式下通过CDP屏蔽的非必要资源，按资源类型分组的URL模式
+LEAN_BLOCKED_RESOURCES = {
+    'stylesheet': ['*.css', '*.css?*'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.gstatic.com*'],
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.ico', '*.webp'],
+    'analytics': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*/gen_204*'],
+}
+
+# 读取页面的导航耗时和已加载资源数
+PAGE_TIMING_SCRIPT = """
+var navigation = performance.getEntriesByType('navigation')[0];
+return navigation ? [navigation.domContentLoadedEventEnd / 1000, performance.getEntriesByType('resource').length]
+                  : null;
+"""
+
+# 等待页面进入可识别状态的最长时间（秒）
+PAGE_WAIT_TIMEOUT = 10
+
+# 页面状态
+PAGE_RESULTS = 'results'
+PAGE_NO_RESULTS = 'no_results'
+PAGE_CAPTCHA = 'captcha'
+PAGE_ERROR = 'error'
+PAGE_BIBTEX_LINK = 'bibtex_link'
+
+# 第一个搜索结果的Cite按钮，按优先级排列
+CITE_BUTTON_SELECTORS = [
+    (By.CSS_SELECTOR, ".gs_or_cit.gs_or_btn.gs_nph"),
+    (By.CSS_SELECTOR, ".gs_or_cit"),
+    (By.XPATH, "//a[contains(@aria-label, 'Cite')]"),
+    (By.XPATH, "//div[@class='gs_ri']//a[contains(text(), 'Cite')]")
+]
+
+# 引用对话框中的BibTeX链接
+BIBTEX_LINK_SELECTORS = [
+    (By.LINK_TEXT, "BibTeX"),
+    (By.PARTIAL_LINK_TEXT, "BibTeX"),
+    (By.XPATH, "//a[contains(text(), 'BibTeX')]"),
+    (By.CSS_SELECTOR, "a[href*='scholar.bib']")
+]
+
+NO_RESULTS_XPATH = "//*[contains(text(), 'did not match any articles')]"
+
+# 搜索结果条目及其中的标题和Cite按钮
+RESULT_CSS = ".gs_r.gs_or"
+RESULT_TITLE_CSS = "h3.gs_rt"
+RESULT_CITE_CSS = ".gs_or_cit"
+
+# 标题前的 [PDF]、[BOOK][B]、[CITATION][C] 等类型标记
+RESULT_TYPE_MARKER_PATTERN = re.compile(r'^(?:\[[A-Z]+\]\s*)+')
+
+# 参与排序的搜索结果数，以及打开引用对话框所需的最低标题相似度
+CANDIDATE_COUNT = 5
+MIN_TITLE_SIMILARITY = 0.8
+
+# 在已打开的结果页中请求引用对话框并取出BibTeX链接，不点击Cite按钮、不等待弹窗；失败时返回null
+CITE_LINK_SCRIPT = """
+var url = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+var controller = new AbortController();
+setTimeout(function () { controller.abort(); }, timeout);
+fetch(url, {credentials: 'same-origin', signal: controller.signal})
+    .then(function (response) { return response.ok ? response.text() : ''; })
+    .then(function (html) {
+        var doc = new DOMParser().parseFromString(html, 'text/html');
+        var links = Array.prototype.filter.call(doc.querySelectorAll('a'), function (link) {
+            return link.textContent.trim() === 'BibTeX';
+        });
+        done(links.length ? links[0].getAttribute('href') : null);
+    })
+    .catch(function () { done(null); });
+"""
+
+
+class ResultCandidate(NamedTuple):
+    """搜索结果页上的一个结果"""
+    title: str
+    cite_button: object
+    # 结果ID（data-cid），用于直接请求引用对话框
+    cid: Optional[str] = None
+
+
+class PageState(NamedTuple):
+    """页面识别结果"""
+    kind: str
+    element: Optional[object] = None
+    # 找到元素的选择器序号
+    selector_index: int = 0
+
+
+def _first_match(driver, selectors: List[Tuple[str, str]]) -> Tuple[Optional[object], int]:
+    """返回第一个能找到元素的选择器对应的元素及其序号，不等待"""
+    for index, (by, selector) in enumerate(selectors):
+        elements = driver.find_elements(by, selector)
+        if elements:
+            return elements[0], index
+    return None, -1
+
+
+def _is_captcha(driver) -> bool:
+    return bool(driver.find_elements(By.ID, "gs_captcha_f")) or '/sorry/' in driver.current_url
+
+
+def classify_results_page(driver) -> Optional[PageState]:
+    """
+    识别搜索结果页的状态
+    
+    Args:
+        driver: WebDriver
+    
+    Returns:
+        PageState（results、no_results、captcha或error），页面尚未加载到可判断的程度时返回None
+    """
+    if _is_captcha(driver):
+        return PageState(PAGE_CAPTCHA)
+    element, index = _first_match(driver, CITE_BUTTON_SELECTORS)
+    if element is not None:
+        return PageState(PAGE_RESULTS, element, index)
+    if driver.find_elements(By.XPATH, NO_RESULTS_XPATH):
+        return PageState(PAGE_NO_RESULTS)
+    if driver.execute_script("return document.readyState") in ('interactive', 'complete'):
+        # 页面已解析完毕（eager加载策略下不等待load事件）：有结果容器但没有结果条目视为无结果，连结果容器都没有视为错误页
+        if driver.find_elements(By.ID, "gs_res_ccl_mid"):
+            if not driver.find_elements(By.CSS_SELECTOR, ".gs_r"):
+                return PageState(PAGE_NO_RESULTS)
+        else:
+            return PageState(PAGE_ERROR)
+    return None
+
+
+def classify_cite_dialog(driver) -> Optional[PageState]:
+    """
+    识别点击Cite后引用对话框的状态
+    
+    Returns:
+        PageState（bibtex_link或captcha），对话框尚未加载时返回None
+    """
+    if _is_captcha(driver):
+        return PageState(PAGE_CAPTCHA)
+    element, index = _first_match(driver, BIBTEX_LINK_SELECTORS)
+    if element is not None:
+        return PageState(PAGE_BIBTEX_LINK, element, index)
+    return None
+
+
+def cite_dialog_params(cid: str) -> Dict[str, str]:
+    """按结果ID构造引用对话框请求的查询参数"""
+    return {'q': f'info:{cid}:scholar.google.com/', 'output': 'cite', 'scirp': '0', 'hl': 'en'}
+
+
+def clean_result_title(text: str) -> str:
+    """去掉搜索结果标题中的空白和类型标记"""
+    return RESULT_TYPE_MARKER_PATTERN.sub('', ' '.join(text.split()))
+
+
+def best_candidate(title: str, candidate_titles: List[str]) -> Tuple[Optional[int], float]:
+    """
+    在前CANDIDATE_COUNT个搜索结果中找出与查询标题最相似的一个
+    
+    Args:
+        title: 查询标题
+        candidate_titles: 按排名排列的搜索结果标题
+    
+    Returns:
+        (结果序号, 相似度)；最高相似度低于MIN_TITLE_SIMILARITY时序号为None。相似度相同时排名靠前的优先
+    """
+    best_index, best_score = None, 0.0
+    for index, candidate in enumerate(candidate_titles[:CANDIDATE_COUNT]):
+        score = FieldComparator.title_similarity(title, candidate)
+        if score > best_score:
+            best_index, best_score = index, score
+    if best_score < MIN_TITLE_SIMILARITY:
+        return None, best_score
+    return best_index, best_score
+
+
+def lean_blocked_urls(enable_images: bool = False) -> List[str]:
+    """
+    精简模式下屏蔽的URL模式
+    
+    Args:
+        enable_images: 是否加载图片（显示验证码时需要）
+    
+    Returns:
+        传给Network.setBlockedURLs的URL模式列表
+    """
+    return [pattern for kind, patterns in LEAN_BLOCKED_RESOURCES.items()
+            if not (enable_images and kind == 'image') for pattern in patterns]
+
+
+def _claim_profile_dir(base_dir: str) -> str:
+    """在base_dir下分配一个没有其他浏览器（包括其他进程中的浏览器）使用的配置目录"""
+    with _PROFILE_LOCK:
+        index = 0
+        while True:
+            path = os.path.join(base_dir, f'profile-{index}')
+            index += 1
+            if path in _PROFILES_IN_USE:
+                continue
+            os.makedirs(path, exist_ok=True)
+            lock_file = None
+            if fcntl is not None:
+                lock_file = open(os.path.join(path, PROFILE_LOCK_FILE), 'a')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    continue
+            _PROFILES_IN_USE[path] = lock_file
+            return path
+
+
+def _release_profile_dir(path: str):
+    """释放配置目录的锁"""
+    with _PROFILE_LOCK:
+        lock_file = _PROFILES_IN_USE.pop(path, None)
+    if lock_file is not None:
+        # 关闭文件即释放flock
+        lock_file.close()
+
+
+def sequential_wait_seconds(state: Optional[PageState], selector_count: int, elapsed: float) -> float:
+    """
+    估算逐个选择器各自等待PAGE_WAIT_TIMEOUT秒的方式在同一页面上要花的时间
+    
+    Args:
+        state: 本次识别结果，超时为None
+        selector_count: 选择器数量
+        elapsed: 本次实际等待的秒数
+    
+    Returns:
+        逐个等待方式的耗时（秒）
+    """
+    if state is None:
+        return selector_count * PAGE_WAIT_TIMEOUT
+    if state.element is not None:
+        # 排在前面的选择器各自等满超时后才轮到匹配的选择器
+        return state.selector_index * PAGE_WAIT_TIMEOUT + elapsed
+    if state.kind == PAGE_CAPTCHA:
+        # 验证码在等待前就会被检查出来
+        return elapsed
+    return selector_count * PAGE_WAIT_TIMEOUT
+
+
+class ScholarScraper(SearchBackend):
     """Google Scholar爬虫类"""
     
-    def __init__(self, headless: bool = False, delay_range: tuple = (2, 4)):
+    def __init__(self, headless: bool = False, delay_range: tuple = (2, 4), result_cache=None,
+                 rate_limiter=None, rate_controller: Optional[AdaptiveDelay] = None,
+                 base_url: str = SCHOLAR_BASE_URL, lean: bool = False, profile_dir: Optional[str] = None):
         """
         初始化爬虫
         
         Args:
             headless: 是否使用无头模式
-            delay_range: 延迟范围（秒），格式为(min, max)
+            delay_range: 请求间隔的下限和上限（秒），格式为(min, max)
+            result_cache: 检索结果缓存（ResultCache），为None时不使用缓存
+            rate_limiter: 请求限速器（TokenBucket），每次访问Scholar前取一个令牌
+            rate_controller: 自适应间隔控制器，多个浏览器可以共享；默认按delay_range新建
+            base_url: Scholar根地址，测试时指向模拟服务器
+            lean: 精简模式，屏蔽样式表、字体、图片和统计脚本，页面DOM就绪后即返回
+            profile_dir: 持久化浏览器配置的目录，Cookie在多次运行之间保留；为None时每次使用临时配置
         """
+        super().__init__(result_cache)
         self.headless = headless
+        self.lean = lean
+        self.profile_dir = profile_dir
+        # 本浏览器占用的配置子目录，关闭浏览器时释放
+        self._profile_path = None
         self.delay_range = delay_range
+        self.rate_controller = rate_controller or AdaptiveDelay(delay_range[0], delay_range[1])
+        self.rate_limiter = rate_limiter
+        self.base_url = base_url if base_url.endswith('/') else base_url + '/'
         self.driver = None
         self.logger = logging.getLogger(__name__)
         self.images_enabled = False  # 跟踪图片是否已启用
-        
+        # 最近一次遇到的验证码页面，统一处理验证码时打开
+        self.pending_captcha_url = None
+        # 页面识别比逐个选择器等待节省的秒数：最近一次检索和累计
+        self.last_wait_saved = 0.0
+        self.wait_seconds_saved = 0.0
+    
     def _init_driver(self, enable_images: bool = False):
         """初始化Chrome WebDriver
         
@@ -51,10 +343,20 @@ class ScholarScraper:
         
         # 反爬虫设置
         chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
         chrome_options.add_experimental_option('useAutomationExtension', False)
         
+        if self.lean:
+            # DOMContentLoaded后即返回，不等待load事件
+            chrome_options.page_load_strategy = 'eager'
+        
+        if self.profile_dir:
+            # 验证码重启浏览器时继续使用同一目录，保留刚通过验证的Cookie
+            if self._profile_path is None:
+                self._profile_path = _claim_profile_dir(self.profile_dir)
+            chrome_options.add_argument(f'--user-data-dir={self._profile_path}')
+        
         # 根据参数决定是否禁用图片
         if not enable_images:
             # 禁用图片加载以加速（正常搜索时）
@@ -78,12 +380,171 @@ class ScholarScraper:
             '''
         })
         
-        self.logger.info("Chrome WebDriver initialized")
+        if self.lean:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': lean_blocked_urls(enable_images)})
+        
+        self.logger.info(f"Chrome WebDriver initialized (lean: {self.lean}, profile: {self._profile_path or 'temporary'})")
+    
+    def warm_up(self):
+        """预先启动浏览器"""
+        if self.driver is None:
+            self._init_driver()
+    
+    def _throttle(self):
+        """访问Scholar前等待限速器放行"""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
     
     def _random_delay(self):
-        """随机延迟"""
-        delay = random.uniform(self.delay_range[0], self.delay_range[1])
-        time.sleep(delay)
+        """按自适应控制器给出的间隔延迟"""
+        time.sleep(self.rate_controller.next_delay())
+    
+    def _load_page(self, url: str, phase: str = 'search') -> bool:
+        """
+        打开页面并记录加载耗时
+        
+        Args:
+            url: 页面地址
+            phase: 检索阶段名称（search或bibtex），用于耗时统计
+        
+        Returns:
+            是否响应缓慢
+        """
+        self._throttle()
+        started = time.monotonic()
+        self.driver.get(url)
+        elapsed = time.monotonic() - started
+        self._record_timing(phase, elapsed)
+        self._log_page_timing(phase, elapsed)
+        return self.rate_controller.observe_response(elapsed)
+    
+    def _log_page_timing(self, phase: str, elapsed: float):
+        """记录页面的DOMContentLoaded耗时和加载的资源数，用于比较精简模式的效果"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        try:
+            timing = self.driver.execute_script(PAGE_TIMING_SCRIPT)
+        except Exception:
+            timing = None
+        if timing:
+            self.logger.debug(f"Loaded {phase} page in {elapsed:.2f}s "
+                              f"(DOMContentLoaded {timing[0]:.2f}s, {timing[1]} resources, lean: {self.lean})")
+    
+    def _wait_for_state(self, classify: Callable, selector_count: int) -> Optional[PageState]:
+        """
+        等待页面进入任一可识别状态，只等待一次
+        
+        Args:
+            classify: 页面识别函数，接受driver，无法判断时返回None
+            selector_count: 识别用的选择器数量，用于估算节省的时间
+        
+        Returns:
+            PageState，超时返回None
+        """
+        started = time.monotonic()
+        try:
+            state = WebDriverWait(self.driver, PAGE_WAIT_TIMEOUT, poll_frequency=0.2).until(classify)
+        except TimeoutException:
+            state = None
+        elapsed = time.monotonic() - started
+        saved = sequential_wait_seconds(state, selector_count, elapsed) - elapsed
+        self.last_wait_saved += saved
+        self.wait_seconds_saved += saved
+        return state
+    
+    def _result_candidates(self) -> List[ResultCandidate]:
+        """
+        从已加载的结果页提取前CANDIDATE_COUNT个结果的标题、Cite按钮和结果ID
+        
+        Returns:
+            ResultCandidate列表，缺少标题或Cite按钮的结果跳过
+        """
+        candidates = []
+        for result in self.driver.find_elements(By.CSS_SELECTOR, RESULT_CSS)[:CANDIDATE_COUNT]:
+            titles = result.find_elements(By.CSS_SELECTOR, RESULT_TITLE_CSS)
+            buttons = result.find_elements(By.CSS_SELECTOR, RESULT_CITE_CSS)
+            if titles and buttons:
+                candidate_title = clean_result_title(titles[0].text)
+                if candidate_title:
+                    candidates.append(ResultCandidate(candidate_title, buttons[0], result.get_attribute('data-cid')))
+        return candidates
+    
+    def _direct_bibtex_url(self, cid: str) -> Optional[str]:
+        """
+        按结果ID直接请求引用对话框，取出BibTeX链接
+        
+        Args:
+            cid: 结果ID
+        
+        Returns:
+            BibTeX链接，请求失败或对话框中没有链接时返回None
+        """
+        cite_url = f"{urljoin(self.base_url, 'scholar')}?{urlencode(cite_dialog_params(cid))}"
+        self._throttle()
+        started = time.monotonic()
+        try:
+            href = self.driver.execute_async_script(CITE_LINK_SCRIPT, cite_url, PAGE_WAIT_TIMEOUT * 1000)
+        except WebDriverException as e:
+            self.logger.debug(f"Direct cite request failed: {str(e)}")
+            href = None
+        self._record_timing('cite', time.monotonic() - started)
+        return urljoin(cite_url, href) if href else None
+    
+    def _dialog_bibtex_url(self, title: str, cite_button) -> Optional[str]:
+        """
+        点击Cite按钮，从弹出的引用对话框中取出BibTeX链接
+        
+        Args:
+            title: 论文标题，用于日志
+            cite_button: Cite按钮
+        
+        Returns:
+            BibTeX链接，对话框中没有链接时返回None
+        """
+        self._throttle()
+        started = time.monotonic()
+        cite_button.click()
+        
+        # 在弹出的对话框中找到BibTeX链接
+        dialog = self._wait_for_state(classify_cite_dialog, len(BIBTEX_LINK_SELECTORS))
+        self._record_timing('cite', time.monotonic() - started)
+        self._random_delay()
+        if dialog is not None and dialog.kind == PAGE_CAPTCHA:
+            return self._defer_captcha(title)
+        if dialog is None:
+            self.logger.warning(f"No BibTeX link found for: {title}")
+            return None
+        return dialog.element.get_attribute('href')
+    
+    def _defer_captcha(self, title: str) -> None:
+        """遇到验证码时记下验证码页面并推迟该标题，不等待用户处理"""
+        self.rate_controller.record_pushback('captcha')
+        self.pending_captcha_url = self.driver.current_url
+        self.last_lookup_status = 'captcha'
+        self.logger.warning(f"CAPTCHA detected, deferring: {title}")
+        return None
+    
+    def solve_captcha(self) -> bool:
+        """
+        统一处理验证码：启用图片重启浏览器，打开最近一次的验证码页面，等待用户处理一次
+        
+        Returns:
+            True
+        """
+        url = self.pending_captcha_url or urljoin(self.base_url, 'scholar')
+        if self.driver is not None and not self.images_enabled:
+            self.logger.warning("Restarting browser with images enabled to show the CAPTCHA...")
+            self.driver.quit()
+            self.driver = None
+        if self.driver is None:
+            self._init_driver(enable_images=True)
+        self.driver.get(url)
+        
+        with _CAPTCHA_PROMPT_LOCK:
+            input("Please solve the CAPTCHA in the browser and press Enter to retry the deferred titles...")
+        self.pending_captcha_url = None
+        return True
     
     def search_paper(self, title: str) -> Optional[Dict]:
         """
@@ -91,66 +552,70 @@ class ScholarScraper:
         
         Args:
             title: 论文标题
-            
+        
         Returns:
             BibTeX字典，如果失败返回None
         """
+        self.last_lookup_status = 'error'
+        self.last_bibtex_text = None
+        self.last_wait_saved = 0.0
+        
         if self.driver is None:
             self._init_driver()
         
         try:
             # 构建搜索URL
             encoded_title = quote_plus(title)
-            search_url = f"https://scholar.google.com/scholar?q={encoded_title}"
+            search_url = f"{urljoin(self.base_url, 'scholar')}?q={encoded_title}"
             
             self.logger.info(f"Searching: {title}")
-            self.driver.get(search_url)
+            # 本次检索中没有受阻时才缩短间隔
+            healthy = not self._load_page(search_url)
             
-            # 检查是否遇到验证码
-            if self._check_captcha():
-                if not self.images_enabled:
-                    self.logger.warning("CAPTCHA detected! Restarting browser with images enabled...")
-                    
-                    # 保存当前URL
-                    current_url = self.driver.current_url
-                    
-                    # 关闭当前driver
-                    self.driver.quit()
-                    
-                    # 用启用图片的配置重新初始化
-                    self._init_driver(enable_images=True)
-                    
-                    # 导航回验证码页面
-                    self.driver.get(current_url)
-                    time.sleep(2)  # 等待页面和图片加载
-                    
-                    self.logger.warning("Browser restarted with images enabled. CAPTCHA should now be visible.")
-                else:
-                    self.logger.warning("CAPTCHA detected!")
-                
-                input("Please solve the CAPTCHA and press Enter...")
+            # 一次等待识别结果页、无结果页、验证码或错误页
+            state = self._wait_for_state(classify_results_page, len(CITE_BUTTON_SELECTORS))
+            if state is not None and state.kind == PAGE_CAPTCHA:
+                return self._defer_captcha(title)
             
             self._random_delay()
             
-            # 查找第一个搜索结果的Cite按钮
-            cite_button = self._find_cite_button()
-            if cite_button is None:
-                self.logger.warning(f"No cite button found for: {title}")
+            if state is None or state.kind == PAGE_ERROR:
+                self.logger.warning(f"Unrecognized or error page ({state.kind if state else 'timeout'}) for: {title}")
+                self.rate_controller.record_pushback('error page')
                 return None
             
-            # 点击Cite按钮
-            cite_button.click()
-            self._random_delay()
-            
-            # 在弹出的对话框中找到BibTeX链接
-            bibtex_link = self._find_bibtex_link()
-            if bibtex_link is None:
-                self.logger.warning(f"No BibTeX link found for: {title}")
+            if state.kind == PAGE_NO_RESULTS:
+                self.logger.warning(f"No search results found for: {title}")
+                self.last_lookup_status = 'not_found'
+                # 结果页为空可能是Scholar在限流
+                self.rate_controller.record_pushback('empty results')
                 return None
             
-            # 点击BibTeX链接
-            bibtex_url = bibtex_link.get_attribute('href')
-            self.driver.get(bibtex_url)
+            # 只为与查询标题足够相似的结果打开引用对话框；页面结构不同、无法提取候选时使用第一个Cite按钮
+            candidate = ResultCandidate('', state.element)
+            candidates = self._result_candidates()
+            if candidates:
+                index, score = best_candidate(title, [c.title for c in candidates])
+                if index is None:
+                    self.logger.warning(f"No search result similar enough (best {score:.2f}) for: {title}")
+                    self.last_lookup_status = 'not_found'
+                    return None
+                candidate = candidates[index]
+                if index > 0:
+                    self.logger.info(f"Using search result #{index + 1} (similarity {score:.2f}) for: {title}")
+            
+            # 按结果ID直接请求引用对话框，失败时退回点击Cite按钮、等待弹窗
+            bibtex_url = self._direct_bibtex_url(candidate.cid) if candidate.cid else None
+            if bibtex_url is None:
+                if candidate.cid:
+                    self.logger.info(f"Direct cite request failed, falling back to the cite dialog for: {title}")
+                bibtex_url = self._dialog_bibtex_url(title, candidate.cite_button)
+                if bibtex_url is None:
+                    return None
+            
+            # 打开BibTeX链接
+            if self._load_page(bibtex_url, phase='bibtex'):
+                healthy = False
             self._random_delay()
             
             # 提取BibTeX内容
@@ -161,80 +626,25 @@ class ScholarScraper:
             
             # 解析BibTeX
             bibtex_dict = parse_bibtex_string(bibtex_text)
+            if not bibtex_dict:
+                # 解析失败按出错处理，不缓存
+                self.logger.warning(f"Failed to parse BibTeX for: {title}")
+                return None
+            self.last_lookup_status = 'found'
+            self.last_bibtex_text = bibtex_text
+            if healthy:
+                self.rate_controller.record_success()
             self.logger.info(f"Successfully retrieved BibTeX for: {title}")
             
             return bibtex_dict
-            
+        
         except Exception as e:
             self.logger.error(f"Error searching paper '{title}': {str(e)}")
             return None
-    
-    def _check_captcha(self) -> bool:
-        """检查是否遇到验证码"""
-        try:
-            captcha_element = self.driver.find_element(By.ID, "gs_captcha_f")
-            return captcha_element is not None
-        except NoSuchElementException:
-            return False
-    
-    def _find_cite_button(self) -> Optional[webdriver.remote.webelement.WebElement]:
-        """查找第一个搜索结果的Cite按钮"""
-        try:
-            # 等待搜索结果加载
-            wait = WebDriverWait(self.driver, 10)
-            
-            # 尝试多种选择器
-            selectors = [
-                (By.CSS_SELECTOR, ".gs_or_cit.gs_or_btn.gs_nph"),
-                (By.CSS_SELECTOR, ".gs_or_cit"),
-                (By.XPATH, "//a[contains(@aria-label, 'Cite')]"),
-                (By.XPATH, "//div[@class='gs_ri']//a[contains(text(), 'Cite')]")
-            ]
-            
-            for by, selector in selectors:
-                try:
-                    cite_button = wait.until(
-                        EC.presence_of_element_located((by, selector))
-                    )
-                    if cite_button:
-                        return cite_button
-                except TimeoutException:
-                    continue
-            
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"Error finding cite button: {str(e)}")
-            return None
-    
-    def _find_bibtex_link(self) -> Optional[webdriver.remote.webelement.WebElement]:
-        """在引用对话框中查找BibTeX链接"""
-        try:
-            wait = WebDriverWait(self.driver, 10)
-            
-            # 尝试多种选择器
-            selectors = [
-                (By.LINK_TEXT, "BibTeX"),
-                (By.PARTIAL_LINK_TEXT, "BibTeX"),
-                (By.XPATH, "//a[contains(text(), 'BibTeX')]"),
-                (By.CSS_SELECTOR, "a[href*='scholar.bib']")
-            ]
-            
-            for by, selector in selectors:
-                try:
-                    bibtex_link = wait.until(
-                        EC.presence_of_element_located((by, selector))
-                    )
-                    if bibtex_link:
-                        return bibtex_link
-                except TimeoutException:
-                    continue
-            
-            return None
-            
-        except Exception as e:
-            self.logger.error(f"Error finding BibTeX link: {str(e)}")
-            return None
+        finally:
+            if self.last_wait_saved > 0:
+                self.logger.info(f"Page classification saved {self.last_wait_saved:.1f}s of selector waits "
+                                 f"for: {title}")
     
     def _extract_bibtex_text(self) -> Optional[str]:
         """从BibTeX页面提取文本"""
@@ -252,50 +662,17 @@ class ScholarScraper:
                 return body_text.strip()
             
             return None
-            
+        
         except Exception as e:
             self.logger.error(f"Error extracting BibTeX text: {str(e)}")
             return None
     
-    def batch_search(self, titles: list, progress_callback=None) -> Dict[str, Optional[Dict]]:
-        """
-        批量搜索论文
-        
-        Args:
-            titles: 论文标题列表
-            progress_callback: 进度回调函数，接受(current, total)参数
-            
-        Returns:
-            字典，键为标题，值为BibTeX字典或None
-        """
-        results = {}
-        total = len(titles)
-        
-        for i, title in enumerate(titles, 1):
-            result = self.search_paper(title)
-            results[title] = result
-            
-            if progress_callback:
-                progress_callback(i, total)
-            
-            # 每10次搜索后增加额外延迟
-            if i % 10 == 0:
-                self.logger.info("Taking a longer break to avoid rate limiting...")
-                time.sleep(random.uniform(5, 10))
-        
-        return results
-    
     def close(self):
         """关闭浏览器"""
         if self.driver:
             self.driver.quit()
             self.driver = None
             self.logger.info("Chrome WebDriver closed")
-    
-    def __enter__(self):
-        """上下文管理器入口"""
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        """上下文管理器出口"""
-        self.close()
+        if self._profile_path is not None:
+            _release_profile_dir(self._profile_path)
+            self._profile_path = None
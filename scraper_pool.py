@@ -0,0 +1,244 @@
+"""
+并行检索模块
+多个浏览器（或HTTP会话）从共享队列中领取标题并行检索，由同一个令牌桶限制总请求速率
+"""
+
+import logging
+import queue
+import threading
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from rate_limiter import AdaptiveDelay
+from scholar_scraper import ScholarScraper
+from search_backend import SearchBackend, drain_deferred
+
+
+logger = logging.getLogger(__name__)
+
+# 队列结束标记
+_STOP = object()
+
+# 每个浏览器最多排队的任务数，任务队列满时先消费已完成的结果
+TASKS_PER_WORKER = 2
+
+
+class ScraperPool:
+    """浏览器工作池"""
+    
+    def __init__(self, workers: int = 2, headless: bool = False, delay_range: tuple = (2, 4),
+                 rate_limiter=None, rate_controller: Optional[AdaptiveDelay] = None, result_cache=None,
+                 scraper_factory: Optional[Callable[..., SearchBackend]] = None, keep_alive: bool = False):
+        """
+        初始化工作池
+        
+        Args:
+            workers: 浏览器数量
+            headless: 是否使用无头模式（默认的浏览器后端）
+            delay_range: 请求间隔的下限和上限（秒）
+            rate_limiter: 所有浏览器共享的限速器（TokenBucket）
+            rate_controller: 所有浏览器共享的自适应间隔控制器，默认按delay_range新建
+            result_cache: 检索结果缓存（ResultCache）
+            scraper_factory: 创建检索后端的函数，以delay_range、rate_limiter和rate_controller
+                为关键字参数调用；默认创建ScholarScraper
+            keep_alive: 检索结束后保留浏览器供下次检索复用，直到调用close（守护进程使用）
+        """
+        self.workers = max(1, workers)
+        self.headless = headless
+        self.delay_range = delay_range
+        self.rate_limiter = rate_limiter
+        # 任一浏览器遇到验证码时所有浏览器一起放慢
+        self.rate_controller = rate_controller or AdaptiveDelay(delay_range[0], delay_range[1])
+        self.result_cache = result_cache
+        self.scraper_factory = scraper_factory or partial(ScholarScraper, headless=headless)
+        self.keep_alive = keep_alive
+        self.cache_hits = 0
+        # 需要用户处理验证码时的通知回调，接受推迟的标题列表
+        self.captcha_hook: Optional[Callable[[List[str]], None]] = None
+        self._scrapers: List[SearchBackend] = []
+    
+    def _worker(self, scraper: SearchBackend, tasks: queue.Queue, done: queue.Queue,
+                stop: threading.Event):
+        """工作线程：领取标题并检索，结果放入完成队列"""
+        while True:
+            title = tasks.get()
+            if title is _STOP or stop.is_set():
+                break
+            try:
+                result = scraper.search_paper(title)
+                done.put((title, result, scraper.last_lookup_status, scraper.last_bibtex_text))
+            except Exception as e:
+                # 浏览器启动失败等search_paper之外的错误，按检索失败处理
+                logger.error(f"Worker failed on '{title}': {str(e)}")
+                done.put((title, None, 'error', None))
+    
+    def batch_search(self, titles: list, progress_callback=None, journal=None) -> Dict[str, Optional[Dict]]:
+        """
+        并行批量搜索论文
+        
+        Args:
+            titles: 论文标题列表
+            progress_callback: 进度回调函数，接受(current, total)参数
+            journal: 断点日志（CheckpointJournal）
+        
+        Returns:
+            字典，键为标题，值为BibTeX字典或None，与ScholarScraper.batch_search相同
+        """
+        results = {}
+        # 重复的标题只检索一次
+        unique_titles = list(dict.fromkeys(titles))
+        total = len(unique_titles)
+        
+        for completed, (title, result) in enumerate(self.iter_search(unique_titles, journal), 1):
+            results[title] = result
+            if progress_callback:
+                progress_callback(completed, total)
+        
+        return {title: results[title] for title in unique_titles}
+    
+    def iter_search(self, titles, journal=None) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        并行检索论文，按完成顺序产出结果
+        
+        日志和缓存中已有的标题在主线程直接产出，其余标题放入有界任务队列交给浏览器检索；
+        队列满时先产出已完成的结果，因此无论有多少标题，排队中的任务数都不超过上限。
+        缓存写入和日志记录都在主线程完成。遇到验证码的标题先推迟，其他浏览器继续检索；
+        全部标题检索完后由遇到验证码的一个浏览器统一处理验证码，再依次重新检索推迟的标题。
+        
+        Args:
+            titles: 论文标题的可迭代对象，按需读取
+            journal: 断点日志（CheckpointJournal）
+        
+        Yields:
+            (标题, BibTeX字典或None)，顺序与输入顺序不一定相同
+        """
+        tasks = queue.Queue(maxsize=self.workers * TASKS_PER_WORKER)
+        deferred = []
+        done = queue.Queue()
+        stop = threading.Event()
+        threads = []
+        # 已放入任务队列但尚未产出的标题数
+        outstanding = 0
+        
+        try:
+            for title in titles:
+                if journal is not None and title in journal.completed:
+                    yield title, journal.completed[title]
+                    continue
+                if self.result_cache is not None:
+                    hit, result = self.result_cache.lookup(title)
+                    if hit:
+                        self.cache_hits += 1
+                        logger.info(f"Cache hit: {title}")
+                        if journal is not None:
+                            journal.record(title, result)
+                        yield title, result
+                        continue
+                
+                if len(threads) < self.workers:
+                    threads.append(self._start_worker(len(threads), tasks, done, stop))
+                while True:
+                    try:
+                        tasks.put_nowait(title)
+                        break
+                    except queue.Full:
+                        # 所有浏览器都在忙，等一个结果完成后再放入
+                        yield from self._finish(done.get(), journal, deferred)
+                        outstanding -= 1
+                outstanding += 1
+                
+                # 顺便产出已经完成的结果，不等待
+                while True:
+                    try:
+                        item = done.get_nowait()
+                    except queue.Empty:
+                        break
+                    yield from self._finish(item, journal, deferred)
+                    outstanding -= 1
+            
+            for _ in threads:
+                tasks.put(_STOP)
+            while outstanding:
+                yield from self._finish(done.get(), journal, deferred)
+                outstanding -= 1
+            
+            if deferred:
+                # 工作线程都已结束，在主线程用遇到验证码的浏览器处理
+                solver = next((scraper for scraper in self._scrapers
+                               if getattr(scraper, 'pending_captcha_url', None)), self._scrapers[0])
+                yield from drain_deferred(solver, deferred, self.captcha_hook,
+                                          lambda *item: self._store(*item, journal))
+        finally:
+            # 正常结束时线程已领到结束标记；中断时通知线程停止，并关闭浏览器打断正在进行的检索。
+            # 保留浏览器时等待正在进行的检索结束，避免下次检索与之共用同一个浏览器
+            stop.set()
+            if self.keep_alive:
+                # 唤醒还在等待任务的线程；队列已满时线程取到任何任务都会看到停止标记
+                for _ in threads:
+                    try:
+                        tasks.put_nowait(_STOP)
+                    except queue.Full:
+                        break
+                for thread in threads:
+                    thread.join()
+            else:
+                self.close()
+                for thread in threads:
+                    thread.join(timeout=5)
+    
+    def _get_scraper(self, index: int) -> SearchBackend:
+        """取第index个检索后端，尚未创建时新建"""
+        if index < len(self._scrapers):
+            return self._scrapers[index]
+        scraper = self.scraper_factory(delay_range=self.delay_range, rate_limiter=self.rate_limiter,
+                                       rate_controller=self.rate_controller)
+        self._scrapers.append(scraper)
+        logger.info(f"Started browser worker {len(self._scrapers)}/{self.workers}")
+        return scraper
+    
+    def _start_worker(self, index: int, tasks: queue.Queue, done: queue.Queue,
+                      stop: threading.Event) -> threading.Thread:
+        """为第index个检索后端启动工作线程"""
+        thread = threading.Thread(target=self._worker, args=(self._get_scraper(index), tasks, done, stop),
+                                  daemon=True)
+        thread.start()
+        return thread
+    
+    def warm_up(self):
+        """预先创建并启动所有浏览器"""
+        for index in range(self.workers):
+            self._get_scraper(index).warm_up()
+    
+    def _finish(self, item: tuple, journal, deferred: List[str]) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """处理工作线程完成的一个检索，写入缓存和日志后产出；遇到验证码的标题推迟，不产出"""
+        title, result, status, bibtex_text = item
+        if status == 'captcha':
+            deferred.append(title)
+            return
+        self._store(title, result, status, bibtex_text, journal)
+        yield title, result
+    
+    def _store(self, title: str, result: Optional[Dict], status: str, bibtex_text: Optional[str], journal):
+        """写入缓存和断点日志；出错（超时、验证码等）的结果不缓存也不记入日志，下次重新检索"""
+        if status in ('found', 'not_found'):
+            if self.result_cache is not None:
+                self.result_cache.store(title, result, bibtex_text)
+            if journal is not None:
+                journal.record(title, result)
+    
+    def close(self):
+        """关闭所有浏览器"""
+        for scraper in self._scrapers:
+            try:
+                scraper.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser: {str(e)}")
+        self._scrapers = []
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
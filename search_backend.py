@@ -0,0 +1,179 @@
+"""
+检索后端基类模块
+Google Scholar（浏览器或HTTP）和离线索引等检索后端共用的批量检索流程
+"""
+
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class SearchBackend:
+    """
+    检索后端基类
+    
+    子类实现search_paper，并在每次检索后设置last_lookup_status：
+    'found'、'not_found'（数据源中没有该论文）、'error'（超时、验证码等，下次应重新检索）
+    或'captcha'（遇到验证码且可以由用户处理，该标题推迟到批量检索的最后，统一处理验证码后重新检索）。
+    """
+    
+    def __init__(self, result_cache=None):
+        """
+        初始化检索后端
+        
+        Args:
+            result_cache: 检索结果缓存（ResultCache），为None时不使用缓存
+        """
+        self.result_cache = result_cache
+        self.cache_hits = 0
+        # 最近一次检索的状态和数据源返回的原始BibTeX
+        self.last_lookup_status = None
+        self.last_bibtex_text = None
+        # 各阶段（search、cite、bibtex）耗时的回调，接受(阶段, 秒数)参数，用于基准测试
+        self.timing_hook = None
+        # 需要用户处理验证码时的通知回调，接受推迟的标题列表；在等待用户处理之前调用
+        self.captcha_hook: Optional[Callable[[List[str]], None]] = None
+        self.logger = logging.getLogger(type(self).__module__)
+    
+    def search_paper(self, title: str) -> Optional[Dict]:
+        """
+        检索论文
+        
+        Args:
+            title: 论文标题
+        
+        Returns:
+            BibTeX字典，如果失败返回None
+        """
+        raise NotImplementedError
+    
+    def solve_captcha(self) -> bool:
+        """
+        让用户一次性处理验证码，之后重新检索推迟的标题
+        
+        Returns:
+            是否已处理；不支持人工处理的后端返回False，推迟的标题记为检索失败
+        """
+        return False
+    
+    def _record_timing(self, phase: str, seconds: float):
+        """把一个阶段的耗时报告给timing_hook"""
+        if self.timing_hook is not None:
+            self.timing_hook(phase, seconds)
+    
+    def iter_search(self, titles, journal=None) -> Iterator[Tuple[str, Optional[Dict]]]:
+        """
+        逐个检索论文，每完成一个标题立即产出结果
+        
+        Args:
+            titles: 论文标题的可迭代对象，可以是边读边产生标题的生成器
+            journal: 断点日志（CheckpointJournal），已记录的标题直接使用记录的结果，
+                新完成的检索立即追加到日志
+        
+        Yields:
+            (标题, BibTeX字典或None)；遇到验证码的标题在其余标题检索完、统一处理验证码后产出
+        """
+        deferred = []
+        for title in titles:
+            if journal is not None and title in journal.completed:
+                yield title, journal.completed[title]
+                continue
+            
+            if self.result_cache is not None:
+                hit, result = self.result_cache.lookup(title)
+                if hit:
+                    self.cache_hits += 1
+                    self.logger.info(f"Cache hit: {title}")
+                    if journal is not None:
+                        journal.record(title, result)
+                    yield title, result
+                    continue
+            
+            result = self.search_paper(title)
+            if self.last_lookup_status == 'captcha':
+                # 不等待用户处理，继续检索其余标题
+                deferred.append(title)
+                continue
+            self._store(title, result, self.last_lookup_status, self.last_bibtex_text, journal)
+            yield title, result
+        
+        yield from drain_deferred(self, deferred, self.captcha_hook,
+                                  lambda *item: self._store(*item, journal))
+    
+    def _store(self, title: str, result: Optional[Dict], status: str, bibtex_text: Optional[str], journal):
+        """写入缓存和断点日志；出错（超时、验证码等）的结果不缓存也不记入日志，下次重新检索"""
+        if status in ('found', 'not_found'):
+            if self.result_cache is not None:
+                self.result_cache.store(title, result, bibtex_text)
+            if journal is not None:
+                journal.record(title, result)
+    
+    def batch_search(self, titles: list, progress_callback=None, journal=None) -> Dict[str, Optional[Dict]]:
+        """
+        批量搜索论文
+        
+        Args:
+            titles: 论文标题列表
+            progress_callback: 进度回调函数，接受(current, total)参数
+            journal: 断点日志（CheckpointJournal），已记录的标题直接使用记录的结果，
+                新完成的检索立即追加到日志
+        
+        Returns:
+            字典，键为标题，值为BibTeX字典或None
+        """
+        results = {}
+        total = len(titles)
+        
+        for i, (title, result) in enumerate(self.iter_search(titles, journal), 1):
+            results[title] = result
+            if progress_callback:
+                progress_callback(i, total)
+        
+        return results
+    
+    def warm_up(self):
+        """预先完成启动浏览器等准备工作，使第一次检索不必等待"""
+    
+    def close(self):
+        """释放资源"""
+    
+    def __enter__(self):
+        """上下文管理器入口"""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """上下文管理器出口"""
+        self.close()
+
+
+def drain_deferred(backend: SearchBackend, deferred: List[str],
+                   captcha_hook: Optional[Callable[[List[str]], None]],
+                   store: Callable) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """
+    通知用户并等待一次验证码处理，然后重新检索推迟的标题；重新检索时又遇到验证码的标题进入下一轮
+    
+    Args:
+        backend: 处理验证码并重新检索的后端
+        deferred: 遇到验证码而推迟的标题
+        captcha_hook: 通知回调，接受推迟的标题列表
+        store: 写入缓存和日志的函数，接受(标题, 结果, 状态, 原始BibTeX)参数
+    
+    Yields:
+        (标题, BibTeX字典或None)
+    """
+    while deferred:
+        backend.logger.warning(f"{len(deferred)} titles deferred by CAPTCHA, waiting for it to be solved")
+        if captcha_hook is not None:
+            captcha_hook(list(deferred))
+        if not backend.solve_captcha():
+            for title in deferred:
+                yield title, None
+            return
+        
+        retry, deferred = deferred, []
+        for title in retry:
+            result = backend.search_paper(title)
+            if backend.last_lookup_status == 'captcha':
+                deferred.append(title)
+                continue
+            store(title, result, backend.last_lookup_status, backend.last_bibtex_text)
+            yield title, result
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试检查守护进程和保持运行的浏览器工作池
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+from checkpoint import CheckpointJournal
+from checker_daemon import CheckerDaemon, DaemonClient, DaemonError, build_backend, daemon_running
+from http_scraper import HttpScholarBackend
+from mock_scholar import MockScholarServer
+from rate_limiter import AdaptiveDelay
+from scraper_pool import ScraperPool
+from test_http_scraper import SCHOLAR_PAPERS
+from test_result_cache import FakeScraper, SCHOLAR_ENTRY
+
+
+def test_daemon_serves_search_and_check_jobs():
+    """测试客户端通过套接字提交标题列表和.bib文件，守护进程复用同一个后端"""
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, 'daemon.sock')
+    bib_path = os.path.join(directory, 'refs.bib')
+    with open(bib_path, 'w', encoding='utf-8') as f:
+        f.write("@inproceedings{he2016,\n  title={Deep Residual Learning for Image Recognition},\n"
+                "  author={He, Kaiming and Zhang, Xiangyu and Ren, Shaoqing and Sun, Jian},\n"
+                "  pages={770--778},\n  year={2015}\n}\n\n"
+                "@misc{dup,\n  title={Deep residual learning for image {R}ecognition},\n  year={2016}\n}\n")
+    try:
+        with MockScholarServer(SCHOLAR_PAPERS) as server:
+            backend = HttpScholarBackend(base_url=server.url, rate_controller=AdaptiveDelay(0, 0, jitter=0))
+            daemon = CheckerDaemon(backend, socket_path).start()
+            try:
+                client = DaemonClient(socket_path)
+                assert daemon_running(socket_path)
+                
+                results = dict(client.iter_search(['Deep residual learning for image recognition', 'Unknown paper']))
+                assert results['Deep residual learning for image recognition']['ID'] == 'he2016deep'
+                assert results['Unknown paper'] is None
+                
+                responses = list(client.check(bib_path))
+                comparisons = [r['comparison'] for r in responses if 'comparison' in r]
+                assert [c['citation_key'] for c in comparisons] == ['he2016', 'dup']
+                assert {'field': 'year', 'type': 'mismatch', 'original': '2015', 'scholar': '2016'} \
+                    in comparisons[0]['differences']
+                assert responses[-1]['lookups'] == 1 and responses[-1]['coalesced'] == 1
+                
+                assert client.ping()['jobs'] == 2
+                # 两个任务的全部请求都走同一个长连接
+                assert server.connections == 1
+            finally:
+                daemon.stop()
+        
+        assert not os.path.exists(socket_path)
+        try:
+            DaemonClient(socket_path).ping()
+            assert False, "expected DaemonError"
+        except DaemonError:
+            pass
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_client_streams_titles_in_chunks_and_journals_lookups():
+    """测试客户端按批发送标题而不先读完输入，并把找到和未找到的结果都记入断点日志"""
+    directory = tempfile.mkdtemp()
+    socket_path = os.path.join(directory, 'daemon.sock')
+    outcomes = {
+        'Paper 0': ('found', SCHOLAR_ENTRY),
+        'Paper 1': ('not_found', None),
+        'Paper 2': ('error', None),
+        'Paper 3': ('found', dict(SCHOLAR_ENTRY, title='Paper 3')),
+        'Paper 4': ('not_found', None),
+    }
+    scraper = FakeScraper(outcomes)
+    daemon = CheckerDaemon(scraper, socket_path).start()
+    journal = CheckpointJournal(os.path.join(directory, 'refs.bib'), checkpoint_dir=directory)
+    journal.open()
+    try:
+        consumed = []
+        
+        def titles():
+            for title in outcomes:
+                consumed.append(title)
+                yield title
+        
+        client = DaemonClient(socket_path, chunk_size=2)
+        results = client.iter_search(titles(), journal)
+        # 第一批结果产出时只读取了前两个标题
+        assert next(results)[0] == 'Paper 0'
+        assert consumed == ['Paper 0', 'Paper 1']
+        assert len(dict(results)) == 4
+        
+        assert client.ping()['jobs'] == 3
+        assert journal.completed == {'Paper 0': SCHOLAR_ENTRY, 'Paper 1': None,
+                                     'Paper 3': outcomes['Paper 3'][1], 'Paper 4': None}
+        
+        # 继续检查时只重新检索出错的标题
+        assert dict(client.iter_search(list(outcomes), journal))['Paper 1'] is None
+        assert scraper.searched.count('Paper 2') == 2
+        assert scraper.searched.count('Paper 1') == 1
+    finally:
+        journal.close()
+        daemon.stop()
+        shutil.rmtree(directory)
+
+
+def test_build_backend_validates_delay_range():
+    """测试守护进程与main.py使用同一规则解析--delay，无效的值使用默认范围"""
+    for delay, expected in [('1-3', (1.0, 3.0)), ('5', (2, 4)), ('3-1', (2, 4)), ('fast', (2, 4))]:
+        args = argparse.Namespace(delay=delay, no_result_cache=True, rate=20, burst=3, backend='http',
+                                  scholar_url='http://127.0.0.1:1/', browsers=1)
+        backend, result_cache = build_backend(args)
+        assert backend.delay_range == expected and result_cache is None
+        backend.close()
+
+
+def test_keep_alive_pool_reuses_scrapers():
+    """测试keep_alive工作池在多次检索之间复用预先启动的浏览器"""
+    outcomes = {f'Paper {i}': ('found', dict(SCHOLAR_ENTRY, title=f'Paper {i}')) for i in range(6)}
+    created = []
+    
+    class WarmScraper(FakeScraper):
+        def __init__(self, delay_range=(0, 0), rate_limiter=None, rate_controller=None):
+            super().__init__(outcomes, rate_controller=rate_controller)
+            self.warmed = False
+            created.append(self)
+        
+        def warm_up(self):
+            self.warmed = True
+    
+    pool = ScraperPool(workers=2, scraper_factory=WarmScraper, keep_alive=True)
+    pool.warm_up()
+    assert len(created) == 2 and all(scraper.warmed for scraper in created)
+    
+    assert len(dict(pool.iter_search(list(outcomes)[:3]))) == 3
+    assert len(dict(pool.iter_search(list(outcomes)[3:]))) == 3
+    assert len(created) == 2
+    assert sorted(sum((scraper.searched for scraper in created), [])) == sorted(outcomes)
+    pool.close()
+
+
+if __name__ == "__main__":
+    test_daemon_serves_search_and_check_jobs()
+    test_client_streams_titles_in_chunks_and_journals_lookups()
+    test_build_backend_validates_delay_range()
+    test_keep_alive_pool_reuses_scrapers()
+    print("✓ 所有守护进程测试通过")
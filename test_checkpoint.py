@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+测试检索断点日志
+"""
+
+import os
+import shutil
+import tempfile
+
+from checkpoint import CheckpointJournal
+from test_result_cache import FakeScraper, SCHOLAR_ENTRY
+
+
+def test_resume_skips_journaled_titles():
+    """测试中断后继续时跳过已记录的标题，出错的标题重新检索"""
+    directory = tempfile.mkdtemp()
+    try:
+        outcomes = {
+            'Found Paper': ('found', SCHOLAR_ENTRY),
+            'Missing Paper': ('not_found', None),
+            'Timeout Paper': ('error', None),
+        }
+        titles = list(outcomes)
+        
+        # 第一次运行在第三个标题处崩溃
+        class CrashingScraper(FakeScraper):
+            def search_paper(self, title):
+                if title == 'Timeout Paper':
+                    raise KeyboardInterrupt
+                return super().search_paper(title)
+        
+        journal = CheckpointJournal('refs.bib', directory)
+        journal.open()
+        try:
+            CrashingScraper(outcomes).batch_search(titles, journal=journal)
+        except KeyboardInterrupt:
+            pass
+        journal.close()
+        
+        # 模拟写了一半的末尾行
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"title": "Partial')
+        
+        resumed = CheckpointJournal('refs.bib', directory)
+        assert resumed.open(resume=True) == 2
+        scraper = FakeScraper(outcomes)
+        results = scraper.batch_search(titles, journal=resumed)
+        resumed.close()
+        assert scraper.searched == ['Timeout Paper']
+        assert results == {'Found Paper': SCHOLAR_ENTRY, 'Missing Paper': None, 'Timeout Paper': None}
+        
+        # 残行被截掉，日志仍然可以完整读取
+        again = CheckpointJournal('refs.bib', directory)
+        assert again.open(resume=True) == 2
+        again.discard()
+        assert not os.path.exists(again.path)
+        
+        # 不带resume时从头开始；其他输入文件的日志互不影响
+        fresh = CheckpointJournal('refs.bib', directory)
+        assert fresh.open() == 0
+        fresh.record('Found Paper', SCHOLAR_ENTRY)
+        fresh.close()
+        other = CheckpointJournal('other.bib', directory)
+        assert other.open(resume=True) == 0
+        other.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_resume_skips_journaled_titles()
+    print("✓ 所有断点日志测试通过")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+测试字段比对模块
+"""
+
+from comparator import FieldComparator, DifferenceType
+from normalizer import NormalizationEngine, fold_latex_accents
+
+
+def test_compare_entries_keeps_only_mismatches():
+    """测试比对结果只保存缺失和不匹配的字段，匹配的字段只计数"""
+    original = {
+        'ID': 'de2002fast',
+        'ENTRYTYPE': 'article',
+        'title': 'A fast and elitist multiobjective genetic algorithm: NSGA-II',
+        'pages': '182-197',
+        'year': '2002',
+        'journal': 'IEEE Transactions on Evolutionary Computation',
+        'publisher': 'Ieee'
+    }
+    scholar = {
+        'title': 'A fast and elitist multiobjective genetic algorithm: NSGA-II',
+        'pages': '182--197',
+        'year': '2002',
+        'journal': 'IEEE transactions on evolutionary computation',
+        'publisher': 'IEEE Press',
+        'volume': '6'
+    }
+    
+    comparison = FieldComparator.compare_entries(original, scholar)
+    
+    assert comparison.has_differences
+    assert comparison.match_count == 3
+    assert [(d.field_name, d.diff_type) for d in comparison.get_mismatches()] == [
+        ('publisher', DifferenceType.MISMATCH),
+        ('volume', DifferenceType.MISSING),
+    ]
+    assert FieldComparator.get_updated_fields(comparison) == {'publisher': 'IEEE Press', 'volume': '6'}
+    assert not hasattr(comparison, '__dict__')
+    assert not hasattr(comparison.differences[0], '__dict__')
+
+
+def test_latex_accents_are_folded():
+    """测试LaTeX重音命令与Unicode字符比较时相等"""
+    assert fold_latex_accents(r"Jos{\'e} Mart{\'\i}nez and G\"{o}del and \c{c}") == 'José Martínez and Gödel and ç'
+    assert FieldComparator.values_are_equal(r'M{\"u}ller, J.', 'Müller, J.', 'author')
+    assert FieldComparator.normalize_title(r"\'Etude of {NSGA-II}") == 'étude of nsga ii'
+
+
+def test_normalization_cache_stats():
+    """测试规范化结果被缓存并统计命中率"""
+    engine = NormalizationEngine(common_steps=[str.strip], field_steps={'year': [str.upper]}, cache_size=2)
+    
+    assert engine.normalize(' a ', 'journal') == 'a'
+    assert engine.normalize(' a ', 'booktitle') == 'a'  # 与journal共用默认流程和缓存
+    assert engine.normalize(' b ', 'year') == 'B'
+    assert engine.normalize(None, 'year') == ''
+    
+    stats = engine.cache_stats()
+    assert (stats['hits'], stats['misses'], stats['size'], stats['maxsize']) == (1, 2, 2, 2)
+    assert stats['hit_rate'] == 1 / 3
+
+
+def test_compare_batch_matches_normalized_titles():
+    """测试标题写法不同的重复条目都能找到检索结果"""
+    scholar_entry = {'ID': 'deb2002fast', 'title': 'A fast and elitist algorithm: NSGA-II', 'year': '2002'}
+    entries = [
+        {'ID': 'deb2002', 'title': 'A fast and elitist algorithm: NSGA-II', 'year': '2002'},
+        {'ID': 'deb2002b', 'title': 'A Fast and Elitist Algorithm: {NSGA-II}', 'year': '2003'},
+        {'ID': 'other', 'title': 'Other paper', 'year': '2002'},
+    ]
+    comparisons = FieldComparator.compare_batch(entries, {entries[0]['title']: scholar_entry, 'Other paper': None})
+    
+    assert [c.citation_key for c in comparisons] == ['deb2002', 'deb2002b']
+    assert [d.field_name for d in comparisons[1].differences] == ['year']
+
+
+if __name__ == "__main__":
+    test_compare_entries_keeps_only_mismatches()
+    test_latex_accents_are_folded()
+    test_normalization_cache_stats()
+    test_compare_batch_matches_normalized_titles()
+    print("✓ 所有比对测试通过")
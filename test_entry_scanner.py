@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+测试条目边界扫描
+"""
+
+from entry_scanner import scan_entries, find_malformed_entries
+
+
+def test_scan_well_formed_entries():
+    """测试正常条目，包括右花括号不在单独一行和圆括号定界的条目"""
+    data = (b'@article{a,\n  title = {A {Nested} Title}\n}\n'
+            b'@book{b, title = {B}}\n'
+            b'@misc(c, note = {has (parens)})\n')
+    
+    spans = list(scan_entries(data))
+    
+    assert [span.entry_type for span in spans] == ['article', 'book', 'misc']
+    assert [span.line for span in spans] == [1, 4, 5]
+    assert all(span.error is None for span in spans)
+    assert data[spans[1].start:spans[1].end] == b'@book{b, title = {B}}'
+    assert data[spans[2].start:spans[2].end] == b'@misc(c, note = {has (parens)})'
+
+
+def test_report_malformed_entries():
+    """测试未闭合的条目被报告并且不影响后续条目"""
+    data = (b'@article{a,\n  title = {Unclosed\n\n'
+            b'@book{b,\n  title = {B}\n}\n'
+            b'@misc{c,\n  title = {C}\n')
+    
+    spans = list(scan_entries(data))
+    
+    assert [(span.entry_type, span.line) for span in spans] == [('article', 1), ('book', 4), ('misc', 7)]
+    assert spans[0].error == 'unterminated entry, next entry starts at line 4'
+    assert spans[1].error is None
+    assert spans[2].error == 'unterminated entry at end of file'
+    assert [span.line for span in find_malformed_entries(data)] == [1, 7]
+
+
+if __name__ == "__main__":
+    test_scan_well_formed_entries()
+    test_report_malformed_entries()
+    print("✓ 所有扫描测试通过")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+测试HTTP检索后端（使用本地模拟Scholar服务器）
+"""
+
+from http_scraper import HttpScholarBackend, ScholarResultsParser
+from mock_scholar import MockScholarServer
+from pipeline import ComparisonPipeline
+from rate_limiter import AdaptiveDelay
+from scholar_scraper import best_candidate
+
+
+SCHOLAR_PAPERS = [
+    """@article{deb2002fast,
+  title={A fast and elitist multiobjective genetic algorithm: NSGA-II},
+  author={Deb, Kalyanmoy and Pratap, Amrit and Agarwal, Sameer and Meyarivan, TAMT},
+  journal={IEEE transactions on evolutionary computation},
+  volume={6},
+  number={2},
+  pages={182--197},
+  year={2002},
+  publisher={IEEE}
+}""",
+    """@inproceedings{he2016deep,
+  title={Deep residual learning for image recognition},
+  author={He, Kaiming and Zhang, Xiangyu and Ren, Shaoqing and Sun, Jian},
+  booktitle={Proceedings of the IEEE conference on computer vision and pattern recognition},
+  pages={770--778},
+  year={2016}
+}""",
+]
+
+
+def _backend(server, **kwargs):
+    controller = AdaptiveDelay(0, 0, jitter=0)
+    return HttpScholarBackend(base_url=server.url, rate_controller=controller, **kwargs)
+
+
+def test_search_paper_over_pooled_connection():
+    """测试通过搜索页、引用对话框和scholar.bib三次请求取得BibTeX，并复用同一个连接"""
+    with MockScholarServer(SCHOLAR_PAPERS) as server:
+        with _backend(server) as backend:
+            entry = backend.search_paper('A Fast and Elitist Multiobjective Genetic Algorithm: {NSGA-II}')
+            assert entry['ID'] == 'deb2002fast'
+            assert entry['pages'] == '182--197'
+            assert backend.last_lookup_status == 'found'
+            assert backend.last_bibtex_text == SCHOLAR_PAPERS[0]
+            
+            results = backend.batch_search(['Deep residual learning for image recognition',
+                                            'Quantum gravity for cats'])
+            assert results['Deep residual learning for image recognition']['ID'] == 'he2016deep'
+            assert results['Quantum gravity for cats'] is None
+            assert backend.last_lookup_status == 'not_found'
+        
+        assert server.requests == {'search': 3, 'cite': 2, 'bibtex': 2}
+        # 7个请求都走同一个长连接
+        assert server.connections == 1
+
+
+def test_captcha_is_reported_as_error():
+    """测试验证码页面视为检索出错并触发退避"""
+    with MockScholarServer(SCHOLAR_PAPERS, captcha_every=1) as server:
+        with _backend(server) as backend:
+            assert backend.search_paper('Deep residual learning for image recognition') is None
+            assert backend.last_lookup_status == 'error'
+            assert backend.rate_controller.stats()['pushbacks'] == {'captcha': 1}
+
+
+def test_unparseable_bibtex_is_error():
+    """测试scholar.bib返回无法解析的内容时按出错处理，不返回空字典"""
+    with MockScholarServer(SCHOLAR_PAPERS) as server:
+        server.papers[1].bibtex = '@inproceedings{he2016deep,\n  title={Deep residual learning'
+        with _backend(server) as backend:
+            assert backend.search_paper('Deep residual learning for image recognition') is None
+            assert backend.last_lookup_status == 'error'
+            assert backend.last_bibtex_text is None
+            
+            # 流式比对不会把条目与空结果比对，报告虚假的标题不一致
+            entry = {'ENTRYTYPE': 'inproceedings', 'ID': 'he2016',
+                     'title': 'Deep residual learning for image recognition'}
+            assert list(ComparisonPipeline(backend).run([entry])) == []
+        assert server.requests['bibtex'] == 2
+
+
+def test_injected_errors_and_phase_timings():
+    """测试模拟服务器注入的503错误记为检索出错，各阶段耗时通过timing_hook报告"""
+    timings = []
+    with MockScholarServer(SCHOLAR_PAPERS, captcha_every=3, error_every=5) as server:
+        with _backend(server) as backend:
+            backend.timing_hook = lambda phase, seconds: timings.append(phase)
+            statuses = []
+            for title in ['A fast and elitist multiobjective genetic algorithm: NSGA-II',
+                          'Deep residual learning for image recognition'] * 2:
+                backend.search_paper(title)
+                statuses.append(backend.last_lookup_status)
+        
+        # 第5个请求（第二次检索的引用对话框）返回503，第3次搜索返回验证码
+        assert statuses == ['found', 'error', 'error', 'found']
+        assert server.requests['error'] == 1
+        assert len(server.captcha_times) == 1
+        assert timings == ['search', 'cite', 'bibtex', 'search', 'cite', 'search',
+                           'search', 'cite', 'bibtex']
+
+
+def test_results_parser_strips_type_markers():
+    """测试解析结果标题时去掉[PDF]等类型标记"""
+    parser = ScholarResultsParser()
+    parser.feed('<div class="gs_r gs_or gs_scl" data-cid="abc"><h3 class="gs_rt">'
+                '<span class="gs_ctg2">[PDF]</span> <a href="#">Deep <b>residual</b> learning</a></h3></div>')
+    assert parser.results == [{'cid': 'abc', 'title': 'Deep residual learning'}]
+    assert not parser.captcha
+
+
+def test_cite_only_requested_for_similar_result():
+    """测试只为与查询标题足够相似的搜索结果请求引用对话框"""
+    titles = ['Identity mappings in deep residual networks', 'Deep residual learning for image recognition']
+    assert best_candidate('Deep Residual Learning for Image Recognition', titles) == (1, 1.0)
+    index, score = best_candidate('Deep learning for image segmentation', titles)
+    assert index is None and score < 0.8
+    
+    with MockScholarServer(SCHOLAR_PAPERS) as server:
+        with _backend(server) as backend:
+            # 搜索结果只有部分单词相同，不打开引用对话框
+            assert backend.search_paper('Deep learning for image segmentation') is None
+            assert backend.last_lookup_status == 'not_found'
+        assert server.requests == {'search': 1}
+
+
+if __name__ == "__main__":
+    test_search_paper_over_pooled_connection()
+    test_captcha_is_reported_as_error()
+    test_unparseable_bibtex_is_error()
+    test_injected_errors_and_phase_timings()
+    test_results_parser_strips_type_markers()
+    test_cite_only_requested_for_similar_result()
+    print("✓ 所有HTTP检索测试通过")
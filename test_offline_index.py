@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+测试离线元数据索引
+"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from offline_index import OfflineBackend, build_index
+
+
+DBLP_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<!DOCTYPE dblp SYSTEM "dblp.dtd">
+<dblp>
+<article key="journals/tec/DebAPM02">
+<author>Kalyanmoy Deb</author>
+<author>Amrit Pratap</author>
+<author>J&uuml;rgen Wang 0001</author>
+<title>A fast and elitist multiobjective genetic algorithm: NSGA-II.</title>
+<pages>182-197</pages>
+<year>2002</year>
+<volume>6</volume>
+<journal>IEEE Trans. Evol. Comput.</journal>
+<ee>https://doi.org/10.1109/4235.996017</ee>
+</article>
+<article key="journals/corr/abs-0000">
+<author>Kalyanmoy Deb</author>
+<title>A fast and elitist multiobjective genetic algorithm: NSGA-II.</title>
+<year>2003</year>
+<journal>CoRR</journal>
+</article>
+<inproceedings key="conf/gecco/Lovelace19">
+<author>Ada Lovelace</author>
+<title>Storing <i>H</i><sub>2</sub> in sparse graphs.</title>
+<booktitle>GECCO</booktitle>
+<year>2019</year>
+</inproceedings>
+<www key="homepages/x"><author>X</author><title>Home Page</title></www>
+</dblp>
+"""
+
+CROSSREF_WORKS = [
+    {
+        'type': 'journal-article',
+        'title': ['Deep <i>residual</i> learning for image recognition'],
+        'author': [{'given': 'Kaiming', 'family': 'He'}, {'given': 'Xiangyu', 'family': 'Zhang'}],
+        'issued': {'date-parts': [[2016, 6]]},
+        'container-title': ['Pattern Recognition'],
+        'page': '770-778',
+        'DOI': '10.1109/CVPR.2016.90'
+    },
+    {'type': 'journal-article', 'title': []},
+]
+
+
+def test_dblp_index_exact_and_fuzzy_lookup():
+    """测试从DBLP XML构建索引并按标题检索"""
+    directory = tempfile.mkdtemp()
+    try:
+        dump_path = os.path.join(directory, 'dblp.xml.gz')
+        with gzip.open(dump_path, 'wt', encoding='iso-8859-1') as f:
+            f.write(DBLP_XML)
+        db_path = os.path.join(directory, 'index.sqlite3')
+        
+        assert build_index(dump_path, db_path) == 3
+        
+        with OfflineBackend(db_path) as backend:
+            entry = backend.search_paper('A Fast and Elitist Multiobjective Genetic Algorithm: {NSGA-II}')
+            # 同名记录优先正式发表的版本
+            assert entry == {
+                'ENTRYTYPE': 'article',
+                'ID': 'deb2002fast',
+                'author': 'Deb, Kalyanmoy and Pratap, Amrit and Wang, Jürgen',
+                'title': 'A fast and elitist multiobjective genetic algorithm: NSGA-II',
+                'pages': '182--197',
+                'year': '2002',
+                'volume': '6',
+                'journal': 'IEEE Trans. Evol. Comput.',
+                'doi': '10.1109/4235.996017'
+            }
+            assert backend.last_lookup_status == 'found'
+            
+            # 相差一个单词时通过全文检索找到
+            assert backend.search_paper('Storing H2 in large sparse graphs')['booktitle'] == 'GECCO'
+            assert backend.search_paper('Home Page') is None
+            assert backend.last_lookup_status == 'not_found'
+            
+            results = backend.batch_search(['Storing H2 in sparse graphs', 'Unknown'])
+            assert results['Storing H2 in sparse graphs']['ID'] == 'lovelace2019storing'
+            assert results['Unknown'] is None
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_crossref_index():
+    """测试从Crossref JSONL构建索引"""
+    directory = tempfile.mkdtemp()
+    try:
+        dump_path = os.path.join(directory, 'crossref.jsonl')
+        with open(dump_path, 'w', encoding='utf-8') as f:
+            for work in CROSSREF_WORKS:
+                f.write(json.dumps(work) + '\n')
+            f.write('not json\n')
+        db_path = os.path.join(directory, 'index.sqlite3')
+        
+        assert build_index(dump_path, db_path) == 1
+        with OfflineBackend(db_path) as backend:
+            entry = backend.search_paper('Deep Residual Learning for Image Recognition')
+        assert entry['author'] == 'He, Kaiming and Zhang, Xiangyu'
+        assert (entry['year'], entry['pages'], entry['journal']) == ('2016', '770--778', 'Pattern Recognition')
+        assert entry['title'] == 'Deep residual learning for image recognition'
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_fuzzy_query_uses_informative_terms():
+    """测试模糊检索忽略常见词和短词，先要求全部关键词匹配，再退回任一关键词匹配"""
+    directory = tempfile.mkdtemp()
+    try:
+        dump_path = os.path.join(directory, 'crossref.jsonl')
+        with open(dump_path, 'w', encoding='utf-8') as f:
+            for i in range(40):
+                f.write(json.dumps({'type': 'journal-article', 'title': [f'On the analysis of a model for case {i}'],
+                                    'issued': {'date-parts': [[2000 + i % 20]]}}) + '\n')
+            f.write(json.dumps({'type': 'journal-article', 'title': ['Graph networks for the design of molecules'],
+                                'issued': {'date-parts': [[2020]]}}) + '\n')
+        db_path = os.path.join(directory, 'index.sqlite3')
+        build_index(dump_path, db_path)
+        
+        with OfflineBackend(db_path) as backend:
+            queries = []
+            match_candidates = backend._match_candidates
+            
+            def recording(title, query):
+                queries.append(query)
+                return match_candidates(title, query)
+            
+            backend._match_candidates = recording
+            # 少一个常见词时全部关键词仍然匹配，一次查询即可找到
+            entry = backend.search_paper('Graph networks for design of molecules')
+            assert entry['title'] == 'Graph networks for the design of molecules'
+            assert queries == ['"graph"* AND "networks"* AND "design"* AND "molecules"*']
+            
+            # 多一个单词时退回任一关键词匹配；含数字的短词保留
+            queries.clear()
+            entry = backend.search_paper('On the analysis of a new model for case 37')
+            assert entry['title'] == 'On the analysis of a model for case 37'
+            assert queries == ['"analysis"* AND "new"* AND "model"* AND "case"* AND "37"*',
+                               '"analysis" OR "new" OR "model" OR "case" OR "37"']
+            
+            # 只有常见词的标题使用原有单词
+            assert backend._fuzzy_terms('on the of') == ['on', 'the', 'of']
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_dblp_index_exact_and_fuzzy_lookup()
+    test_crossref_index()
+    test_fuzzy_query_uses_informative_terms()
+    print("✓ 所有离线索引测试通过")
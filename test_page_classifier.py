@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+测试Scholar页面识别和浏览器配置（不启动浏览器）
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+import scholar_scraper
+from rate_limiter import AdaptiveDelay
+from result_cache import ResultCache
+from scholar_scraper import (BIBTEX_LINK_SELECTORS, CITE_BUTTON_SELECTORS, NO_RESULTS_XPATH, PAGE_WAIT_TIMEOUT,
+                             PAGE_BIBTEX_LINK, PAGE_CAPTCHA, PAGE_ERROR, PAGE_NO_RESULTS, PAGE_RESULTS,
+                             RESULT_CITE_CSS, RESULT_CSS, RESULT_TITLE_CSS,
+                             ScholarScraper, classify_cite_dialog, classify_results_page, lean_blocked_urls)
+from test_http_scraper import SCHOLAR_PAPERS
+
+
+class FakeElement:
+    """页面元素替身"""
+    
+    def __init__(self, text='', attributes=None, children=None):
+        self.text = text
+        self.attributes = attributes or {}
+        self.children = children or {}
+        self.clicked = False
+    
+    def find_elements(self, by, selector):
+        return self.children.get((by, selector), [])
+    
+    def get_attribute(self, name):
+        return self.attributes.get(name)
+    
+    def click(self):
+        self.clicked = True
+
+
+class FakeDriver:
+    """按(by, selector)返回预设元素的WebDriver替身"""
+    
+    def __init__(self, elements=None, url='https://scholar.google.com/scholar?q=x', ready_state='complete'):
+        self.elements = elements or {}
+        self.current_url = url
+        self.ready_state = ready_state
+        self.visited = []
+        # 直接请求引用对话框时返回的BibTeX链接，None表示请求失败
+        self.cite_link = None
+        self.async_calls = []
+    
+    def find_elements(self, by, selector):
+        return self.elements.get((by, selector), [])
+    
+    def find_element(self, by, selector):
+        elements = self.find_elements(by, selector)
+        if not elements:
+            raise NoSuchElementException(selector)
+        return elements[0]
+    
+    def execute_script(self, script):
+        return self.ready_state
+    
+    def execute_async_script(self, script, *args):
+        self.async_calls.append(args)
+        return self.cite_link
+    
+    def get(self, url):
+        self.visited.append(url)
+
+
+def test_results_page_states():
+    """测试结果页、无结果页、验证码页、错误页和加载中页面的识别"""
+    button = object()
+    state = classify_results_page(FakeDriver({CITE_BUTTON_SELECTORS[2]: [button]}))
+    assert (state.kind, state.element, state.selector_index) == (PAGE_RESULTS, button, 2)
+    
+    assert classify_results_page(FakeDriver({(By.XPATH, NO_RESULTS_XPATH): ['msg']})).kind == PAGE_NO_RESULTS
+    assert classify_results_page(FakeDriver({(By.ID, 'gs_res_ccl_mid'): ['div']})).kind == PAGE_NO_RESULTS
+    assert classify_results_page(FakeDriver({(By.ID, 'gs_captcha_f'): ['form']})).kind == PAGE_CAPTCHA
+    assert classify_results_page(FakeDriver(url='https://www.google.com/sorry/index')).kind == PAGE_CAPTCHA
+    assert classify_results_page(FakeDriver()).kind == PAGE_ERROR
+    # 页面还在加载且没有可识别的元素时继续等待
+    assert classify_results_page(FakeDriver(ready_state='loading')) is None
+    
+    link = object()
+    dialog = classify_cite_dialog(FakeDriver({BIBTEX_LINK_SELECTORS[3]: [link]}))
+    assert (dialog.kind, dialog.element, dialog.selector_index) == (PAGE_BIBTEX_LINK, link, 3)
+    assert classify_cite_dialog(FakeDriver()) is None
+
+
+def test_no_results_page_returns_without_selector_timeouts():
+    """测试无结果页立即返回未找到，并记录比逐个选择器等待节省的时间"""
+    scraper = ScholarScraper(delay_range=(0, 0), rate_controller=AdaptiveDelay(0, 0, jitter=0))
+    scraper.driver = FakeDriver({(By.XPATH, NO_RESULTS_XPATH): ['msg']})
+    
+    assert scraper.search_paper('Quantum gravity for cats') is None
+    assert scraper.last_lookup_status == 'not_found'
+    assert scraper.driver.visited == ['https://scholar.google.com/scholar?q=Quantum+gravity+for+cats']
+    # 四个选择器各等待10秒的方式需要40秒
+    expected = len(CITE_BUTTON_SELECTORS) * PAGE_WAIT_TIMEOUT
+    assert expected - 1 < scraper.last_wait_saved <= expected
+    assert scraper.wait_seconds_saved == scraper.last_wait_saved
+    scraper.driver = None
+
+
+def test_captcha_deferred_without_prompt():
+    """测试遇到验证码时不等待用户输入，记下验证码页面；统一处理时打开该页面并只提示一次"""
+    prompts = []
+    scholar_scraper.input = prompts.append
+    try:
+        scraper = ScholarScraper(delay_range=(0, 0), rate_controller=AdaptiveDelay(0, 0, jitter=0))
+        scraper.driver = FakeDriver({(By.ID, 'gs_captcha_f'): ['form']}, url='https://www.google.com/sorry/index')
+        assert scraper.search_paper('Deep residual learning for image recognition') is None
+        assert scraper.last_lookup_status == 'captcha'
+        assert scraper.pending_captcha_url == 'https://www.google.com/sorry/index'
+        assert prompts == []
+        assert scraper.rate_controller.stats()['pushbacks'] == {'captcha': 1}
+        
+        # 浏览器已显示图片时不重启，直接打开验证码页面
+        scraper.images_enabled = True
+        assert scraper.solve_captcha()
+        assert scraper.driver.visited[-1] == 'https://www.google.com/sorry/index'
+        assert len(prompts) == 1 and scraper.pending_captcha_url is None
+        scraper.driver = None
+    finally:
+        del scholar_scraper.input
+
+
+BIBTEX_PATH = '/scholar.bib?q=info:abc123:scholar.google.com/&output=citation'
+
+
+def _results_page_driver(bibtex_text):
+    """有一个搜索结果、BibTeX页面内容为bibtex_text的页面替身，返回(driver, Cite按钮)"""
+    button = FakeElement()
+    result = FakeElement(attributes={'data-cid': 'abc123'}, children={
+        (By.CSS_SELECTOR, RESULT_TITLE_CSS): [FakeElement('[PDF] Deep residual learning for image recognition')],
+        (By.CSS_SELECTOR, RESULT_CITE_CSS): [button],
+    })
+    driver = FakeDriver({
+        CITE_BUTTON_SELECTORS[0]: [button],
+        (By.CSS_SELECTOR, RESULT_CSS): [result],
+        BIBTEX_LINK_SELECTORS[0]: [FakeElement(attributes={'href': 'https://scholar.google.com' + BIBTEX_PATH})],
+        (By.TAG_NAME, 'pre'): [FakeElement(bibtex_text)],
+    })
+    driver.cite_link = BIBTEX_PATH
+    return driver, button
+
+
+def test_direct_cite_request_with_dialog_fallback():
+    """测试按结果ID直接取得BibTeX链接，不点击Cite按钮；直接请求失败时退回引用对话框"""
+    driver, button = _results_page_driver(SCHOLAR_PAPERS[1])
+    scraper = ScholarScraper(delay_range=(0, 0), rate_controller=AdaptiveDelay(0, 0, jitter=0))
+    scraper.driver = driver
+    
+    assert scraper.search_paper('Deep residual learning for image recognition')['ID'] == 'he2016deep'
+    assert not button.clicked
+    assert driver.async_calls[0][0] == ('https://scholar.google.com/scholar?q=info%3Aabc123%3Ascholar.google.com%2F'
+                                        '&output=cite&scirp=0&hl=en')
+    assert driver.visited[-1] == 'https://scholar.google.com' + BIBTEX_PATH
+    
+    driver.cite_link = None
+    assert scraper.search_paper('Deep residual learning for image recognition')['ID'] == 'he2016deep'
+    assert button.clicked
+    assert driver.visited[-1] == 'https://scholar.google.com' + BIBTEX_PATH
+    scraper.driver = None
+
+
+def test_unparseable_bibtex_is_error_and_not_cached():
+    """测试BibTeX页面无法解析时按出错处理，不作为找到的结果写入缓存"""
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(os.path.join(directory, 'results.sqlite3'))
+        scraper = ScholarScraper(delay_range=(0, 0), rate_controller=AdaptiveDelay(0, 0, jitter=0),
+                                 result_cache=cache)
+        scraper.driver, _ = _results_page_driver('@article{broken, title={Deep residual learning} year={2016}}')
+        
+        title = 'Deep residual learning for image recognition'
+        assert list(scraper.iter_search([title])) == [(title, None)]
+        assert scraper.last_lookup_status == 'error'
+        assert cache.lookup(title) == (False, None)
+        scraper.driver = None
+        cache.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_lean_mode_and_persistent_profiles():
+    """测试精简模式的加载策略和CDP屏蔽规则，以及并行浏览器各自使用独立的持久配置目录"""
+    assert '*.css' in lean_blocked_urls() and '*.woff2' in lean_blocked_urls()
+    assert '*.png' in lean_blocked_urls() and '*.png' not in lean_blocked_urls(enable_images=True)
+    
+    launched = []
+    
+    class RecordingChrome(FakeDriver):
+        def __init__(self, service=None, options=None):
+            super().__init__()
+            self.options = options
+            self.cdp_commands = []
+            self.quit_called = False
+            launched.append(self)
+        
+        def execute_cdp_cmd(self, command, params):
+            self.cdp_commands.append((command, params))
+        
+        def quit(self):
+            self.quit_called = True
+    
+    class FakeManager:
+        def install(self):
+            return 'chromedriver'
+    
+    directory = tempfile.mkdtemp()
+    originals = (scholar_scraper.webdriver.Chrome, scholar_scraper.ChromeDriverManager, scholar_scraper.Service)
+    scholar_scraper.webdriver.Chrome = RecordingChrome
+    scholar_scraper.ChromeDriverManager = FakeManager
+    scholar_scraper.Service = lambda path: None
+    try:
+        scrapers = [ScholarScraper(headless=True, lean=True, profile_dir=directory) for _ in range(2)]
+        for scraper in scrapers:
+            scraper.warm_up()
+        first, second = launched
+        assert first.options.page_load_strategy == 'eager'
+        assert ('Network.setBlockedURLs', {'urls': lean_blocked_urls()}) in first.cdp_commands
+        profiles = [arg for driver in launched for arg in driver.options.arguments if arg.startswith('--user-data-dir=')]
+        assert profiles == [f"--user-data-dir={os.path.join(directory, 'profile-0')}",
+                            f"--user-data-dir={os.path.join(directory, 'profile-1')}"]
+        
+        # 验证码重启浏览器时继续使用同一配置目录，并加载图片
+        scrapers[1]._init_driver(enable_images=True)
+        assert launched[2].options.arguments[-1] == profiles[1]
+        assert ('Network.setBlockedURLs', {'urls': lean_blocked_urls(enable_images=True)}) in launched[2].cdp_commands
+        
+        # 关闭后释放配置目录，下一个浏览器可以使用
+        scrapers[0].close()
+        assert first.quit_called
+        third = ScholarScraper(lean=False, profile_dir=directory)
+        third.warm_up()
+        assert launched[3].options.page_load_strategy == 'normal'
+        assert launched[3].options.arguments[-1] == profiles[0]
+        scrapers[1].close()
+        third.close()
+    finally:
+        scholar_scraper.webdriver.Chrome, scholar_scraper.ChromeDriverManager, scholar_scraper.Service = originals
+        shutil.rmtree(directory)
+
+
+def test_profile_dir_locked_across_processes():
+    """测试其他进程正在使用的配置目录不会被分配，释放后可以再次使用"""
+    directory = tempfile.mkdtemp()
+    holder = None
+    try:
+        path = scholar_scraper._claim_profile_dir(directory)
+        assert path == os.path.join(directory, 'profile-0')
+        scholar_scraper._release_profile_dir(path)
+        
+        # 另一个进程持有profile-0的锁
+        lock_path = os.path.join(path, scholar_scraper.PROFILE_LOCK_FILE)
+        holder = subprocess.Popen(
+            [sys.executable, '-c', 'import fcntl, sys; f = open(sys.argv[1], "a"); '
+             'fcntl.flock(f, fcntl.LOCK_EX); print("locked", flush=True); sys.stdin.read()', lock_path],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        assert holder.stdout.readline().strip() == 'locked'
+        
+        claimed = scholar_scraper._claim_profile_dir(directory)
+        assert claimed == os.path.join(directory, 'profile-1')
+        
+        # 另一个进程退出后锁自动释放
+        holder.communicate('')
+        again = scholar_scraper._claim_profile_dir(directory)
+        assert again == os.path.join(directory, 'profile-0')
+        scholar_scraper._release_profile_dir(claimed)
+        scholar_scraper._release_profile_dir(again)
+    finally:
+        if holder is not None and holder.poll() is None:
+            holder.kill()
+        shutil.rmtree(directory)
+
+
+def test_profile_dirs_without_fcntl():
+    """测试没有fcntl的平台（Windows）上模块仍可导入，配置目录在本进程内互斥"""
+    directory = tempfile.mkdtemp()
+    script = (
+        "import sys\n"
+        "sys.modules['fcntl'] = None\n"
+        "import scholar_scraper\n"
+        "assert scholar_scraper.fcntl is None\n"
+        "first = scholar_scraper._claim_profile_dir(sys.argv[1])\n"
+        "second = scholar_scraper._claim_profile_dir(sys.argv[1])\n"
+        "scholar_scraper._release_profile_dir(first)\n"
+        "print(first, second, scholar_scraper._claim_profile_dir(sys.argv[1]))\n"
+    )
+    try:
+        output = subprocess.run([sys.executable, '-c', script, directory], check=True, capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.split()
+        assert output == [os.path.join(directory, name) for name in ('profile-0', 'profile-1', 'profile-0')]
+        assert not os.path.exists(os.path.join(directory, 'profile-0', scholar_scraper.PROFILE_LOCK_FILE))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_results_page_states()
+    test_no_results_page_returns_without_selector_timeouts()
+    test_captcha_deferred_without_prompt()
+    test_direct_cite_request_with_dialog_fallback()
+    test_unparseable_bibtex_is_error_and_not_cached()
+    test_lean_mode_and_persistent_profiles()
+    test_profile_dir_locked_across_processes()
+    test_profile_dirs_without_fcntl()
+    print("✓ 所有页面识别测试通过")
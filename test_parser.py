@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+测试BibTeX解析模块
+"""
+
+import os
+import shutil
+import tempfile
+
+import parser as bib_parser
+from parser import BibTeXParser, parse_files
+from parse_cache import ParseCache
+from atomic_writer import atomic_write
+
+
+SAMPLE_BIB = """% 测试用文献库
+
+@inproceedings{test2019conference,
+	author = {Johnson, Mark},
+	booktitle = {Proceedings of the Test Conference},
+	pages = {50--60},
+	title = {A Test Conference Paper},
+	year = {2019}
+}
+
+@article{de2002fast,
+	author = {Deb, Kalyanmoy and Pratap, Amrit},
+	journal = {IEEE Transactions on Evolutionary Computation},
+	pages = {182-197},
+	title = {A fast and elitist multiobjective genetic algorithm: {NSGA-II}},
+	year = {2002}}
+
+@article{smith2019other,
+	author = {Smith, John},
+	title = {Another Article},
+	year = {2019}
+}
+"""
+
+
+def _write_sample(content: str = SAMPLE_BIB) -> str:
+    """写入临时BibTeX文件"""
+    fd, path = tempfile.mkstemp(suffix='.bib')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def test_single_pass_raw_entries():
+    """测试单遍解析得到的原始文本和字节区间"""
+    path = _write_sample()
+    try:
+        parser = BibTeXParser(path)
+        entries = parser.parse().entries
+        
+        assert [e['ID'] for e in entries] == ['test2019conference', 'de2002fast', 'smith2019other']
+        # 右花括号不在单独一行的条目也能被提取
+        assert set(parser.raw_entries) == {e['ID'] for e in entries}
+        
+        with open(path, 'rb') as f:
+            data = f.read()
+        for raw in parser.raw_entries.values():
+            assert data[raw['start']:raw['end']].decode('utf-8') == raw['raw_text']
+            assert raw['raw_text'].startswith('@') and raw['raw_text'].endswith('}')
+    finally:
+        os.remove(path)
+
+
+def test_key_and_type_year_index():
+    """测试引用键索引和(类型, 年份)索引在更新后保持一致"""
+    path = _write_sample()
+    try:
+        parser = BibTeXParser(path)
+        parser.parse()
+        
+        assert parser.get_entry_by_key('de2002fast')['year'] == '2002'
+        assert parser.get_entry_by_key('missing') is None
+        assert [e['ID'] for e in parser.get_entries_by_type_year('article', '2019')] == ['smith2019other']
+        assert len(parser.get_entries_by_type_year('ARTICLE')) == 2
+        
+        parser.update_entry('de2002fast', {'year': '2019', 'ID': 'ignored'})
+        
+        assert parser.get_entry_by_key('de2002fast')['year'] == '2019'
+        assert parser.get_entries_by_type_year('article', '2002') == []
+        assert [e['ID'] for e in parser.get_entries_by_type_year('article', '2019')] == \
+            ['smith2019other', 'de2002fast']
+        assert parser.get_entry_by_key('ignored') is None
+    finally:
+        os.remove(path)
+
+
+def test_lazy_mode_materializes_on_access():
+    """测试延迟加载模式只解析被访问的条目"""
+    path = _write_sample('@string{ieee = "IEEE"}\n' + SAMPLE_BIB.replace(
+        '{IEEE Transactions on Evolutionary Computation}', 'ieee'))
+    try:
+        with BibTeXParser(path, lazy=True) as parser:
+            parser.parse()
+            entries = parser.get_entries()
+            
+            assert len(entries) == 3
+            assert parser.raw_entries == {}
+            
+            first_two = entries[:2]
+            assert [e['ID'] for e in first_two] == ['test2019conference', 'de2002fast']
+            assert first_two[1]['journal'] == 'IEEE'
+            assert set(parser.raw_entries) == {'test2019conference', 'de2002fast'}
+            
+            parser.update_entry('smith2019other', {'year': '2020'})
+            assert parser.get_entry_by_key('smith2019other')['year'] == '2020'
+            assert [e['ID'] for e in parser.get_entries_by_type_year('article', '2020')] == ['smith2019other']
+            assert [e['ID'] for e in parser.get_entries()] == \
+                ['test2019conference', 'de2002fast', 'smith2019other']
+    finally:
+        os.remove(path)
+
+
+def test_entry_rejected_by_bibtexparser_is_reported():
+    """测试扫描器接受但bibtexparser无法解析的条目记为格式错误，而不是抛出异常"""
+    content = ('@article{ok, title={A}, year={1}}\n'
+               '@article{bad, title={B} year={2}}\n'
+               '@article{ok2, title={C}, year={3}}\n')
+    path = _write_sample(content)
+    try:
+        with BibTeXParser(path, lazy=True) as parser:
+            parser.parse()
+            assert parser.get_entry_by_key('bad') is None
+            assert [span.line for span in parser.malformed_entries] == [2]
+            assert [e['ID'] for e in parser.get_entries()] == ['ok', 'ok2']
+            assert parser.get_entry_by_key('ok2')['title'] == 'C'
+        
+        with BibTeXParser(path, lazy=True) as parser:
+            parser.parse()
+            assert [e['ID'] for e in parser.get_entries()[0:3]] == ['ok', 'ok2']
+        
+        parser = BibTeXParser(path)
+        parser.parse()
+        assert [e['ID'] for e in parser.get_entries()] == ['ok', 'ok2']
+        assert [span.line for span in parser.malformed_entries] == [2]
+    finally:
+        os.remove(path)
+
+
+def test_incremental_save_splices_modified_entries():
+    """测试增量保存只重写修改过的条目"""
+    for lazy in (False, True):
+        path = _write_sample()
+        try:
+            parser = BibTeXParser(path, lazy=lazy)
+            parser.parse()
+            parser.update_entry('de2002fast', {'pages': '182--197', 'volume': '6'})
+            parser.save(incremental=True)
+            
+            with open(path, encoding='utf-8') as f:
+                content = f.read()
+            
+            # 未修改的条目和注释原样保留
+            first_entry = SAMPLE_BIB[SAMPLE_BIB.index('@inproceedings'):SAMPLE_BIB.index('@article')]
+            last_entry = SAMPLE_BIB[SAMPLE_BIB.index('@article{smith'):]
+            assert content.startswith('% 测试用文献库\n\n' + first_entry)
+            assert content.endswith(last_entry)
+            # 修改的条目保持原有字段顺序，新字段追加在后
+            assert '\tpages = {182--197},\n\ttitle = ' in content
+            assert content.index('\tvolume = {6}') > content.index('\tyear = {2002}')
+            
+            # 保存后记录的区间与新文件一致，可以继续增量保存
+            parser.update_entry('smith2019other', {'year': '2020'})
+            parser.save(incremental=True)
+            reparsed = BibTeXParser(path)
+            reparsed.parse()
+            assert reparsed.get_entry_by_key('smith2019other')['year'] == '2020'
+            assert reparsed.get_entry_by_key('de2002fast')['volume'] == '6'
+            assert parser.get_entry_by_key('smith2019other')['ID'] == 'smith2019other'
+            parser.close()
+        finally:
+            os.remove(path)
+
+
+def test_incremental_save_with_duplicate_keys():
+    """测试有重复引用键时保存不会用第一个条目覆盖第二个条目"""
+    content = '@article{dup,title={First},year={2001}}\n\n@article{dup,title={Second},year={2002}}\n'
+    for lazy in (False, True):
+        path = _write_sample(content)
+        try:
+            parser = BibTeXParser(path, lazy=lazy)
+            parser.parse()
+            assert parser.get_entry_by_key('dup')['title'] == 'First'
+            parser.update_entry('dup', {'year': '1999'})
+            parser.save(incremental=True)
+            parser.close()
+            
+            reparsed = BibTeXParser(path)
+            reparsed.parse()
+            assert [(e['title'], e['year']) for e in reparsed.get_entries()] == [('First', '1999'), ('Second', '2002')]
+        finally:
+            os.remove(path)
+
+
+def test_parse_cache_skips_reparsing_unchanged_file():
+    """测试文件未变化时从解析缓存加载"""
+    path = _write_sample()
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = ParseCache(cache_dir)
+        first = BibTeXParser(path, cache=cache)
+        first.parse()
+        
+        second = BibTeXParser(path, cache=cache)
+        second._parse_data = None  # 命中缓存时不应再解析
+        second.parse()
+        assert second.get_entries() == first.get_entries()
+        assert second.raw_entries == first.raw_entries
+        assert second.get_entry_by_key('de2002fast')['year'] == '2002'
+        
+        # 内容变化后缓存失效
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('\n@misc{added, title = {Added}}\n')
+        third = BibTeXParser(path, cache=cache)
+        third.parse()
+        assert third.get_entry_by_key('added')['title'] == 'Added'
+    finally:
+        os.remove(path)
+        shutil.rmtree(cache_dir)
+
+
+def test_parallel_parse_matches_serial():
+    """测试并行分块解析与串行解析结果一致"""
+    content = '@string{tec = "IEEE TEC"}\n' + ''.join(
+        f"% note {i}\n@article{{key{i},\n\tjournal = tec,\n\ttitle = {{Title {i}}}\n}}\n"
+        for i in range(40))
+    path = _write_sample(content)
+    min_bytes = bib_parser.PARALLEL_MIN_BYTES
+    bib_parser.PARALLEL_MIN_BYTES = 0
+    try:
+        serial = BibTeXParser(path)
+        serial.parse()
+        parallel = BibTeXParser(path, workers=3)
+        parallel.parse()
+        
+        assert parallel.get_entries() == serial.get_entries()
+        assert parallel.raw_entries == serial.raw_entries
+        assert parallel.database.comments == serial.database.comments
+        assert parallel.get_entry_by_key('key39')['journal'] == 'IEEE TEC'
+        
+        parsers = parse_files([path], workers=2)
+        assert parsers[path].get_entries() == serial.get_entries()
+    finally:
+        bib_parser.PARALLEL_MIN_BYTES = min_bytes
+        os.remove(path)
+
+
+def test_atomic_write_keeps_target_on_failure():
+    """测试写入中途出错时原文件保持不变，且不留下临时文件"""
+    path = _write_sample()
+    directory = os.path.dirname(path)
+    before = set(os.listdir(directory))
+    try:
+        try:
+            with atomic_write(path) as f:
+                f.write('partial content')
+                raise RuntimeError('simulated crash')
+        except RuntimeError:
+            pass
+        
+        with open(path, encoding='utf-8') as f:
+            assert f.read() == SAMPLE_BIB
+        assert set(os.listdir(directory)) == before
+        
+        # 完整保存同样经过原子写入
+        parser = BibTeXParser(path)
+        parser.parse()
+        parser.save()
+        reparsed = BibTeXParser(path)
+        assert reparsed.parse().entries == parser.get_entries()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    test_single_pass_raw_entries()
+    test_key_and_type_year_index()
+    test_lazy_mode_materializes_on_access()
+    test_entry_rejected_by_bibtexparser_is_reported()
+    test_incremental_save_splices_modified_entries()
+    test_incremental_save_with_duplicate_keys()
+    test_parse_cache_skips_reparsing_unchanged_file()
+    test_parallel_parse_matches_serial()
+    test_atomic_write_keeps_target_on_failure()
+    print("✓ 所有解析测试通过")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试检索 → 比对流式管道
+"""
+
+import time
+
+from pipeline import ComparisonPipeline
+from scraper_pool import ScraperPool, TASKS_PER_WORKER
+from test_result_cache import FakeScraper, SCHOLAR_ENTRY
+
+
+def make_entry(key, title, year='2002'):
+    return {'ENTRYTYPE': 'article', 'ID': key, 'title': title,
+            'author': 'Deb, Kalyanmoy and Pratap, Amrit', 'year': year}
+
+
+def test_pipeline_compares_as_results_arrive():
+    """测试每个检索结果到达后立即比对，同一论文只检索一次"""
+    title = SCHOLAR_ENTRY['title']
+    outcomes = {
+        title: ('found', SCHOLAR_ENTRY),
+        'Missing Paper': ('not_found', None),
+        'Other Paper': ('found', dict(SCHOLAR_ENTRY, title='Completely different title')),
+    }
+    entries = [
+        make_entry('deb2002', title),
+        make_entry('deb2002dup', 'A Fast and Elitist Multiobjective Genetic Algorithm: {NSGA-II}', year='2003'),
+        make_entry('missing', 'Missing Paper'),
+        {'ENTRYTYPE': 'misc', 'ID': 'untitled'},
+        make_entry('other', 'Other Paper'),
+        make_entry('missing2', 'missing paper.'),
+    ]
+    scraper = FakeScraper(outcomes)
+    progress = []
+    pipeline = ComparisonPipeline(scraper, progress_callback=lambda current, total: progress.append((current, total)))
+    
+    stream = pipeline.run(iter(entries), total=5)
+    first = next(stream)
+    # 第一个结果比对完成时，后面的标题还没有检索
+    assert first.citation_key == 'deb2002' and not first.has_differences
+    assert scraper.searched == [title]
+    
+    rest = list(stream)
+    assert [c.citation_key for c in rest] == ['deb2002dup', 'other']
+    assert [d.field_name for d in rest[0].differences] == ['year']
+    assert rest[1].title_mismatch
+    # 大小写、花括号和标点不同的重复标题合并为一次检索
+    assert scraper.searched == [title, 'Missing Paper', 'Other Paper']
+    assert (pipeline.lookups, pipeline.found, pipeline.compared, pipeline.coalesced) == (3, 2, 3, 2)
+    assert progress == [(1, 5), (3, 5), (4, 5), (5, 5)]
+
+
+def test_pool_coalesces_in_flight_duplicates():
+    """测试并行检索时，正在检索的论文不会被重复检索"""
+    outcomes = {f'Paper {i}': ('found', dict(SCHOLAR_ENTRY, title=f'Paper {i}')) for i in range(5)}
+    searched = []
+    
+    class RecordingScraper(FakeScraper):
+        def __init__(self, delay_range=(0, 0), rate_limiter=None, rate_controller=None):
+            super().__init__(outcomes, rate_controller=rate_controller)
+            self.searched = searched
+    
+    entries = [make_entry(f'p{i}-{copy}', f'{{P}}aper {i}' if copy else f'Paper {i}')
+               for copy in range(3) for i in range(5)]
+    pipeline = ComparisonPipeline(ScraperPool(workers=2, scraper_factory=RecordingScraper))
+    keys = sorted(c.citation_key for c in pipeline.run(entries))
+    
+    assert keys == sorted(entry['ID'] for entry in entries)
+    assert sorted(searched) == sorted(outcomes)
+    assert (pipeline.lookups, pipeline.coalesced) == (5, 10)
+
+
+def test_pool_reads_titles_on_demand():
+    """测试工作池按需读取标题，排队中的标题数量有上限"""
+    outcomes = {f'Paper {i}': ('found', dict(SCHOLAR_ENTRY, title=f'Paper {i}')) for i in range(60)}
+    
+    class SlowScraper(FakeScraper):
+        def __init__(self, delay_range=(0, 0), rate_limiter=None, rate_controller=None):
+            super().__init__(outcomes, rate_controller=rate_controller)
+        
+        def search_paper(self, title):
+            time.sleep(0.002)
+            return super().search_paper(title)
+    
+    pulled = []
+    
+    def entries():
+        for i in range(60):
+            pulled.append(i)
+            yield make_entry(f'paper{i}', f'Paper {i}')
+    
+    workers = 3
+    pipeline = ComparisonPipeline(ScraperPool(workers=workers, scraper_factory=SlowScraper))
+    compared = 0
+    for comparison in pipeline.run(entries()):
+        compared += 1
+        # 已读取但未比对的条目不超过队列容量加上正在检索的数量
+        assert len(pulled) - compared <= workers * (TASKS_PER_WORKER + 1)
+    assert compared == 60 and pipeline.lookups == 60
+
+
+def test_completed_results_are_bounded():
+    """测试保留的已完成结果有上限，淘汰最久未命中的结果，之后读到时重新检索"""
+    outcomes = {f'Paper {i}': ('found', dict(SCHOLAR_ENTRY, title=f'Paper {i}')) for i in range(3)}
+    scraper = FakeScraper(outcomes)
+    pipeline = ComparisonPipeline(scraper, completed_limit=2)
+    order = ['Paper 0', 'Paper 1', 'Paper 0', 'Paper 2', 'Paper 0', 'Paper 1']
+    entries = [make_entry(f'e{n}', title) for n, title in enumerate(order)]
+    
+    assert len(list(pipeline.run(entries))) == 6
+    # Paper 0刚被命中过，读到Paper 2时淘汰的是Paper 1
+    assert scraper.searched == ['Paper 0', 'Paper 1', 'Paper 2', 'Paper 1']
+    assert (pipeline.lookups, pipeline.coalesced) == (4, 2)
+    assert len(pipeline._completed) == 2
+
+
+if __name__ == "__main__":
+    test_pipeline_compares_as_results_arrive()
+    test_pool_coalesces_in_flight_duplicates()
+    test_pool_reads_titles_on_demand()
+    test_completed_results_are_bounded()
+    print("✓ 所有流式管道测试通过")
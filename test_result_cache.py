@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+测试Scholar检索结果缓存
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from result_cache import ResultCache, SECONDS_PER_DAY
+from scholar_scraper import ScholarScraper
+
+
+SCHOLAR_BIBTEX = """@article{deb2002fast,
+  title={A fast and elitist multiobjective genetic algorithm: NSGA-II},
+  author={Deb, Kalyanmoy and Pratap, Amrit},
+  year={2002}
+}"""
+
+SCHOLAR_ENTRY = {
+    'ENTRYTYPE': 'article',
+    'ID': 'deb2002fast',
+    'title': 'A fast and elitist multiobjective genetic algorithm: NSGA-II',
+    'author': 'Deb, Kalyanmoy and Pratap, Amrit',
+    'year': '2002'
+}
+
+
+class FakeScraper(ScholarScraper):
+    """不启动浏览器，按预设结果返回的爬虫"""
+    
+    def __init__(self, outcomes, **kwargs):
+        super().__init__(delay_range=(0, 0), **kwargs)
+        self.outcomes = outcomes
+        self.searched = []
+    
+    def search_paper(self, title):
+        self.searched.append(title)
+        status, result = self.outcomes[title]
+        self.last_lookup_status = status
+        self.last_bibtex_text = SCHOLAR_BIBTEX if result else None
+        return result
+
+
+def test_lookup_respects_ttl_and_normalized_title():
+    """测试按规范化标题命中，以及找到/未找到结果各自的有效期"""
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(os.path.join(directory, 'results.sqlite3'), ttl_days=30, negative_ttl_days=7)
+        cache.store('A Fast and Elitist Multiobjective Genetic Algorithm: {NSGA-II}', SCHOLAR_ENTRY, SCHOLAR_BIBTEX)
+        cache.store('Missing Paper', None)
+        
+        assert cache.lookup('a fast and elitist multiobjective genetic algorithm  NSGA-II') == (True, SCHOLAR_ENTRY)
+        assert cache.lookup('Missing paper.') == (True, None)
+        assert cache.lookup('Unknown Paper') == (False, None)
+        assert (cache.hits, cache.misses) == (2, 1)
+        
+        # 未找到结果10天后过期，找到的结果仍然有效
+        cache._conn.execute('UPDATE results SET fetched_at = ?', (time.time() - 10 * SECONDS_PER_DAY,))
+        assert cache.lookup('Missing Paper') == (False, None)
+        assert cache.lookup('A fast and elitist multiobjective genetic algorithm: NSGA-II')[0]
+        assert cache.stats() == {'total': 2, 'found': 1, 'negative': 1, 'expired': 1}
+        
+        assert cache.prune() == 1
+        assert cache.stats()['total'] == 1
+        cache.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_export_bib_and_json():
+    """测试导出为BibTeX和JSON"""
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(os.path.join(directory, 'results.sqlite3'))
+        cache.store(SCHOLAR_ENTRY['title'], SCHOLAR_ENTRY, SCHOLAR_BIBTEX)
+        cache.store('Missing Paper', None)
+        
+        bib_path = os.path.join(directory, 'cached.bib')
+        assert cache.export(bib_path) == 1
+        with open(bib_path, encoding='utf-8') as f:
+            assert f.read() == SCHOLAR_BIBTEX + '\n'
+        
+        json_path = os.path.join(directory, 'cached.json')
+        assert cache.export(json_path) == 2
+        with open(json_path, encoding='utf-8') as f:
+            rows = json.load(f)
+        assert [(row['title'], row['found'], row['entry']) for row in rows] == [
+            (SCHOLAR_ENTRY['title'], True, SCHOLAR_ENTRY), ('Missing Paper', False, None)]
+        cache.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_batch_search_skips_cached_titles():
+    """测试批量搜索复用缓存，只缓存确定的结果"""
+    directory = tempfile.mkdtemp()
+    try:
+        cache = ResultCache(os.path.join(directory, 'results.sqlite3'))
+        outcomes = {
+            'Found Paper': ('found', SCHOLAR_ENTRY),
+            'Missing Paper': ('not_found', None),
+            'Timeout Paper': ('error', None),
+        }
+        titles = list(outcomes)
+        
+        expected = {'Found Paper': SCHOLAR_ENTRY, 'Missing Paper': None, 'Timeout Paper': None}
+        
+        first = FakeScraper(outcomes, result_cache=cache)
+        assert first.batch_search(titles) == expected
+        assert first.searched == titles
+        
+        # 第二次运行只重新检索出错的标题
+        second = FakeScraper(outcomes, result_cache=cache)
+        assert second.batch_search(titles) == expected
+        assert second.searched == ['Timeout Paper']
+        assert second.cache_hits == 2
+        cache.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    test_lookup_respects_ttl_and_normalized_title()
+    test_export_bib_and_json()
+    test_batch_search_skips_cached_titles()
+    print("✓ 所有检索缓存测试通过")
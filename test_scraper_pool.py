@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+测试浏览器工作池和令牌桶限速器
+"""
+
+import threading
+import time
+
+from rate_limiter import AdaptiveDelay, TokenBucket
+from scraper_pool import ScraperPool
+from test_result_cache import FakeScraper, SCHOLAR_ENTRY
+
+
+class FakeClock:
+    """手动推进的时钟，sleep直接推进时间"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_limits_rate():
+    """测试突发请求用完后按速率放行"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock, sleep=clock.sleep)
+    
+    waits = [bucket.acquire() for _ in range(7)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3:] == [0.5, 0.5, 0.5, 0.5]
+    assert clock.now == 2.0
+    
+    # 空闲期间令牌恢复，但不超过桶容量
+    clock.now += 10
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.0, 0.5]
+
+
+def test_token_bucket_reserves_in_arrival_order():
+    """测试并发请求预定令牌后各自等待，而不是同时醒来"""
+    bucket = TokenBucket(rate=1.0, capacity=1, clock=lambda: 0.0, sleep=lambda seconds: None)
+    waits = sorted(bucket.acquire() for _ in range(4))
+    assert waits == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_adaptive_delay_backs_off_and_recovers():
+    """测试受阻时成倍延长间隔，正常时逐步缩短，且不超出上下限"""
+    controller = AdaptiveDelay(1.0, 9.0, step=1.0, backoff=2.0, slow_threshold=5.0, jitter=0)
+    assert controller.delay == 5.0
+    
+    for _ in range(10):
+        controller.record_success()
+    assert controller.delay == 1.0
+    assert controller.requests_per_minute == 60.0
+    
+    controller.record_pushback('captcha')
+    assert controller.delay == 2.0
+    assert controller.observe_response(6.0) is True
+    assert controller.observe_response(1.0) is False
+    controller.record_pushback('captcha')
+    controller.record_pushback('empty results')
+    assert controller.delay == 9.0
+    assert controller.stats()['pushbacks'] == {'captcha': 2, 'slow response': 1, 'empty results': 1}
+    
+    controller.record_success()
+    assert controller.delay == 8.0
+    assert controller.next_delay() == 8.0
+    
+    # 下限为0时受阻也能退避
+    zero = AdaptiveDelay(0, 4, jitter=0)
+    for _ in range(10):
+        zero.record_success()
+    assert zero.delay == 0 and zero.next_delay() == 0
+    zero.record_pushback('captcha')
+    assert zero.delay > 0
+
+
+def test_pool_merges_results_and_shares_limiter():
+    """测试多个浏览器并行检索，结果与顺序检索一致"""
+    outcomes = {f'Paper {i}': ('found', dict(SCHOLAR_ENTRY, ID=f'paper{i}')) for i in range(12)}
+    outcomes['Missing Paper'] = ('not_found', None)
+    titles = list(outcomes) + ['Paper 0']
+    limiter = TokenBucket(rate=1000.0, capacity=1)
+    searched = []
+    lock = threading.Lock()
+    
+    class SlowScraper(FakeScraper):
+        def __init__(self, headless=False, delay_range=(0, 0), rate_limiter=None, rate_controller=None):
+            super().__init__(outcomes, rate_limiter=rate_limiter, rate_controller=rate_controller)
+        
+        def search_paper(self, title):
+            self.rate_limiter.acquire()
+            time.sleep(0.01)
+            with lock:
+                searched.append(title)
+            return super().search_paper(title)
+    
+    progress = []
+    pool = ScraperPool(workers=4, rate_limiter=limiter, scraper_factory=SlowScraper)
+    results = pool.batch_search(titles, progress_callback=lambda current, total: progress.append((current, total)))
+    
+    expected = FakeScraper(outcomes).batch_search(list(outcomes))
+    assert results == expected
+    assert list(results) == list(outcomes)
+    # 重复标题只检索一次
+    assert sorted(searched) == sorted(outcomes)
+    assert progress[-1] == (13, 13)
+
+
+def test_captcha_titles_deferred_until_single_solve():
+    """测试遇到验证码的标题推迟到最后，通知一次、统一处理一次验证码后重新检索"""
+    outcomes = {f'Paper {i}': ('found', dict(SCHOLAR_ENTRY, ID=f'paper{i}')) for i in range(8)}
+    blocked = {'Paper 1', 'Paper 5'}
+    solves = []
+    
+    class CaptchaScraper(FakeScraper):
+        def __init__(self, headless=False, delay_range=(0, 0), rate_limiter=None, rate_controller=None):
+            super().__init__(outcomes, rate_controller=rate_controller)
+        
+        def search_paper(self, title):
+            if title in blocked:
+                self.searched.append(title)
+                self.pending_captcha_url = f'https://scholar.google.com/sorry/{title}'
+                self.last_lookup_status = 'captcha'
+                return None
+            return super().search_paper(title)
+        
+        def solve_captcha(self):
+            solves.append(self.pending_captcha_url)
+            blocked.clear()
+            return True
+    
+    notified = []
+    scraper = CaptchaScraper()
+    scraper.captcha_hook = notified.append
+    order = [title for title, _ in scraper.iter_search(list(outcomes))]
+    assert order == [t for t in outcomes if t not in ('Paper 1', 'Paper 5')] + ['Paper 1', 'Paper 5']
+    assert notified == [['Paper 1', 'Paper 5']]
+    assert solves == ['https://scholar.google.com/sorry/Paper 5']
+    
+    blocked.update({'Paper 2', 'Paper 6'})
+    notified.clear()
+    solves.clear()
+    pool = ScraperPool(workers=3, scraper_factory=CaptchaScraper)
+    pool.captcha_hook = notified.append
+    results = list(pool.iter_search(list(outcomes)))
+    assert len(results) == 8 and all(result is not None for _, result in results)
+    assert sorted(title for title, _ in results[-2:]) == ['Paper 2', 'Paper 6']
+    assert [sorted(titles) for titles in notified] == [['Paper 2', 'Paper 6']]
+    assert len(solves) == 1
+    
+    # 不能人工处理验证码的后端，推迟的标题记为检索失败
+    blocked.add('Paper 3')
+    scraper = CaptchaScraper()
+    scraper.solve_captcha = lambda: False
+    assert list(scraper.iter_search(['Paper 3', 'Paper 4']))[-1] == ('Paper 3', None)
+
+
+if __name__ == "__main__":
+    test_token_bucket_limits_rate()
+    test_token_bucket_reserves_in_arrival_order()
+    test_adaptive_delay_backs_off_and_recovers()
+    test_pool_merges_results_and_shares_limiter()
+    test_captcha_titles_deferred_until_single_solve()
+    print("✓ 所有并行检索测试通过")